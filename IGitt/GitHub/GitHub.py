@@ -14,7 +14,7 @@ from IGitt.GitHub.GitHubUser import GitHubUser
 from IGitt.Interfaces.Actions import IssueActions, MergeRequestActions, \
     PipelineActions, InstallationActions
 from IGitt.Interfaces.Comment import CommentType
-from IGitt.Interfaces.Hoster import Hoster
+from IGitt.Interfaces.Hoster import Hoster, RepositoryInventory
 
 
 class GitHub(GitHubMixin, Hoster):
@@ -30,15 +30,29 @@ class GitHub(GitHubMixin, Hoster):
         """
         self._token = token
         self._url = '/'
+        # The authenticated user, whose repositories are the owned ones
+        self._user = GitHubUser(token)
+        self._inventory = RepositoryInventory(
+            lambda: get(self._token, '/user/repos'),
+            lambda repo: GitHubRepository.from_data(repo, self._token,
+                                                    repo['full_name']))
+
+    @property
+    def inventory(self) -> RepositoryInventory:
+        """
+        The repositories the user has access to, which ``master_repositories``
+        and ``write_repositories`` are selected from.
+        """
+        return self._inventory
 
     @property
     def master_repositories(self):
         """
         Retrieves repositories the user has admin access to.
         """
-        repo_list = get(self._token, '/user/repos')
-        return {GitHubRepository.from_data(repo, self._token, repo['full_name'])
-                for repo in repo_list if repo['permissions']['admin']}
+        return self._inventory.view(
+            'master', lambda repos: [repo for repo in repos
+                                     if repo['permissions']['admin']])
 
     @property
     def owned_repositories(self):
@@ -50,11 +64,12 @@ class GitHub(GitHubMixin, Hoster):
         >>> sorted(map(lambda x: x.full_name, github.owned_repositories))
         ['gitmate-test-user/test']
 
-        :return: A set of full repository names.
+        :return: A set of GitHubRepository objects.
         """
-        repo_list = get(self._token, '/user/repos', {'affiliation': 'owner'})
-        return {GitHubRepository.from_data(repo, self._token, repo['full_name'])
-                for repo in repo_list}
+        username = self._user.username
+        return self._inventory.view(
+            'owned', lambda repos: [repo for repo in repos
+                                    if repo['owner']['login'] == username])
 
     @property
     def write_repositories(self):
@@ -68,9 +83,9 @@ class GitHub(GitHubMixin, Hoster):
 
         :return: A set of strings.
         """
-        repo_list = get(self._token, '/user/repos')
-        return {GitHubRepository.from_data(repo, self._token, repo['full_name'])
-                for repo in repo_list if repo['permissions']['push']}
+        return self._inventory.view(
+            'write', lambda repos: [repo for repo in repos
+                                    if repo['permissions']['push']])
 
     def get_repo(self, repository) -> GitHubRepository:
         """
@@ -105,25 +120,28 @@ class GitHub(GitHubMixin, Hoster):
         :param raw_query:    A string with the search query following syntax.
         :yields:             Search results as GitHubIssue(...) and
                              GitHubMergeRequest(...) objects for Issues and
-                             Merge Requests respectively.
+                             Merge Requests respectively. More than 1000 are
+                             found by splitting the query into time windows,
+                             see ``IGitt.GitHub.GitHubSearch``, unless it
+                             already restricts both created and updated.
         """
-        base_url = '/search/issues'
-        query_params = {'q': raw_query,
-                        'per_page': '100'}
-        resp = get(token, base_url, query_params)
-
-        issue_url_re = re.compile(
-            r'https://(?:.+)/(\S+)/(\S+)/(issues|pull)/(\d+)')
-        for item in resp:
-            user, repo, item_type, item_number = issue_url_re.match(
-                item['html_url']).groups()
-            if item_type == 'issues':
-                yield GitHubIssue.from_data(item, token, user + '/' + repo,
-                                            int(item_number))
-            elif item_type == 'pull':
-                yield GitHubMergeRequest.from_data(item, token,
-                                                   user + '/' + repo,
-                                                   int(item_number))
+        from IGitt.GitHub.GitHubSearch import search
+        # Windows are added on the created field unless the query has it
+        field = ('updated' if re.search(r'\bcreated:', raw_query) else
+                 'created')
+        if re.search(r'\b{}:'.format(field), raw_query):
+            field = None
+        return search(token, raw_query, field)
+
+    def _prime_repository(self, data, repository, *objects):
+        """
+        Lets the given objects return the repository from the webhook payload
+        instead of retrieving it.
+        """
+        repository_obj = GitHubRepository.from_data(
+            data['repository'], self._token, repository)
+        for obj in objects:
+            obj.prime('repository', repository_obj)
 
     def _handle_webhook_installation(self, data):
         """Handles 'installation' event."""
@@ -183,6 +201,7 @@ class GitHub(GitHubMixin, Hoster):
         issue = data['issue']
         issue_obj = GitHubIssue.from_data(
             issue, self._token, repository, issue['number'])
+        self._prime_repository(data, repository, issue_obj)
         trigger_event = {
             'opened': IssueActions.OPENED,
             'closed': IssueActions.CLOSED,
@@ -202,6 +221,7 @@ class GitHub(GitHubMixin, Hoster):
         pull_request = data['pull_request']
         pull_request_obj = GitHubMergeRequest.from_data(
             pull_request, self._token, repository, pull_request['number'])
+        self._prime_repository(data, repository, pull_request_obj)
         trigger_event = {
             'synchronize': MergeRequestActions.SYNCHRONIZED,
             'opened': MergeRequestActions.OPENED,
@@ -231,26 +251,24 @@ class GitHub(GitHubMixin, Hoster):
                 data['comment']['id'])
 
             if 'pull_request' in data['issue']:
-                yield (MergeRequestActions.COMMENTED,
-                       [GitHubMergeRequest.from_data(
-                           data['issue'],
-                           self._token,
-                           repository,
-                           data['issue']['number']),
-                        comment_obj])
+                action = MergeRequestActions.COMMENTED
+                issue_class = GitHubMergeRequest
             else:
-                yield IssueActions.COMMENTED, [GitHubIssue.from_data(
-                    data['issue'],
-                    self._token,
-                    repository,
-                    data['issue']['number']
-                ), comment_obj]
+                action = IssueActions.COMMENTED
+                issue_class = GitHubIssue
+
+            issue_obj = issue_class.from_data(
+                data['issue'], self._token, repository,
+                data['issue']['number'])
+            self._prime_repository(data, repository, issue_obj, comment_obj)
+            yield action, [issue_obj, comment_obj]
 
     def _handle_webhook_status(self, data, repository):
         """Handles 'status' event."""
         commit = data['commit']
         commit_obj = GitHubCommit.from_data(
             commit, self._token, repository, commit['sha'])
+        self._prime_repository(data, repository, commit_obj)
         yield PipelineActions.UPDATED, [commit_obj]
 
     def handle_webhook(self, event: str, data: dict):
@@ -274,7 +292,7 @@ class GitHub(GitHubMixin, Hoster):
             raise NotImplementedError('Given webhook event cannot be handled '
                                       'yet.')
         if 'installation' in event:
-            yield from handler(data)
+            yield from self._invalidating(handler(data))
         else:
             repository = self.get_repo_name(data)
-            yield from handler(data, repository)
+            yield from self._invalidating(handler(data, repository))
@@ -6,6 +6,10 @@ from datetime import datetime
 from IGitt.GitHub import delete, patch, GitHubMixin, GitHubToken
 from IGitt.Interfaces.Comment import Comment, CommentType
 from IGitt.GitHub.GitHubUser import GitHubUser
+from IGitt.Utils import memoized
+from IGitt.Utils import object_field
+from IGitt.Utils import Record
+from IGitt.Utils import timestamp_field
 
 
 class GitHubComment(GitHubMixin, Comment):
@@ -13,6 +17,12 @@ class GitHubComment(GitHubMixin, Comment):
     Represents a comment on GitHub, mainly with a body and author - oh and it's
     deletable!
     """
+    record_class = Record.define(
+        'GitHubCommentRecord',
+        created=timestamp_field('created_at'),
+        updated=timestamp_field('updated_at'),
+        author=object_field('user', lambda comment, user: GitHubUser.from_data(
+            user, comment._token, user['login'])))
 
     def __init__(self,
                  token: GitHubToken,
@@ -97,9 +107,7 @@ class GitHubComment(GitHubMixin, Comment):
 
         :return: A GitHubUser object.
         """
-        return GitHubUser.from_data(self.data['user'],
-                                    self._token,
-                                    self.data['user']['login'])
+        return self.record.author
 
     @property
     def created(self) -> datetime:
@@ -112,8 +120,7 @@ class GitHubComment(GitHubMixin, Comment):
         >>> issue.created
         datetime.datetime(2016, 1, 19, 19, 37, 53)
         """
-        return datetime.strptime(self.data['created_at'],
-                                 '%Y-%m-%dT%H:%M:%SZ')
+        return self.record.created
 
     @property
     def updated(self) -> datetime:
@@ -126,8 +133,7 @@ class GitHubComment(GitHubMixin, Comment):
         >>> issue.updated
         datetime.datetime(2016, 10, 9, 11, 36, 7)
         """
-        return datetime.strptime(self.data['updated_at'],
-                                 '%Y-%m-%dT%H:%M:%SZ')
+        return self.record.updated
 
     def delete(self):
         """
@@ -136,6 +142,7 @@ class GitHubComment(GitHubMixin, Comment):
         delete(self._token, self._url)
 
     @property
+    @memoized()
     def repository(self):
         """
         Returns the GitHub repository this comment was posted in, as a
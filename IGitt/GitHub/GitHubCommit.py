@@ -5,12 +5,15 @@ from typing import Optional
 from typing import Set
 
 from IGitt import ElementDoesntExistError
-from IGitt.GitHub import get, post, GitHubMixin, GitHubToken
+from IGitt.GitHub import get, get_lines, post, GitHubMixin, GitHubToken
 from IGitt.GitHub.GitHubComment import GitHubComment
 from IGitt.GitHub.GitHubRepository import GitHubRepository
 from IGitt.Interfaces.Comment import CommentType
 from IGitt.Interfaces.Commit import Commit
+from IGitt.Interfaces.Diff import FileDiff
+from IGitt.Interfaces.Diff import parse_diff
 from IGitt.Interfaces.CommitStatus import CommitStatus, Status
+from IGitt.Utils import memoized
 
 GH_STATE_TRANSLATION = {Status.ERROR: 'error', Status.FAILED: 'failure',
                         Status.PENDING: 'pending', Status.CANCELED: 'failure',
@@ -66,26 +69,7 @@ def get_diff_index(patch, line_nr):
     :param line_nr: The line number to identify.
     :return: The position in the Patch or None
     """
-    patch = patch.splitlines(True)
-    current_line_added = 0
-    current_diff_index = 0
-    for line in patch:
-        if line.startswith('---') or line.startswith('+++'):
-            continue
-
-        if line.startswith('@@'):
-            values = line[line.find('-'):line.find(' @@', 3)]
-            _, added = tuple(values.split(' '))
-            current_line_added = int(added.split(',')[0][1:])
-        elif line.startswith('+') or line.startswith(' '):
-            if current_line_added == line_nr:
-                return current_diff_index
-
-            current_line_added += 1
-
-        current_diff_index += 1
-
-    return None
+    return FileDiff(None, None, patch).position(line_nr)
 
 
 class GitHubCommit(GitHubMixin, Commit):
@@ -131,6 +115,7 @@ class GitHubCommit(GitHubMixin, Commit):
         return self._sha
 
     @property
+    @memoized()
     def repository(self):
         """
         Retrieves the repository that holds this commit.
@@ -189,11 +174,20 @@ class GitHubCommit(GitHubMixin, Commit):
         :param status: The CommitStatus to set to this commit.
         :raises RuntimeError: If something goes wrong (network, auth...).
         """
+        if self._has_status(status, GH_STATE_TRANSLATION):
+            return
+
         data = {'state': GH_STATE_TRANSLATION[status.status],
                 'target_url': status.url, 'description': status.description,
                 'context': status.context}
         status_url = '/repos/' + self._repository + '/statuses/' + self.sha
         post(self._token, status_url, data)
+        self._forget_combined_status()
+        self._remember_status(status)
+
+    def _drop_cached_state(self):
+        GitHubMixin._drop_cached_state(self)
+        self._statuses = None
 
     def get_statuses(self) -> Set[CommitStatus]:
         """
@@ -216,19 +210,12 @@ class GitHubCommit(GitHubMixin, Commit):
                     status['target_url']))
                 contexts.add(status['context'])
 
+        self._remember_statuses(result)
         return result
 
-    @property
-    def combined_status(self) -> Status:
+    def _get_combined_status(self) -> Status:
         """
-        Retrieves a combined status of all the commits.
-
-        :return:
-            Status.FAILED if any of the commits report as error or failure or
-            canceled
-            Status.PENDING if there are no statuses or a commit is pending or a
-            test is running
-            Status.SUCCESS if the latest status for all commits is success
+        Retrieves the combined status from the hoster.
         """
         url = self._url + '/status'
         return INV_GH_STATE_TRANSLATION[get(self._token, url)['state']]
@@ -254,11 +241,13 @@ class GitHubCommit(GitHubMixin, Commit):
         :return: A string containing the patch.
         :raises ElementDoesntExistError: If the given filename doesn't exist.
         """
-        for file in self.data['files']:
-            if file['filename'] == filename and 'patch' in file:
-                return file['patch']
+        return self.diff_index.patch(filename)
 
-        raise ElementDoesntExistError('The file does not exist.')
+    def _get_file_diffs(self):
+        # Binary files come without a patch
+        return [FileDiff(file.get('previous_filename', file['filename']),
+                         file['filename'], file['patch'])
+                for file in self.data['files'] if 'patch' in file]
 
     def comment(self, message: str, file: Optional[str]=None,
                 line: Optional[int]=None,
@@ -313,8 +302,7 @@ class GitHubCommit(GitHubMixin, Commit):
 
         if file is not None and line is not None:
             try:
-                patch = self.get_patch_for_file(file)
-                index = get_diff_index(patch, line)
+                index = self.diff_index.position(file, line)
                 if index:  # Else, fallback to comment below file
                     data['position'] = index
                     data['path'] = file
@@ -352,12 +340,8 @@ class GitHubCommit(GitHubMixin, Commit):
         """
         Retrieves the unified diff for the commit excluding the diff index.
         """
-        difflines = str(get(self._token, self._url, headers={
-            'Accept': 'application/vnd.github.v3.diff'
-        })).strip().splitlines()
-        # getting rid of the indexing stuff from git diff e.g. removing lines
-        # ``diff --git a/somefile b/somefile
-        # index 1da2df..2dacdf 100644``
-        return '\n'.join([diff for diff in difflines
-                          if not diff.startswith('diff --git') and
-                          not diff.startswith('index')])
+        return str(self.diff).strip()
+
+    def iter_diff(self):
+        return parse_diff(get_lines(self._token, self._url, headers={
+            'Accept': 'application/vnd.github.v3.diff'}))
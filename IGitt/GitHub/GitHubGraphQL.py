@@ -0,0 +1,407 @@
+"""
+Bulk reads through the GitHub GraphQL API (v4).
+
+The whole object graph of many issues, pull requests or repositories is
+retrieved with one query per batch, using an alias per object. The results are
+the usual GitHubIssue, GitHubMergeRequest and GitHubRepository objects, with
+their data and related objects filled in, so accessing them needs no further
+requests::
+
+    mrs = get_merge_requests(token, [('gitmate-test-user/test', 7),
+                                     ('gitmate-test-user/test', 8)])
+    for mr in mrs:
+        print(mr.title, mr.affected_files, mr.head.combined_status)
+
+Connections are read up to their first 100 nodes. Where there are more, the
+affected data is left out and retrieved over REST on access.
+
+GraphQL limits by the cost of queries rather than their number. The remaining
+points are requested with every query and a query is refused locally if they
+don't suffice for its cost, see ``query_cost``.
+"""
+from datetime import datetime
+from functools import partial
+from json import dumps
+import re
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+from weakref import WeakKeyDictionary
+
+from IGitt.GitHub import post, GitHubToken
+from IGitt.GitHub.GitHubCommit import GitHubCommit
+from IGitt.GitHub.GitHubCommit import INV_GH_STATE_TRANSLATION
+from IGitt.GitHub.GitHubIssue import GitHubIssue
+from IGitt.GitHub.GitHubMergeRequest import GitHubMergeRequest
+from IGitt.GitHub.GitHubRepository import GitHubRepository
+from IGitt.Interfaces import batched_graphql
+from IGitt.Utils import parse_timestamp
+
+
+GRAPHQL_URL = '/graphql'
+
+REPOSITORY_FRAGMENT = """
+fragment RepositoryFields on Repository {
+  databaseId nameWithOwner url sshUrl isFork isPrivate description
+  owner { login }
+  labels(first: 100) { nodes { name } pageInfo { hasNextPage } }
+}
+"""
+
+ISSUE_FIELDS = """
+  number title body state createdAt updatedAt url
+  author { login ... on User { databaseId } }
+  labels(first: 100) { nodes { name color } pageInfo { hasNextPage } }
+  assignees(first: 100) {
+    nodes { login databaseId } pageInfo { hasNextPage }
+  }
+"""
+
+ISSUE_FRAGMENT = """
+fragment IssueFields on Issue {""" + ISSUE_FIELDS + """}
+"""
+
+PULL_REQUEST_FRAGMENT = """
+fragment PullRequestFields on PullRequest {""" + ISSUE_FIELDS + """
+  mergedAt additions deletions
+  headRefName headRefOid baseRefName baseRefOid
+  headRepository { ...RepositoryFields }
+  baseRepository { ...RepositoryFields }
+  commits(first: 100) {
+    nodes { commit { oid message status { state } } }
+    pageInfo { hasNextPage }
+  }
+  files(first: 100) { nodes { path } pageInfo { hasNextPage } }
+}
+""" + REPOSITORY_FRAGMENT
+
+# Remembers the last known rate limit per token
+_RATE_LIMITS = WeakKeyDictionary()
+# Fragment definitions, fragment spreads and the tokens relevant for costs
+_FRAGMENT_DEFINITION = re.compile(r'fragment\s+(\w+)\s+on\s+\w+\s*{')
+_FRAGMENT_SPREAD = re.compile(r'\.\.\.\s*(?!on\b)(\w+)')
+_COST_TOKENS = re.compile(r'\.\.\.\s*on\s+\w+|(\w+)\s*(\([^)]*\))?|[{}]')
+_PAGE_SIZE = re.compile(r'\b(?:first|last)\s*:\s*(\d+)')
+
+
+class GraphQLRateLimit:
+    """
+    The state of the GraphQL rate limit of a token after a query.
+    """
+
+    def __init__(self, cost: int, remaining: int, reset_at: datetime):
+        """
+        :param cost:      The points the last query cost.
+        :param remaining: The points left until ``reset_at``.
+        :param reset_at:  When the points are reset, in UTC.
+        """
+        self.cost = cost
+        self.remaining = remaining
+        self.reset_at = reset_at
+
+    def allows(self, cost: int) -> bool:
+        """
+        Tells if a query costing ``cost`` points can be sent now.
+        """
+        return self.remaining >= cost or datetime.utcnow() >= self.reset_at
+
+
+def _split_fragments(graphql: str) -> Tuple[str, dict]:
+    """
+    Separates the fragment definitions from the rest of a query.
+
+    :return: The query without fragments and their bodies by name.
+    """
+    fragments = {}
+    match = _FRAGMENT_DEFINITION.search(graphql)
+    while match:
+        depth, end = 1, match.end()
+        while depth:
+            depth += {'{': 1, '}': -1}.get(graphql[end], 0)
+            end += 1
+        fragments[match.group(1)] = graphql[match.end():end - 1]
+        graphql = graphql[:match.start()] + graphql[end:]
+        match = _FRAGMENT_DEFINITION.search(graphql)
+    return graphql, fragments
+
+
+def query_cost(graphql: str) -> int:
+    """
+    Computes the points a query costs the way GitHub does: every connection
+    is assumed to return as many nodes as it asks for, the requests needed
+    for all connections are added up and divided by 100.
+
+    >>> query_cost('query { viewer { login } }')
+    1
+    >>> query_cost('query { viewer { repositories(first: 100) { nodes { '
+    ...            'issues(first: 50) { nodes { title } } } } } }')
+    1
+    >>> query_cost('query { viewer { repositories(first: 100) { nodes { '
+    ...            'issues(first: 50) { nodes { labels(first: 10) { '
+    ...            'nodes { name } } } } } } } }')
+    51
+
+    :param graphql: The query, possibly with fragment definitions.
+    """
+    graphql, fragments = _split_fragments(graphql)
+    spread = _FRAGMENT_SPREAD.search(graphql)
+    while spread:
+        graphql = (graphql[:spread.start()] + fragments[spread.group(1)] +
+                   graphql[spread.end():])
+        spread = _FRAGMENT_SPREAD.search(graphql)
+
+    requests = 0
+    # The number of times the fields of each open selection are retrieved
+    multipliers = [1]
+    nodes = 1
+    for token in _COST_TOKENS.finditer(graphql):
+        if token.group() == '{':
+            multipliers.append(nodes)
+        elif token.group() == '}':
+            multipliers.pop()
+            nodes = multipliers[-1]
+        else:
+            page_size = _PAGE_SIZE.search(token.group(2) or '')
+            if page_size:
+                requests += multipliers[-1]
+                nodes = multipliers[-1] * int(page_size.group(1))
+            else:
+                nodes = multipliers[-1]
+    return max(1, round(requests / 100))
+
+
+def rate_limit(token: GitHubToken) -> Optional[GraphQLRateLimit]:
+    """
+    Retrieves the rate limit reported with the last query of ``token``, if
+    any was sent.
+    """
+    return _RATE_LIMITS.get(token)
+
+
+def query(token: GitHubToken, graphql: str,
+          variables: Optional[dict]=None) -> dict:
+    """
+    Sends a GraphQL query. The rate limit is requested along with it, see
+    ``rate_limit``.
+
+    :param token: A Token object.
+    :param graphql: The query, without ``rateLimit`` which is added.
+    :param variables: The values of the variables used in the query.
+    :return: The ``data`` of the result.
+    :raises RuntimeError: If the points left don't suffice for the cost of the
+                          query or the query fails. Errors reported
+                          by GraphQL are passed with the status 404 if all
+                          of them are about missing objects, 400 otherwise.
+    """
+    limit = rate_limit(token)
+    if limit is not None and not limit.allows(query_cost(graphql)):
+        raise RuntimeError('GraphQL rate limit exceeded until {}.'.format(
+            limit.reset_at.isoformat()), 403)
+
+    head, body = graphql.split('{', 1)
+    result = post(token, GRAPHQL_URL,
+                  {'query': '{}{{ rateLimit {{ cost remaining resetAt }} {}'
+                            .format(head, body),
+                   'variables': variables or {}},
+                  headers={'Authorization': 'bearer ' + token.value})
+    if result.get('errors'):
+        not_found = all(error.get('type') == 'NOT_FOUND'
+                        for error in result['errors'])
+        raise RuntimeError(result['errors'], 404 if not_found else 400)
+
+    data = result['data']
+    cost = data.pop('rateLimit')
+    _RATE_LIMITS[token] = GraphQLRateLimit(
+        cost['cost'], cost['remaining'], parse_timestamp(cost['resetAt']))
+    return data
+
+
+def _repository_selection(full_name: str, inner: str) -> str:
+    """
+    Selects ``inner`` of the repository with the given full name.
+    """
+    owner, name = full_name.split('/', 1)
+    return 'repository(owner: {}, name: {}) {{ {} }}'.format(
+        dumps(owner), dumps(name), inner)
+
+
+def _is_complete(connection: dict) -> bool:
+    """
+    Tells if a connection holds all of its nodes.
+    """
+    return not connection['pageInfo']['hasNextPage']
+
+
+def _user_data(user: Optional[dict]) -> Optional[dict]:
+    """
+    Converts GraphQL user data to the REST format.
+    """
+    if user is None:
+        return None
+    return {'login': user['login'], 'id': user.get('databaseId')}
+
+
+def _repository_data(repo: dict) -> dict:
+    """
+    Converts GraphQL repository data to the REST format.
+    """
+    return {'id': repo['databaseId'],
+            'full_name': repo['nameWithOwner'],
+            'html_url': repo['url'],
+            'clone_url': repo['url'] + '.git',
+            'ssh_url': repo['sshUrl'],
+            'fork': repo['isFork'],
+            'private': repo['isPrivate'],
+            'description': repo['description'],
+            'owner': {'login': repo['owner']['login']}}
+
+
+def _issue_data(issue: dict) -> dict:
+    """
+    Converts GraphQL issue data to the REST format. Labels and assignees are
+    left out if there are more than were retrieved.
+    """
+    data = {'number': issue['number'],
+            'title': issue['title'],
+            'body': issue['body'],
+            'state': 'open' if issue['state'] == 'OPEN' else 'closed',
+            'created_at': issue['createdAt'],
+            'updated_at': issue['updatedAt'],
+            'html_url': issue['url'],
+            'user': _user_data(issue['author'])}
+    if _is_complete(issue['labels']):
+        data['labels'] = issue['labels']['nodes']
+    if _is_complete(issue['assignees']):
+        data['assignees'] = [_user_data(user)
+                             for user in issue['assignees']['nodes']]
+    return data
+
+
+def _make_repository(token: GitHubToken, repo: dict) -> GitHubRepository:
+    """
+    Creates a GitHubRepository from GraphQL data, with its labels if all were
+    retrieved.
+    """
+    repository = GitHubRepository.from_data(
+        _repository_data(repo), token, repo['nameWithOwner'])
+    if _is_complete(repo['labels']):
+        repository.prime('get_labels',
+                         {label['name'] for label in repo['labels']['nodes']})
+    return repository
+
+
+def _make_commit(token: GitHubToken, repository: str,
+                 commit: dict) -> GitHubCommit:
+    """
+    Creates a GitHubCommit from GraphQL data, with its combined status.
+    """
+    result = GitHubCommit.from_data(
+        {'sha': commit['oid'], 'commit': {'message': commit['message']}},
+        token, repository, commit['oid'])
+    # Like REST, no status at all and expected ones count as pending
+    state = (commit['status'] or {}).get('state', 'PENDING').lower()
+    result.prime('combined_status', INV_GH_STATE_TRANSLATION[
+        {'expected': 'pending'}.get(state, state)])
+    return result
+
+
+def _make_merge_request(token: GitHubToken, repository: str,
+                        pr: dict) -> GitHubMergeRequest:
+    """
+    Creates a GitHubMergeRequest from GraphQL data, with its repository and
+    its commits and files if all were retrieved.
+    """
+    data = _issue_data(pr)
+    data.update({
+        'state': 'open' if pr['state'] == 'OPEN' else 'closed',
+        'merged_at': pr['mergedAt'],
+        'additions': pr['additions'],
+        'deletions': pr['deletions'],
+        'head': {'ref': pr['headRefName'], 'sha': pr['headRefOid'],
+                 'repo': (_repository_data(pr['headRepository'])
+                          if pr['headRepository'] else None)},
+        'base': {'ref': pr['baseRefName'], 'sha': pr['baseRefOid'],
+                 'repo': _repository_data(pr['baseRepository'])}})
+    mr = GitHubMergeRequest.from_data(data, token, repository, pr['number'])
+    mr.prime('repository', _make_repository(token, pr['baseRepository']))
+    if _is_complete(pr['commits']):
+        mr.prime('commits', tuple(
+            _make_commit(token, repository, node['commit'])
+            for node in pr['commits']['nodes']))
+    if _is_complete(pr['files']):
+        mr.prime('affected_files',
+                 {file['path'] for file in pr['files']['nodes']})
+    return mr
+
+
+def get_issues(token: GitHubToken, issues: Iterable[Tuple[str, int]],
+               batch_size: int=50) -> List[GitHubIssue]:
+    """
+    Retrieves many issues with their labels, assignees and authors.
+
+    :param token: A Token object.
+    :param issues: The full repository names and numbers of the issues.
+    :param batch_size: The number of issues retrieved per query.
+    :return: The GitHubIssue objects in the same order.
+    :raises RuntimeError: If something goes wrong (network, auth...).
+    """
+    issues = list(issues)
+    results = batched_graphql(
+        partial(query, token),
+        [_repository_selection(repository,
+                               'issue(number: {}) {{ ...IssueFields }}'
+                               .format(int(number)))
+         for repository, number in issues],
+        ISSUE_FRAGMENT, batch_size)
+    return [GitHubIssue.from_data(_issue_data(result['issue']), token,
+                                  repository, number)
+            for (repository, number), result in zip(issues, results)]
+
+
+def get_merge_requests(token: GitHubToken,
+                       merge_requests: Iterable[Tuple[str, int]],
+                       batch_size: int=10) -> List[GitHubMergeRequest]:
+    """
+    Retrieves many pull requests with their commits and commit statuses,
+    affected files, labels, assignees, authors and repositories.
+
+    :param token: A Token object.
+    :param merge_requests: The full repository names and numbers of the pull
+                           requests.
+    :param batch_size: The number of pull requests retrieved per query. They
+                       hold up to 100 commits each, which makes a query
+                       expensive.
+    :return: The GitHubMergeRequest objects in the same order.
+    :raises RuntimeError: If something goes wrong (network, auth...).
+    """
+    merge_requests = list(merge_requests)
+    results = batched_graphql(
+        partial(query, token),
+        [_repository_selection(
+            repository, 'pullRequest(number: {}) {{ ...PullRequestFields }}'
+            .format(int(number)))
+         for repository, number in merge_requests],
+        PULL_REQUEST_FRAGMENT, batch_size)
+    return [_make_merge_request(token, repository, result['pullRequest'])
+            for (repository, _), result in zip(merge_requests, results)]
+
+
+def get_repositories(token: GitHubToken, repositories: Iterable[str],
+                     batch_size: int=50) -> List[GitHubRepository]:
+    """
+    Retrieves many repositories with their labels.
+
+    :param token: A Token object.
+    :param repositories: The full names of the repositories.
+    :param batch_size: The number of repositories retrieved per query.
+    :return: The GitHubRepository objects in the same order.
+    :raises RuntimeError: If something goes wrong (network, auth...).
+    """
+    repositories = list(repositories)
+    results = batched_graphql(
+        partial(query, token),
+        [_repository_selection(repository, '...RepositoryFields')
+         for repository in repositories],
+        REPOSITORY_FRAGMENT, batch_size)
+    return [_make_repository(token, result) for result in results]
@@ -2,15 +2,27 @@
 This module contains the GitHubInstallation class which provides
 properties and actions related to GitHub App installations.
 """
-from functools import lru_cache
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from typing import Iterator
 from typing import List
+from typing import Optional
 from typing import Set
+from typing import Tuple
 
+from IGitt.GitHub import BASE_URL
 from IGitt.GitHub import get
 from IGitt.GitHub import GitHubMixin
 from IGitt.GitHub import GitHubInstallationToken
+from IGitt.GitHub import GitHubJsonWebToken
+from IGitt.GitHub import InstallationTokenManager
 from IGitt.GitHub.GitHubRepository import GitHubRepository
+from IGitt.Interfaces import _get_session
+from IGitt.Interfaces import _iter_pages
+from IGitt.Interfaces import _page_items
 from IGitt.Interfaces.Installation import Installation
+from IGitt.Utils import memoized
 
 
 class GitHubInstallation(GitHubMixin, Installation):
@@ -57,7 +69,7 @@ class GitHubInstallation(GitHubMixin, Installation):
         return self.data['permissions']
 
     @property
-    @lru_cache(None)
+    @memoized()
     def repositories(self) -> Set[GitHubRepository]:
         """
         Returns the set of repositories this installation has access to.
@@ -67,3 +79,82 @@ class GitHubInstallation(GitHubMixin, Installation):
                                            self._api_token,
                                            repo['id'])
                 for repo in data['repositories']}
+
+
+def _next_page(pages) -> Optional[list]:
+    """
+    Retrieves the items of the next page, None if there is none.
+    """
+    page = next(pages, None)
+    return None if page is None else _page_items(page)
+
+
+def _pages(token, url: str):
+    """
+    Yields the pages of a listing, requesting each page only when asked for.
+    Nothing is done before the first page is asked for, not even getting the
+    token.
+    """
+    session = _get_session(token, {'per_page': 100})
+    yield from _iter_pages(session.get, BASE_URL + url)
+
+
+def installation_repositories(
+        jwt_token: GitHubJsonWebToken,
+        max_workers: int=8,
+        manager: Optional[InstallationTokenManager]=None
+) -> Iterator[Tuple[GitHubInstallation, GitHubRepository]]:
+    """
+    Lists all installations of a GitHub App and the repositories of each,
+    concurrently. The repositories are read with the token of their
+    installation, so each installation uses its own rate limit, and
+    yielded page by page as they arrive::
+
+        for installation, repository in installation_repositories(jwt):
+            print(installation.identifier, repository.full_name)
+
+    :param jwt_token:   The JWT of the app.
+    :param max_workers: The number of pages requested at once.
+    :param manager:     The manager caching the installation tokens, the
+                        shared one by default.
+    :return: An iterator over the installations with each of their
+             repositories, in no particular order. Installations without
+             repositories are left out.
+    :raises RuntimeError: If something goes wrong (network, auth...).
+    """
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    installation_pages = _pages(jwt_token, '/app/installations')
+    # The installation whose repositories a future lists, None when it lists
+    # installations, and the pages it reads from
+    pending = {executor.submit(_next_page, installation_pages):
+               (None, installation_pages)}
+    try:
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                installation, pages = pending.pop(future)
+                items = future.result()
+                if items is None:
+                    continue
+                # Pages of one listing are read one after the other
+                pending[executor.submit(_next_page, pages)] = (installation,
+                                                               pages)
+
+                if installation is not None:
+                    for repo in items:
+                        yield installation, GitHubRepository.from_data(
+                            repo, installation._api_token, repo['full_name'])
+                    continue
+
+                for data in items:
+                    token = GitHubInstallationToken(data['id'], jwt_token,
+                                                    manager=manager)
+                    new = GitHubInstallation.from_data(data, token,
+                                                       data['id'])
+                    repo_pages = _pages(token, '/installation/repositories')
+                    pending[executor.submit(_next_page, repo_pages)] = (
+                        new, repo_pages)
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
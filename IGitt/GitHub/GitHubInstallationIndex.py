@@ -0,0 +1,231 @@
+"""
+Routing of repositories to the GitHub App installations covering them.
+
+The index lists all installations of an app and their repositories once, then
+tells which installation, and hence which token, to use for a repository by
+its id or full name without further requests. It is kept up to date from the
+installation webhooks as parsed by ``GitHub.handle_webhook``::
+
+    index = InstallationIndex(jwt)
+    for action, objects in GitHub(jwt).handle_webhook(event, data):
+        index.handle(action, objects)
+    repository = GitHubRepository(index.token('coala/coala'), 'coala/coala')
+"""
+from threading import Lock
+from threading import RLock
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Union
+
+from IGitt.GitHub import GitHubInstallationToken
+from IGitt.GitHub import GitHubJsonWebToken
+from IGitt.GitHub import InstallationTokenManager
+from IGitt.GitHub.GitHubInstallation import installation_repositories
+from IGitt.GitHub.GitHubRepository import GitHubRepository
+from IGitt.Interfaces.Actions import InstallationActions
+
+
+class InstallationIndex:
+    """
+    Maps repository ids and full names to the ids of the installations of a
+    GitHub App covering them. Full names are matched case insensitively, like
+    GitHub does.
+    """
+
+    def __init__(self, jwt_token: GitHubJsonWebToken,
+                 manager: Optional[InstallationTokenManager]=None):
+        """
+        :param jwt_token: The JWT of the app.
+        :param manager:   The manager caching the installation tokens, the
+                          shared one by default.
+        """
+        self._jwt = jwt_token
+        self._manager = manager
+        self._lock = Lock()
+        # Held while building, so the index is built once at a time
+        self._build_lock = RLock()
+        self._built = False
+        # Changes made while building, replayed on the built index
+        self._changes = None  # type: Optional[List[Callable]]
+        self._by_id = {}  # type: Dict[int, int]
+        self._by_name = {}  # type: Dict[str, int]
+        # The repository ids and full names of each installation
+        self._repositories = {}  # type: Dict[int, Dict[int, str]]
+
+    def _token(self, installation_id: int) -> GitHubInstallationToken:
+        """
+        Creates the token of an installation.
+        """
+        return GitHubInstallationToken(installation_id, self._jwt,
+                                       manager=self._manager)
+
+    def build(self):
+        """
+        Lists all installations of the app and their repositories
+        concurrently, replacing anything known before. Done on the first
+        lookup if not called. Changes handled meanwhile, e.g. from webhooks,
+        are applied to the result as well.
+
+        :raises RuntimeError: If something goes wrong (network, auth...).
+        """
+        with self._build_lock:
+            with self._lock:
+                self._changes = []
+            try:
+                repositories = {}  # type: Dict[int, Dict[int, str]]
+                for installation, repo in installation_repositories(
+                        self._jwt, manager=self._manager):
+                    repositories.setdefault(installation.identifier, {})[
+                        repo.identifier] = repo.full_name
+            except BaseException:
+                with self._lock:
+                    self._changes = None
+                raise
+
+            with self._lock:
+                self._by_id.clear()
+                self._by_name.clear()
+                self._repositories.clear()
+                for installation_id, repos in repositories.items():
+                    self._add(installation_id, repos)
+                for change in self._changes:
+                    change()
+                self._changes = None
+                self._built = True
+
+    def _ensure_built(self):
+        """
+        Builds the index unless that happened already. Concurrent first
+        lookups build it once.
+        """
+        if not self._built:
+            with self._build_lock:
+                if not self._built:
+                    self.build()
+
+    def _apply(self, change: Callable):
+        """
+        Applies a change holding the lock, keeping it for replaying it on the
+        result if the index is being built.
+        """
+        with self._lock:
+            change()
+            if self._changes is not None:
+                self._changes.append(change)
+
+    def _add(self, installation_id: int, repositories: Dict[int, str]):
+        """
+        Adds repositories to an installation, holding the lock.
+        """
+        known = self._repositories.setdefault(installation_id, {})
+        for repo_id, full_name in repositories.items():
+            known[repo_id] = full_name
+            self._by_id[repo_id] = installation_id
+            self._by_name[full_name.lower()] = installation_id
+
+    def _remove(self, installation_id: int, repo_ids: Iterable[int]):
+        """
+        Removes repositories from an installation, holding the lock.
+        """
+        known = self._repositories.get(installation_id, {})
+        for repo_id in repo_ids:
+            full_name = known.pop(repo_id, None)
+            if self._by_id.get(repo_id) == installation_id:
+                del self._by_id[repo_id]
+            if (full_name is not None and
+                    self._by_name.get(full_name.lower()) == installation_id):
+                del self._by_name[full_name.lower()]
+
+    def _remove_installation(self, installation_id: int):
+        """
+        Removes an installation with all its repositories, holding the lock.
+        """
+        self._remove(installation_id,
+                     list(self._repositories.get(installation_id, ())))
+        self._repositories.pop(installation_id, None)
+
+    def add(self, installation_id: int,
+            repositories: Iterable[GitHubRepository]):
+        """
+        Records that an installation covers the given repositories.
+
+        :param installation_id: The id of the installation.
+        :param repositories:    GitHubRepository objects with their data, as
+                                from webhooks.
+        """
+        repositories = {repo.identifier: repo.full_name
+                        for repo in repositories}
+        self._apply(lambda: self._add(installation_id, repositories))
+
+    def remove(self, installation_id: int,
+               repositories: Optional[Iterable[GitHubRepository]]=None):
+        """
+        Records that an installation doesn't cover the given repositories
+        anymore.
+
+        :param installation_id: The id of the installation.
+        :param repositories:    GitHubRepository objects with their data, as
+                                from webhooks. None if the installation was
+                                deleted.
+        """
+        if repositories is None:
+            self._apply(lambda: self._remove_installation(installation_id))
+        else:
+            repo_ids = [repo.identifier for repo in repositories]
+            self._apply(lambda: self._remove(installation_id, repo_ids))
+
+    def handle(self, action: InstallationActions, objects: list):
+        """
+        Updates the index from an event yielded by ``GitHub.handle_webhook``.
+        Other events are ignored.
+
+        :param action:  The action of the event.
+        :param objects: The IGitt objects of the event.
+        """
+        if action is InstallationActions.CREATED and len(objects) > 2:
+            self.add(objects[0].identifier, objects[2])
+        elif action is InstallationActions.DELETED:
+            self.remove(objects[0].identifier)
+        elif action is InstallationActions.REPOSITORIES_ADDED:
+            self.add(objects[0].identifier, objects[2])
+        elif action is InstallationActions.REPOSITORIES_REMOVED:
+            self.remove(objects[0].identifier, objects[2])
+
+    def installation_id(self, repository: Union[int, str]) -> Optional[int]:
+        """
+        Retrieves the installation covering a repository.
+
+        :param repository: The id or full name of the repository.
+        :return: The id of the installation or None if none covers it.
+        :raises RuntimeError: If building the index fails.
+        """
+        self._ensure_built()
+        if isinstance(repository, int):
+            return self._by_id.get(repository)
+        return self._by_name.get(repository.lower())
+
+    def token(self, repository: Union[int, str]
+             ) -> Optional[GitHubInstallationToken]:
+        """
+        Retrieves the token of the installation covering a repository, see
+        ``installation_id``.
+        """
+        installation_id = self.installation_id(repository)
+        if installation_id is None:
+            return None
+        return self._token(installation_id)
+
+    def repositories(self, installation_id: int) -> Set[str]:
+        """
+        Retrieves the full names of the repositories of an installation.
+        """
+        self._ensure_built()
+        with self._lock:
+            return set(self._repositories.get(installation_id, {}).values())
+
+    def __contains__(self, repository: Union[int, str]) -> bool:
+        return self.installation_id(repository) is not None
@@ -2,6 +2,7 @@
 This contains the Issue implementation for GitHub.
 """
 from datetime import datetime
+from functools import partial
 from typing import Set
 import re
 
@@ -16,6 +17,11 @@ from IGitt.GitHub.GitHubUser import GitHubUser
 from IGitt.Interfaces.Comment import CommentType
 from IGitt.Interfaces.Issue import Issue
 from IGitt.Interfaces import IssueStates
+from IGitt.Utils import enum_field
+from IGitt.Utils import memoized
+from IGitt.Utils import object_field
+from IGitt.Utils import Record
+from IGitt.Utils import timestamp_field
 
 
 CLOSED_BY_PATTERN = re.compile('closed this(?:\n| )+in(?:\n| )+<a href=\"/(.+)/'
@@ -26,6 +32,13 @@ class GitHubIssue(GitHubMixin, Issue):
     """
     This class represents an issue on GitHub.
     """
+    record_class = Record.define(
+        'GitHubIssueRecord',
+        created=timestamp_field('created_at'),
+        updated=timestamp_field('updated_at'),
+        state=enum_field('state', lambda state: IssueStates[state.upper()]),
+        author=object_field('user', lambda issue, user: GitHubUser.from_data(
+            user, issue._token, user['login'])))
 
     def __init__(self, token: GitHubToken, repository: str, number: int):
         """
@@ -51,6 +64,7 @@ class GitHubIssue(GitHubMixin, Issue):
         self._url = '/repos/'+repository+'/issues/'+str(number)
 
     @property
+    @memoized()
     def repository(self):
         """
         Returns the GitHub repository this issue is linked with as a
@@ -89,6 +103,9 @@ class GitHubIssue(GitHubMixin, Issue):
 
         :param new_title: The new title.
         """
+        if self._is_unchanged('title', lambda: self.title == new_title):
+            return
+
         self.data = patch(self._token, self._url, {'title': new_title})
 
     @property
@@ -134,26 +151,71 @@ class GitHubIssue(GitHubMixin, Issue):
         """
         Setter for ssignees.
         """
-        if value - self.assignees:
-            self.assign(*(value - self.assignees))
+        current = self.assignees
+        if value - current:
+            self.assign(*(value - current))
 
-        if self.assignees - value:
-            self.unassign(*(self.assignees - value))
+        if current - value:
+            self.unassign(*(current - value))
 
     def assign(self, *users: Set[GitHubUser]):
         """
         Adds the user as one of the assignees of the issue.
         :param username: Username of the user to be added as an assignee.
         """
+        if self._is_unchanged('assignees',
+                              lambda: set(users) <= self.assignees):
+            return
+
         url = self._url + '/assignees'
         self.data = post(self._token, url,
                          {'assignees': [user.username for user in users]})
 
+    def _apply_edit(self, changes: dict):
+        """
+        Sends all changes collected by an IssueEdit in one PATCH request.
+
+        :param changes: A dict mapping the field names to the new values.
+        :raises RuntimeError: If something goes wrong (network, auth...).
+        """
+        unchanged = {
+            'title': lambda title: self.title == title,
+            'description': lambda body: self.description == body,
+            'labels': lambda labels: self.labels == set(labels),
+            'assignees': lambda users: self.assignees == set(users),
+            'state': lambda state: self.data['state'] == state.value,
+        }
+        changes = {key: value for key, value in changes.items()
+                   if not self._is_unchanged(
+                       'body' if key == 'description' else key,
+                       partial(unchanged[key], value))}
+        if not changes:
+            return
+
+        data = {}
+        if 'title' in changes:
+            data['title'] = changes['title']
+        if 'description' in changes:
+            data['body'] = changes['description']
+        if 'labels' in changes:
+            data['labels'] = list(changes['labels'])
+        if 'assignees' in changes:
+            data['assignees'] = [user.username
+                                 for user in changes['assignees']]
+        if 'state' in changes:
+            data['state'] = changes['state'].value
+
+        self.data = patch(self._token, self._url, data)
+
     def unassign(self, *users: Set[GitHubUser]):
         """
         Removes the user from the assignees of the issue.
         :param users: Username of the user to be unassigned.
         """
+        if self._is_unchanged('assignees',
+                              lambda: not set(users) & self.assignees):
+            return
+
         url = self._url + '/assignees'
         delete(self._token, url,
                {'assignees': [user.username for user in users]})
@@ -181,6 +243,10 @@ class GitHubIssue(GitHubMixin, Issue):
 
         :param new_description: The new description.
         """
+        if self._is_unchanged('body',
+                              lambda: self.description == new_description):
+            return
+
         self.data = patch(self._token,
                           self._url,
                           {'body': new_description})
@@ -192,9 +258,7 @@ class GitHubIssue(GitHubMixin, Issue):
 
         :return: A GitHubUser object.
         """
-        return GitHubUser.from_data(self.data['user'],
-                                    self._token,
-                                    self.data['user']['login'])
+        return self.record.author
 
     def add_comment(self, body):
         """
@@ -276,7 +340,7 @@ class GitHubIssue(GitHubMixin, Issue):
         :param value: A set of label texts.
         """
         # Only if self.data is populated we actually save a request here
-        if 'labels' in self.data and value == self.labels:
+        if self._is_unchanged('labels', lambda: value == self.labels):
             return  # No need to patch
 
         self.data = patch(self._token, self._url, {'labels': list(value)})
@@ -308,8 +372,7 @@ class GitHubIssue(GitHubMixin, Issue):
         >>> issue.created
         datetime.datetime(2016, 1, 13, 7, 56, 23)
         """
-        return datetime.strptime(self.data['created_at'],
-                                 '%Y-%m-%dT%H:%M:%SZ')
+        return self.record.created
 
     @property
     def updated(self) -> datetime:
@@ -322,8 +385,7 @@ class GitHubIssue(GitHubMixin, Issue):
         >>> issue.updated
         datetime.datetime(2016, 10, 9, 11, 27, 11)
         """
-        return datetime.strptime(self.data['updated_at'],
-                                 '%Y-%m-%dT%H:%M:%SZ')
+        return self.record.updated
 
     def close(self):
         """
@@ -331,6 +393,10 @@ class GitHubIssue(GitHubMixin, Issue):
 
         :raises RuntimeError: If something goes wrong (network, auth...).
         """
+        if self._is_unchanged('state',
+                              lambda: self.data['state'] == 'closed'):
+            return
+
         self.data = patch(self._token, self._url, {'state': 'closed'})
 
     def reopen(self):
@@ -339,6 +405,9 @@ class GitHubIssue(GitHubMixin, Issue):
 
         :raises RuntimeError: If something goes wrong (network, auth...).
         """
+        if self._is_unchanged('state', lambda: self.data['state'] == 'open'):
+            return
+
         self.data = patch(self._token, self._url, {'state': 'open'})
 
     def delete(self):
@@ -379,7 +448,7 @@ class GitHubIssue(GitHubMixin, Issue):
         :return: Either <IssueStates.OPEN: 'open'> or
         <IssueStates.CLOSED: 'closed'>.
         """
-        return IssueStates[self.data['state'].upper()]
+        return self.record.state
 
     @property
     def reactions(self) -> Set[GitHubReaction]:
@@ -16,25 +16,35 @@ The methods being used from GitHubIssue are:
 - labels.setter
 - available_labels
 """
-from functools import lru_cache
 from typing import Set
 
-from IGitt.GitHub import get, put, GitHubToken
+from IGitt.GitHub import get, post, put, BASE_URL, GitHubToken
 from IGitt.GitHub.GitHubCommit import GitHubCommit
 from IGitt.GitHub.GitHubIssue import GitHubIssue
 from IGitt.GitHub.GitHubUser import GitHubUser
 from IGitt.Interfaces.MergeRequest import MergeRequest
 from IGitt.Interfaces import MergeRequestStates
+from IGitt.Interfaces.Diff import FileDiff
 
 
 # Issue is used as a Mixin, super() is never called by design!
 from IGitt.Utils import PossiblyIncompleteDict
+from IGitt.Utils import memoized
+from IGitt.Utils import primable
+from IGitt.Utils import object_field
+from IGitt.Utils import Record
 
 
 class GitHubMergeRequest(GitHubIssue, MergeRequest):
     """
     A Pull Request on GitHub.
     """
+    record_class = Record.define(
+        'GitHubMergeRequestRecord',
+        **dict(GitHubIssue.record_class.fields,
+               state=lambda data, _: GitHubMergeRequest._get_state(data),
+               source_repository=object_field(
+                   'head', lambda pr, head: pr._make_repository(head['repo']))))
 
     def __init__(self, token: GitHubToken, repository: str, number: int):
         """
@@ -65,7 +75,11 @@ class GitHubMergeRequest(GitHubIssue, MergeRequest):
         # If issue data is sufficient, don't even get MR data
         return PossiblyIncompleteDict(issue_data, get_full_data)
 
+    def _cache_urls(self):
+        return self.url, BASE_URL + self._mr_url
+
     @property
+    @memoized()
     def base(self):
         """
         Retrieves the base commit as a commit object.
@@ -83,6 +97,7 @@ class GitHubMergeRequest(GitHubIssue, MergeRequest):
                                       self.data['base']['sha'])
 
     @property
+    @memoized()
     def head(self):
         """
         Retrieves the head commit as a commit object.
@@ -132,7 +147,7 @@ class GitHubMergeRequest(GitHubIssue, MergeRequest):
         return self.data['head']['ref']
 
     @property
-    @lru_cache(None)
+    @memoized()
     def commits(self):
         """
         Retrieves a tuple of commit objects that are included in the PR.
@@ -151,6 +166,7 @@ class GitHubMergeRequest(GitHubIssue, MergeRequest):
                      for commit in commits)
 
     @property
+    @memoized()
     def repository(self):
         """
         Retrieves the repository where this comes from.
@@ -179,11 +195,17 @@ class GitHubMergeRequest(GitHubIssue, MergeRequest):
 
         :return: The repository object.
         """
+        return self.record.source_repository
+
+    def _make_repository(self, data: dict):
+        """
+        Creates a GitHubRepository object from the given data.
+        """
         from .GitHubRepository import GitHubRepository
-        return GitHubRepository(self._token,
-                                self.data['head']['repo']['full_name'])
+        return GitHubRepository.from_data(data, self._token, data['full_name'])
 
     @property
+    @primable
     def affected_files(self):
         """
         Retrieves affected files from a GitHub pull request.
@@ -196,8 +218,33 @@ class GitHubMergeRequest(GitHubIssue, MergeRequest):
 
         :return: A set of filenames.
         """
-        files = get(self._token, self._mr_url + '/files')
-        return {file['filename'] for file in files}
+        return {file['filename'] for file in self._get_files()}
+
+    @memoized()
+    def _get_files(self) -> list:
+        """
+        Retrieves the changed files with their patches, shared by
+        ``affected_files`` and ``diff``.
+        """
+        return get(self._token, self._mr_url + '/files')
+
+    def _get_file_diffs(self):
+        # Binary files come without a patch
+        return [FileDiff(file.get('previous_filename', file['filename']),
+                         file['filename'], file['patch'])
+                for file in self._get_files() if 'patch' in file]
+
+    def _submit_review(self, comments, message):
+        """
+        Submits all comments as one pull request review.
+        """
+        data = {'commit_id': self.head.sha, 'event': 'COMMENT',
+                'comments': [{'path': file, 'position': line.position,
+                              'body': body}
+                             for file, line, body in comments]}
+        if message:
+            data['body'] = message
+        post(self._token, self._mr_url + '/reviews', data)
 
     @property
     def diffstat(self):
@@ -247,9 +294,7 @@ class GitHubMergeRequest(GitHubIssue, MergeRequest):
 
         :return: A GitHubUser object.
         """
-        return GitHubUser.from_data(self.data['user'],
-                                    self._token,
-                                    self.data['user']['login'])
+        return self.record.author
 
     @property
     def state(self) -> MergeRequestStates:
@@ -258,11 +303,18 @@ class GitHubMergeRequest(GitHubIssue, MergeRequest):
 
         :return:    A MergeRequestStates object.
         """
+        return self.record.state
+
+    @staticmethod
+    def _get_state(data) -> MergeRequestStates:
+        """
+        Determines the MergeRequestStates object from the PR data.
+        """
         state = {
             'open': MergeRequestStates.OPEN,
             'closed': MergeRequestStates.CLOSED,
-        }[self.data['state']]
-        if self.data['merged_at'] and self.data['state'] == 'closed':
+        }[data['state']]
+        if data['merged_at'] and data['state'] == 'closed':
             return MergeRequestStates.MERGED
         return state
 
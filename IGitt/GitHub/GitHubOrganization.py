@@ -1,7 +1,6 @@
 """
 Here you go: GitHub organizations can be used in IGitt.
 """
-from functools import lru_cache
 from typing import Set
 from urllib.parse import quote_plus
 
@@ -11,6 +10,7 @@ from IGitt.GitHub import get
 from IGitt.GitHub.GitHubUser import GitHubUser
 from IGitt.Interfaces.Organization import Organization
 from IGitt.Interfaces.Repository import Repository
+from IGitt.Utils import memoized
 
 
 class GitHubOrganization(GitHubMixin, Organization):
@@ -85,7 +85,7 @@ class GitHubOrganization(GitHubMixin, Organization):
         return set()
 
     @property
-    @lru_cache(None)
+    @memoized()
     def repositories(self) -> Set[Repository]:
         """
         Returns the list of repositories contained in this organization.
@@ -1,7 +1,7 @@
 """
 Contains an object representation of a reaction on GitHub.
 """
-from functools import lru_cache
+from typing import Optional
 from typing import Union
 
 from IGitt.GitHub import get
@@ -12,6 +12,8 @@ from IGitt.Interfaces.Comment import Comment
 from IGitt.Interfaces.Issue import Issue
 from IGitt.Interfaces.MergeRequest import MergeRequest
 from IGitt.Interfaces.Reaction import Reaction
+from IGitt.Utils import clear_memo
+from IGitt.Utils import memoized
 
 
 PREVIEW_HEADER = {'Accept': 'application/vnd.github.squirrel-girl-preview'}
@@ -21,21 +23,39 @@ class GitHubReaction(GitHubMixin, Reaction):
     """
     A GitHub reaction, e.g. heart.
     """
-    @lru_cache(None)
     def _get_data(self):
         # Note: A GitHub reaction cannot be retrieved using a GET request, it
         # has to retrieved as a list and filtered for the match.
-        if not getattr(self, '_list', None):
-            setattr(self, '_list', get(self._token, self._url,
-                                       headers=PREVIEW_HEADER))
+        data = getattr(self, '_data', None)
+        if data is not None and data.fetched_at is not None:
+            # Renewing data that was retrieved, e.g. as it is stale
+            clear_memo(self._token, '_get_reactions')
+        reactions = self._get_reactions(self._token, self._url)
         try:
             return list(filter(lambda x: x['id'] == self._identifier,
-                               getattr(self, '_list')))[0]
+                               reactions))[0]
         except IndexError:
             raise RuntimeError({
                 'message': 'Not Found',
                 'documentation_url': 'https://developer.github.com/v3'}, 404)
 
+    @staticmethod
+    @memoized(ttl=60)
+    def _get_reactions(token: GitHubToken, url: str):
+        """
+        Lists the reactions at ``url``, shared by all reactions there.
+        """
+        return get(token, url, headers=PREVIEW_HEADER)
+
+    def invalidate(self, name: Optional[str]=None):
+        """
+        Drops memoized results, including the reaction listing unless only
+        another member is invalidated.
+        """
+        if name in (None, '_get_reactions'):
+            clear_memo(self._token, '_get_reactions')
+        super().invalidate(name)
+
     def __init__(self,
                  token: GitHubToken,
                  related: Union[Issue, MergeRequest, Comment],
@@ -8,7 +8,7 @@ from typing import Set
 from typing import Union
 
 from IGitt import ElementAlreadyExistsError, ElementDoesntExistError
-from IGitt.GitHub import delete, get, post, GitHubMixin, put
+from IGitt.GitHub import delete, get, get_lazy, post, GitHubMixin, put
 from IGitt.GitHub import GitHubToken
 from IGitt.GitHub import GitHubInstallationToken
 from IGitt.GitHub.GitHubIssue import GitHubIssue
@@ -19,6 +19,7 @@ from IGitt.Interfaces import MergeRequestStates
 from IGitt.Interfaces.Repository import Repository
 from IGitt.Interfaces.Repository import WebhookEvents
 from IGitt.Utils import eliminate_none
+from IGitt.Utils import primable
 
 
 GH_WEBHOOK_TRANSLATION = {
@@ -97,22 +98,17 @@ class GitHubRepository(GitHubMixin, Repository):
         """
         Retrieves the set of commits in this repository.
 
-        :return: A set of GitHubCommit objects.
+        :return: A LazyCollection of GitHubCommit objects.
         """
         # Don't move to module, leads to circular imports
         from IGitt.GitHub.GitHubCommit import GitHubCommit
 
-        try:
-            return {GitHubCommit.from_data(commit,
-                                           self._token,
-                                           self.full_name,
-                                           commit['sha'])
-                    for commit in get(self._token, self._url + '/commits')}
-        except RuntimeError as ex:
-            # Repository is empty. GitHub returns 409.
-            if ex.args[1] == 409:
-                return set()
-            raise ex  # dont cover, this is the real exception
+        # If the repository is empty, GitHub returns 409.
+        return get_lazy(self._token, self._url + '/commits',
+                        lambda commit: GitHubCommit.from_data(
+                            commit, self._token, self.full_name,
+                            commit['sha']),
+                        empty_on=(409,))
 
 
     @property
@@ -139,6 +135,7 @@ class GitHubRepository(GitHubMixin, Repository):
         return self.data['clone_url'].replace(
             url, self._token.value + '@' + url, 1)
 
+    @primable
     def get_labels(self):
         """
         Retrieves the labels of the repository.
@@ -154,7 +151,7 @@ class GitHubRepository(GitHubMixin, Repository):
         return {label['name']
                 for label in get(self._token, self._url + '/labels')}
 
-    def create_label(self, name: str, color: str):
+    def create_label(self, name: str, color: str, exist_ok: bool=False):
         """
         Creates a new label with the given color. For an example,
         see delete_label.
@@ -174,10 +171,17 @@ class GitHubRepository(GitHubMixin, Repository):
 
         :param name: The name of the label to create.
         :param color: A HTML color value with a leading #.
-        :raises ElementAlreadyExistsError: If the label name already exists.
+        :param exist_ok: Whether to leave an existing label alone instead of
+                         raising, without writing anything.
+        :raises ElementAlreadyExistsError: If the label name already exists
+                                           and exist_ok is False.
         :raises RuntimeError: If something goes wrong (network, auth...).
         """
+        # Checked against the current labels, not primed ones
+        self.invalidate('get_labels')
         if name in self.get_labels():
+            if exist_ok:
+                return
             raise ElementAlreadyExistsError(name + ' already exists.')
 
         self.data = post(
@@ -185,6 +189,7 @@ class GitHubRepository(GitHubMixin, Repository):
             self._url + '/labels',
             {'name': name, 'color': color.lstrip('#')}
         )
+        self.invalidate('get_labels')
 
     def delete_label(self, name: str):
         """
@@ -220,10 +225,13 @@ class GitHubRepository(GitHubMixin, Repository):
         :raises ElementDoesntExistError: If the label doesn't exist.
         :raises RuntimeError: If something goes wrong (network, auth...).
         """
+        # Checked against the current labels, not primed ones
+        self.invalidate('get_labels')
         if name not in self.get_labels():
             raise ElementDoesntExistError(name + ' doesnt exist.')
 
         delete(self._token, self._url + '/labels/' + name)
+        self.invalidate('get_labels')
 
     def get_issue(self, issue_number: int):
         """
@@ -354,8 +362,9 @@ class GitHubRepository(GitHubMixin, Repository):
         3
         """
         from IGitt.GitHub.GitHubMergeRequest import GitHubMergeRequest
-        return {GitHubMergeRequest(self._token, self.full_name, res['number'])
-                for res in get(self._token, self._url + '/pulls')}
+        return get_lazy(self._token, self._url + '/pulls',
+                        lambda res: GitHubMergeRequest.from_data(
+                            res, self._token, self.full_name, res['number']))
 
     def filter_issues(self, state: str='opened') -> set:
         """
@@ -364,10 +373,10 @@ class GitHubRepository(GitHubMixin, Repository):
         :param state: 'opened' or 'closed' or 'all'.
         """
         params = {'state': GH_ISSUE_STATE_TRANSLATION[state]}
-        return {GitHubIssue.from_data(res, self._token,
-                                      self.full_name, res['number'])
-                for res in get(self._token, self._url + '/issues', params)
-                if 'pull_request' not in res}
+        return get_lazy(self._token, self._url + '/issues',
+                        lambda res: GitHubIssue.from_data(
+                            res, self._token, self.full_name, res['number']),
+                        params, select=lambda res: 'pull_request' not in res)
 
     @property
     def issues(self) -> set:
@@ -464,10 +473,11 @@ class GitHubRepository(GitHubMixin, Repository):
             state: Union[MergeRequestStates, IssueStates, None]=None
     ):
         """
-        Search for issue based on type 'issue' or 'pr' and return a
-        list of issues.
+        Search for issue based on type 'issue' or 'pr' and return an
+        iterator over the issues. Any number of them is found by splitting
+        the search into time windows, see ``IGitt.GitHub.GitHubSearch``.
         """
-        from IGitt.GitHub.GitHub import GitHub
+        from IGitt.GitHub.GitHubSearch import search
         if state is None:
             query = ' type:' + issue_type + ' repo:' + self.full_name
         else:
@@ -478,19 +488,18 @@ class GitHubRepository(GitHubMixin, Repository):
                 (updated_after and updated_before)):
             raise RuntimeError(('Cannot process before '
                                 'and after date simultaneously'))
-        if created_after:
-            query += (' created:>=' +
-                      str(created_after.strftime('%Y-%m-%dT%H:%M:%SZ')))
-        elif created_before:
-            query += (' created:<' +
-                      str(created_before.strftime('%Y-%m-%dT%H:%M:%SZ')))
-        if updated_after:
-            query += (' updated:>=' +
-                      str(updated_after.strftime('%Y-%m-%dT%H:%M:%SZ')))
-        elif updated_before:
-            query += (' updated:<' +
-                      str(updated_before.strftime('%Y-%m-%dT%H:%M:%SZ')))
-        return list(GitHub.raw_search(self._token, query))
+        if created_after or created_before or not (updated_after or
+                                                   updated_before):
+            if updated_after:
+                query += (' updated:>=' +
+                          str(updated_after.strftime('%Y-%m-%dT%H:%M:%SZ')))
+            elif updated_before:
+                query += (' updated:<' +
+                          str(updated_before.strftime('%Y-%m-%dT%H:%M:%SZ')))
+            return search(self._token, query, 'created', created_after,
+                          created_before)
+        return search(self._token, query, 'updated', updated_after,
+                      updated_before)
 
     def search_mrs(self,
                    created_after: Optional[datetime]=None,
@@ -0,0 +1,238 @@
+"""
+Exhaustive searches for issues and pull requests on GitHub.
+
+The search API reports at most 1000 results per query. ``search`` splits a
+query into time windows on the ``created`` or ``updated`` field until every
+window stays below that, fetches the windows concurrently and yields the
+results as the windows complete::
+
+    for issue in search(token, 'repo:coala/coala type:issue is:closed'):
+        print(issue.number)
+
+Queries with at most 1000 results are sent unchanged, windows are only added
+when needed. The search rate limit is shared by all windows: once it is used
+up, requests wait for it to be reset.
+"""
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from datetime import date
+from datetime import datetime
+from datetime import timedelta
+from math import ceil
+from threading import Lock
+from time import sleep
+from time import time
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+from weakref import WeakKeyDictionary
+import logging
+import re
+
+from IGitt.GitHub import BASE_URL
+from IGitt.GitHub import GitHubToken
+from IGitt.GitHub.GitHubIssue import GitHubIssue
+from IGitt.GitHub.GitHubMergeRequest import GitHubMergeRequest
+from IGitt.Interfaces import _get_session
+from IGitt.Interfaces import _iter_pages
+from IGitt.Utils import as_naive_utc
+
+
+SEARCH_URL = '/search/issues'
+# The search API doesn't give more results for one query
+RESULT_LIMIT = 1000
+# Nothing on GitHub is older
+GITHUB_EPOCH = datetime(2008, 1, 1)
+ISSUE_URL_RE = re.compile(r'https://(?:.+)/(\S+)/(\S+)/(issues|pull)/(\d+)')
+
+# The search rate limit per token, shared by concurrent searches
+_QUOTAS = WeakKeyDictionary()
+_QUOTAS_LOCK = Lock()
+
+# A time window, an open end is None
+Window = Tuple[Optional[datetime], Optional[datetime]]
+
+
+class SearchQuota:
+    """
+    The state of the search rate limit of a token, taken from the headers of
+    search responses.
+    """
+
+    def __init__(self):
+        self.remaining = None  # type: Optional[int]
+        self.reset = 0.0
+        self._lock = Lock()
+
+    def acquire(self):
+        """
+        Takes a request from the quota, waiting for the reset if it's used
+        up.
+        """
+        with self._lock:
+            wait_for = 0.0
+            if self.remaining is not None and self.remaining <= 0:
+                wait_for = max(0.0, self.reset - time())
+                self.remaining = None
+            elif self.remaining is not None:
+                self.remaining -= 1
+            if wait_for:
+                # Holding the lock, so all searches wait
+                logging.info('Search rate limit used up, waiting %.0f seconds.',
+                             wait_for)
+                sleep(wait_for)
+
+    def update(self, headers):
+        """
+        Takes the quota from the headers of a search response.
+        """
+        with self._lock:
+            if 'X-RateLimit-Remaining' in headers:
+                self.remaining = int(headers['X-RateLimit-Remaining'])
+                self.reset = float(headers.get('X-RateLimit-Reset', 0))
+
+
+def _quota(token: GitHubToken) -> SearchQuota:
+    """
+    Retrieves the search quota of a token.
+    """
+    with _QUOTAS_LOCK:
+        if token not in _QUOTAS:
+            _QUOTAS[token] = SearchQuota()
+        return _QUOTAS[token]
+
+
+def _format(value: datetime) -> str:
+    """
+    Formats a time for search qualifiers.
+    """
+    return value.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _qualifier(field: str, window: Window) -> str:
+    """
+    Expresses a window as a search qualifier, the upper end is excluded.
+    """
+    after, before = window
+    if after is not None and before is not None:
+        return ' {}:{}..{}'.format(field, _format(after),
+                                   _format(before - timedelta(seconds=1)))
+    if after is not None:
+        return ' {}:>={}'.format(field, _format(after))
+    if before is not None:
+        return ' {}:<{}'.format(field, _format(before))
+    return ''
+
+
+def _split(window: Window, total: int) -> List[Window]:
+    """
+    Splits a window into enough parts for each to stay below the result
+    limit if the results were spread evenly. Parts holding more are split
+    again later. Windows of a second can't be split.
+    """
+    after = window[0] or GITHUB_EPOCH
+    before = window[1] or datetime.utcnow().replace(microsecond=0) + \
+        timedelta(minutes=1)
+    seconds = int((before - after).total_seconds())
+    parts = min(seconds, max(2, ceil(total * 1.25 / RESULT_LIMIT)))
+    if parts < 2:
+        return []
+
+    bounds = [after + timedelta(seconds=seconds * part // parts)
+              for part in range(parts)] + [before]
+    return list(zip(bounds, bounds[1:]))
+
+
+def _fetch_window(token: GitHubToken, query: str, field: Optional[str],
+                  window: Window) -> Tuple[List[dict], List[Window]]:
+    """
+    Retrieves the results of the query in a window.
+
+    :return: The results or, if the window holds too many, the windows to
+             search instead.
+    """
+    quota = _quota(token)
+    if field is not None:
+        query += _qualifier(field, window)
+    session = _get_session(token, {'q': query, 'per_page': 100})
+    items = []  # type: List[dict]
+    pages = _iter_pages(session.get, BASE_URL + SEARCH_URL)
+    while True:
+        quota.acquire()
+        page = next(pages, None)
+        if page is None:
+            return items, []
+        quota.update(page.headers)
+        result = page.json()
+
+        if not items and field and result['total_count'] > RESULT_LIMIT:
+            windows = _split(window, result['total_count'])
+            if windows:
+                return [], windows
+            logging.warning('Search for %r yields more than %d results within '
+                            'a second, some are left out.', query,
+                            RESULT_LIMIT)
+        items.extend(result['items'])
+
+
+def _make_result(token: GitHubToken, item: dict
+                ) -> Union[GitHubIssue, GitHubMergeRequest]:
+    """
+    Creates the issue or pull request of a search result.
+    """
+    user, repo, item_type, item_number = ISSUE_URL_RE.match(
+        item['html_url']).groups()
+    if item_type == 'pull':
+        return GitHubMergeRequest.from_data(item, token, user + '/' + repo,
+                                            int(item_number))
+    return GitHubIssue.from_data(item, token, user + '/' + repo,
+                                 int(item_number))
+
+
+def search(token: GitHubToken, query: str, field: Optional[str]='created',
+           after: Union[date, datetime, None]=None,
+           before: Union[date, datetime, None]=None,
+           max_workers: int=4) -> Iterator[Union[GitHubIssue,
+                                                 GitHubMergeRequest]]:
+    """
+    Searches issues and pull requests without the limit of 1000 results.
+
+    Search syntax reference at
+    https://help.github.com/articles/understanding-the-search-syntax/
+
+    :param token:       A GitHubToken object to use for authentication.
+    :param query:       The search query, without a qualifier on ``field``.
+    :param field:       ``created`` or ``updated``, the field to split the
+                        query on. None to send the query as it is, which gives
+                        1000 results at most.
+    :param after:       Only results where ``field`` is at or after this.
+    :param before:      Only results where ``field`` is before this.
+    :param max_workers: The number of windows searched at once.
+    :return: An iterator over GitHubIssue and GitHubMergeRequest objects, in
+             no particular order. Each result comes once, even if it moved
+             to another window while searching.
+    :raises RuntimeError: If something goes wrong (network, auth...).
+    """
+    seen = set()
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    pending = {executor.submit(_fetch_window, token, query, field,
+                               (as_naive_utc(after), as_naive_utc(before)))}
+    try:
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                items, windows = future.result()
+                pending |= {executor.submit(_fetch_window, token, query,
+                                            field, window)
+                            for window in windows}
+                for item in items:
+                    if item['url'] not in seen:
+                        seen.add(item['url'])
+                        yield _make_result(token, item)
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
@@ -6,6 +6,12 @@ from datetime import datetime
 from datetime import timedelta
 from typing import Optional
 from typing import Callable
+from typing import Dict
+from typing import Iterator
+from typing import MutableMapping
+from typing import Tuple
+from threading import Lock
+from threading import Thread
 import os
 import logging
 import time
@@ -13,7 +19,7 @@ import requests
 
 import jwt
 
-from IGitt.Interfaces import _fetch, Token
+from IGitt.Interfaces import _fetch, _stream_lines, LazyCollection, Token
 from IGitt.Utils import CachedDataMixin
 
 
@@ -86,29 +92,53 @@ class GitHubToken(Token):
 
 class GitHubJsonWebToken(Token):
     """
-    Object representation of JSON Web Token.
+    Object representation of JSON Web Token. A JWT is signed once and used
+    until shortly before it expires, then a new one is signed.
     """
+    # Seconds before expiry when a new JWT is signed
+    RENEW_BEFORE = 60
+
     def __init__(self, private_key: str, app_id: int):
         self._key = private_key.strip()
         self._app_id = app_id
         self._payload = None
         self._jwt_token = None
+        self._lock = Lock()
+
+    def __getstate__(self):
+        """
+        Leaves the lock out, it can't be pickled.
+        """
+        state = super().__getstate__()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        """
+        Restores a pickled token with a fresh lock.
+        """
+        vars(self).update(state)
+        self._lock = Lock()
 
     @property
     def payload(self):
         """
-        Returns the payload to be sent for JWT encoding.
+        Returns the payload to be sent for JWT encoding, a new one if the last
+        is about to expire.
         """
-        if not self._payload:
+        now = datetime.now().timestamp()
+        if (not self._payload or
+                self._payload['exp'] - self.RENEW_BEFORE < now):
             self._payload = {
                 # issued at time
-                'iat': int(datetime.now().timestamp()),
+                'iat': int(now),
                 # JWT expiration time (10 minute maximum), minus 5 seconds just
                 # to be sure and cover up the request time
-                'exp': int(datetime.now().timestamp() + (10 * 60) - 5),
+                'exp': int(now + (10 * 60) - 5),
                 # GitHub App's identifier
                 'iss': self._app_id
             }
+            self._jwt_token = None
         return self._payload
 
     # testing over recorded requests is unadvisable as it is dependent on the
@@ -136,24 +166,199 @@ class GitHubJsonWebToken(Token):
 
     @property
     def value(self):
-        if not self._jwt_token or self.is_expired:
-            self._jwt_token = jwt.encode(self.payload, self._key, 'RS256')
-        return self._jwt_token.decode('utf-8')
+        with self._lock:
+            payload = self.payload
+            if not self._jwt_token:
+                encoded = jwt.encode(payload, self._key, 'RS256')
+                # PyJWT before 2.0 returns bytes
+                self._jwt_token = (encoded.decode('utf-8')
+                                   if isinstance(encoded, bytes) else encoded)
+            return self._jwt_token
+
+
+class InstallationTokenManager:
+    """
+    Caches the access tokens of GitHub App installations by installation id,
+    for all GitHubInstallationToken objects using it. A token is refreshed in
+    the background shortly before it expires, while the old one is still
+    used, and synchronously once it has expired. Concurrent refreshes of the
+    same installation are done once, a failed background refresh is retried
+    after ``retry_after`` seconds.
+
+    The tokens are shared by the threads of one process. Sharing them across
+    processes would need a store with its own locking.
+    """
+
+    def __init__(self, store: Optional[MutableMapping]=None,
+                 refresh_before: timedelta=timedelta(minutes=5),
+                 retry_after: float=30):
+        """
+        :param store:          Maps installation ids, as strings, to tokens
+                               and their expiry in UTC. A dict by default.
+        :param refresh_before: How long before expiry tokens are refreshed.
+        :param retry_after:    Seconds after which a failed background
+                               refresh is tried again.
+        """
+        self._store = {} if store is None else store
+        self._refresh_before = refresh_before
+        self._retry_after = retry_after
+        self._lock = Lock()
+        self._refreshing = {}  # type: Dict[int, Lock]
+        # The latest background refresh and failure per installation
+        self._threads = {}  # type: Dict[int, Thread]
+        self._failed_at = {}  # type: Dict[int, float]
+
+    def get(self, installation_id: int, jwt_token: GitHubJsonWebToken
+           ) -> Tuple[str, datetime]:
+        """
+        Retrieves a valid token of an installation, refreshing it if needed.
+
+        :param installation_id: The id of the installation.
+        :param jwt_token:       The JWT of the app to request tokens with.
+        :return: The token and its expiry in UTC.
+        :raises RuntimeError: If something goes wrong (network, auth...).
+        """
+        cached = self.cached(installation_id)
+        if cached is not None:
+            if cached[1] - self._refresh_before < datetime.utcnow():
+                self._refresh_in_background(installation_id, jwt_token,
+                                            cached)
+            return cached
+        return self._refresh(installation_id, jwt_token, None)
+
+    def _refresh_in_background(self, installation_id: int,
+                               jwt_token: GitHubJsonWebToken,
+                               seen: Tuple[str, datetime]):
+        """
+        Starts refreshing a token in a background thread, unless that happens
+        already or the last attempt failed less than ``retry_after`` seconds
+        ago.
+        """
+        with self._lock:
+            thread = self._threads.get(installation_id)
+            if thread is not None and thread.is_alive():
+                return
+            failed_at = self._failed_at.get(installation_id)
+            if (failed_at is not None and
+                    time.monotonic() - failed_at < self._retry_after):
+                return
+            thread = Thread(target=self._refresh, daemon=True,
+                            args=(installation_id, jwt_token, seen))
+            self._threads[installation_id] = thread
+        thread.start()
+
+    def cached(self, installation_id: int) -> Optional[Tuple[str, datetime]]:
+        """
+        Retrieves the stored token of an installation unless it's expired.
+        """
+        with self._lock:
+            cached = self._store.get(str(installation_id))
+        if cached is None or cached[1] < datetime.utcnow():
+            return None
+        return tuple(cached)
+
+    def put(self, installation_id: int, token: str, expiry: datetime):
+        """
+        Stores a token of an installation, unless a longer valid one is
+        stored.
+        """
+        with self._lock:
+            cached = self._store.get(str(installation_id))
+            if cached is None or cached[1] < expiry:
+                self._store[str(installation_id)] = (token, expiry)
+
+    def invalidate(self, installation_id: int):
+        """
+        Drops the token of an installation, e.g. after it was revoked.
+        """
+        with self._lock:
+            self._store.pop(str(installation_id), None)
+
+    def _refresh(self, installation_id: int, jwt_token: GitHubJsonWebToken,
+                 seen: Optional[Tuple[str, datetime]]) -> Tuple[str, datetime]:
+        """
+        Requests a new token, unless another thread got one since ``seen``
+        was read. Errors in background refreshes are left for the
+        synchronous refresh once the token expired.
+        """
+        with self._lock:
+            lock = self._refreshing.setdefault(installation_id, Lock())
+        if seen is not None and not lock.acquire(blocking=False):
+            return seen  # Already being refreshed in the background
+        elif seen is None:
+            lock.acquire()
+
+        try:
+            cached = self.cached(installation_id)
+            if cached is not None and cached != seen:
+                return cached
+            data = post(jwt_token,
+                        '/installations/{}/access_tokens'.format(
+                            installation_id),
+                        {})
+            expiry = datetime.strptime(data['expires_at'],
+                                       '%Y-%m-%dT%H:%M:%SZ')
+            self.put(installation_id, data['token'], expiry)
+            with self._lock:
+                self._failed_at.pop(installation_id, None)
+            return data['token'], expiry
+        except RuntimeError:
+            if seen is None:
+                raise
+            logging.warning('Refreshing the token of installation %s failed.',
+                            installation_id, exc_info=True)
+            with self._lock:
+                self._failed_at[installation_id] = time.monotonic()
+            return seen
+        finally:
+            lock.release()
+
+
+# Shared by all GitHubInstallationToken objects unless they get another one
+INSTALLATION_TOKENS = InstallationTokenManager()
 
 
 class GitHubInstallationToken(Token):
     """
-    Object representation of GitHub Installation Token.
+    Object representation of GitHub Installation Token. The tokens are
+    shared by all objects of the same installation, see
+    ``InstallationTokenManager``.
     """
     def __init__(self,
                  installation_id: int,
                  jwt_token: GitHubJsonWebToken,
                  token: Optional[str]=None,
-                 expiry: Optional[datetime]=None):
+                 expiry: Optional[datetime]=None,
+                 manager: Optional[InstallationTokenManager]=None):
+        """
+        :param installation_id: The id of the installation.
+        :param jwt_token:       The JWT of the app.
+        :param token:           A token of the installation known already.
+        :param expiry:          The expiry of ``token`` in UTC.
+        :param manager:         The manager caching the tokens,
+                                ``INSTALLATION_TOKENS`` by default.
+        """
         self._jwt = jwt_token
-        self._expiry = expiry
-        self._token = token
         self._id = installation_id
+        self._manager = manager or INSTALLATION_TOKENS
+        if token and expiry:
+            self._manager.put(installation_id, token, expiry)
+
+    def __getstate__(self):
+        """
+        Leaves the manager out, its locks and threads can't be pickled.
+        """
+        state = super().__getstate__()
+        del state['_manager']
+        return state
+
+    def __setstate__(self, state):
+        """
+        Restores a pickled token using ``INSTALLATION_TOKENS``, which gets a
+        new token of the installation if it has none yet.
+        """
+        vars(self).update(state)
+        self._manager = INSTALLATION_TOKENS
 
     @property
     def jwt(self):
@@ -174,22 +379,11 @@ class GitHubInstallationToken(Token):
         """
         Returns true if the token has expired.
         """
-        if not self._expiry:
-            return True
-        return datetime.utcnow() > self._expiry
-
-    def _get_new_token(self):
-        data = post(self._jwt,
-                    '/installations/{}/access_tokens'.format(self._id),
-                    {})
-        return data['token'], datetime.strptime(data['expires_at'],
-                                                '%Y-%m-%dT%H:%M:%SZ')
+        return self._manager.cached(self._id) is None
 
     @property
     def value(self):
-        if self.is_expired or not self._token:
-            self._token, self._expiry = self._get_new_token()
-        return self._token
+        return self._manager.get(self._id, self._jwt)[0]
 
     @property
     def parameter(self):
@@ -222,6 +416,55 @@ def get(token: Token,
                   url, query_params={**dict(params or {}), 'per_page': 100},
                   headers=headers)
 
+
+def get_lines(token: Token, url: str, params: Optional[dict]=None,
+              headers: Optional[dict]=None) -> Iterator[str]:
+    """
+    Queries GitHub on the given URL for text and yields it line by line while
+    it arrives, e.g. a large diff.
+
+    :param token: A Token object.
+    :param url: E.g. ``/repos/a/b/commits/abc``
+    :param params: The query params to be sent.
+    :param headers: The request headers to be sent, e.g. ``Accept``.
+    :return: An iterator over the lines, without line ends.
+    :raises RuntimeError: If the response indicates any problem.
+    """
+    return _stream_lines(BASE_URL, token, url,
+                         {**dict(params or {}), 'per_page': 100}, headers)
+
+
+def _order_params(field: str, descending: bool) -> dict:
+    """
+    Builds the query parameters to order a GitHub listing.
+    """
+    return {'sort': field, 'direction': 'desc' if descending else 'asc'}
+
+
+def get_lazy(token: Token,
+             url: str,
+             make: Callable,
+             params: Optional[dict]=None,
+             headers: Optional[dict]=None,
+             select: Optional[Callable]=None,
+             empty_on: Tuple[int, ...]=()) -> LazyCollection:
+    """
+    Like ``get``, but returns a LazyCollection of the objects built by
+    ``make`` from the listed items, requesting pages only when needed.
+
+    :param token: A Token object.
+    :param url: E.g. ``/repos/a/b/issues``
+    :param make: Builds an IGitt object from the data of an item.
+    :param params: The query params to be sent.
+    :param headers: The request headers to be sent.
+    :param select: Tells which items to include, if not all.
+    :param empty_on: Status codes meaning that there are no items.
+    """
+    return LazyCollection(BASE_URL, token, url, make,
+                          {**dict(params or {}), 'per_page': 100}, headers,
+                          select, _order_params, empty_on)
+
+
 async def lazy_get(url: str,
                    callback: Callable,
                    headers: Optional[dict]=None,
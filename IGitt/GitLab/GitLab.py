@@ -5,7 +5,8 @@ Contains the Hoster implementation for GitLab.
 from typing import List, Union
 import logging
 
-from IGitt.GitLab import get, GitLabOAuthToken, GitLabPrivateToken, GitLabMixin
+from IGitt.GitLab import get, GitLabOAuthToken, GitLabPrivateToken
+from IGitt.GitLab import GitLabMixin
 from IGitt.GitLab.GitLabComment import GitLabComment
 from IGitt.GitLab.GitLabCommit import GitLabCommit
 from IGitt.GitLab.GitLabIssue import GitLabIssue
@@ -14,12 +15,33 @@ from IGitt.Interfaces import AccessLevel
 from IGitt.Interfaces.Actions import IssueActions, MergeRequestActions, \
     PipelineActions
 from IGitt.Interfaces.Comment import CommentType
-from IGitt.Interfaces.Hoster import Hoster
+from IGitt.Interfaces.Hoster import Hoster, RepositoryInventory
 from IGitt.GitLab.GitLabRepository import GitLabRepository
+from IGitt.GitLab.GitLabUser import GitLabUser
 
 LOGGER = logging.getLogger(__name__)
 LOGGER.setLevel(logging.DEBUG)
 
+GL_VISIBILITY_LEVELS = {0: 'private', 10: 'internal', 20: 'public'}
+
+
+def _project_data(project: dict) -> dict:
+    """
+    Converts the data of a project in a webhook payload to the format of the
+    API, leaving out everything that's different there.
+    """
+    data = {key: project[key]
+            for key in ('id', 'name', 'description', 'web_url',
+                        'path_with_namespace', 'default_branch')
+            if key in project}
+    if 'git_http_url' in project:
+        data['http_url_to_repo'] = project['git_http_url']
+    if 'git_ssh_url' in project:
+        data['ssh_url_to_repo'] = project['git_ssh_url']
+    if project.get('visibility_level') in GL_VISIBILITY_LEVELS:
+        data['visibility'] = GL_VISIBILITY_LEVELS[project['visibility_level']]
+    return data
+
 
 class GitLab(GitLabMixin, Hoster):
     """
@@ -34,6 +56,20 @@ class GitLab(GitLabMixin, Hoster):
         """
         self._token = token
         self._url = '/'
+        # The authenticated user, whose projects are the owned ones
+        self._user = GitLabUser(token)
+        self._inventory = RepositoryInventory(
+            lambda: get(self._token, '/projects', {'membership': True}),
+            lambda repo: GitLabRepository.from_data(
+                repo, self._token, repo['path_with_namespace']))
+
+    @property
+    def inventory(self) -> RepositoryInventory:
+        """
+        The projects the user is a member of, which ``master_repositories``
+        and ``write_repositories`` are selected from.
+        """
+        return self._inventory
 
     @staticmethod
     def _get_repos_with_permissions(repo_list: List[GitLabRepository],
@@ -45,17 +81,16 @@ class GitLab(GitLabMixin, Hoster):
         # namespaces with permission or greater access level
         namespaces = set()
 
-        # normalize access_levels
-        for repo in repo_list:
-            if not repo['permissions']['project_access']:
-                repo['permissions']['project_access'] = {'access_level': 0}
-            if not repo['permissions']['group_access']:
-                repo['permissions']['group_access'] = {'access_level': 0}
+        def access_level(repo, kind):
+            """
+            Retrieves the access level of the user, 0 if there is none. The
+            data isn't changed, it's shared by the inventory.
+            """
+            return (repo['permissions'][kind] or {}).get('access_level', 0)
 
         # groups with access_level > permission
         to_check = [proj['namespace']['id'] for proj in repo_list if
-                    proj['permissions']['group_access'].get(
-                        'access_level', 0) >= permission.value]
+                    access_level(proj, 'group_access') >= permission.value]
 
         # finding subgroups
         for namespace in to_check:
@@ -66,20 +101,16 @@ class GitLab(GitLabMixin, Hoster):
 
         return [repo for repo in repo_list
                 if repo['namespace']['id'] in namespaces or
-                repo['permissions']['project_access'].get(
-                    'access_level', 0) >= permission.value]
+                access_level(repo, 'project_access') >= permission.value]
 
     @property
     def master_repositories(self):
         """
         Retrieves repositories the user has admin access to.
         """
-        repo_list = get(self._token, '/projects', {'membership': True})
-        return {GitLabRepository.from_data(repo, self._token,
-                                           repo['path_with_namespace'])
-                for repo in
-                self._get_repos_with_permissions(repo_list,
-                                                 AccessLevel.ADMIN)}
+        return self._inventory.view(
+            'master', lambda repos: self._get_repos_with_permissions(
+                repos, AccessLevel.ADMIN))
 
     @property
     def owned_repositories(self):
@@ -93,10 +124,19 @@ class GitLab(GitLabMixin, Hoster):
 
         :return: A set of GitLabRepository objects.
         """
-        repo_list = get(self._token, '/projects', {'owned': True})
-        return {GitLabRepository.from_data(repo, self._token,
-                                           repo['path_with_namespace'])
-                for repo in repo_list}
+        username = self._user.username
+
+        def select(repos):
+            """
+            Selects the projects in the namespace of the user and the ones
+            the user is an owner of, like ``owned`` does.
+            """
+            owned = self._get_repos_with_permissions(repos, AccessLevel.OWNER)
+            return owned + [repo for repo in repos
+                            if repo['namespace']['kind'] == 'user' and
+                            repo['namespace']['path'] == username]
+
+        return self._inventory.view('owned', select)
 
     @property
     def write_repositories(self):
@@ -110,13 +150,9 @@ class GitLab(GitLabMixin, Hoster):
 
         :return: A set of GitLabRepository objects.
         """
-        repo_list = get(self._token, '/projects', {'membership': True})
-        return {GitLabRepository.from_data(repo, self._token,
-                                           repo['path_with_namespace'])
-                for repo in
-                self._get_repos_with_permissions(
-                    repo_list,
-                    AccessLevel.CAN_WRITE)}
+        return self._inventory.view(
+            'write', lambda repos: self._get_repos_with_permissions(
+                repos, AccessLevel.CAN_WRITE))
 
     def get_repo(self, repository) -> GitLabRepository:
         """
@@ -183,11 +219,46 @@ class GitLab(GitLabMixin, Hoster):
             yield actions_enum.UNLABELED, [obj_to_return, label]
 
 
+    def _prime_repository(self, data, repository, *objects):
+        """
+        Lets the given objects return the repository from the webhook payload
+        instead of retrieving it.
+        """
+        project = (data.get('project') or
+                   data.get('object_attributes', {}).get('target'))
+        if project is None:
+            return
+
+        repository_obj = GitLabRepository.from_data(
+            _project_data(project), self._token, repository)
+        for obj in objects:
+            obj.prime('repository', repository_obj)
+
+    def _prime_merge_request(self, merge_request_obj, merge_request_data):
+        """
+        Lets the merge request return its source repository and head commit
+        from the webhook payload instead of retrieving them.
+        """
+        source_data = _project_data(merge_request_data.get('source', {}))
+        source_name = source_data.get('path_with_namespace')
+        if 'source_project_id' in merge_request_data:
+            source_obj = GitLabRepository.from_data(
+                source_data, self._token,
+                str(merge_request_data['source_project_id']))
+            merge_request_obj.prime('source_repository', source_obj)
+            source_name = source_name or source_obj.full_name
+
+        if 'last_commit' in merge_request_data and source_name:
+            commit = merge_request_data['last_commit']
+            merge_request_obj.prime('head', GitLabCommit.from_data(
+                commit, self._token, source_name, commit['id']))
+
     def _handle_webhook_issue(self, data, repository):
         issue = data['object_attributes']
         issue_obj = GitLabIssue.from_data(
             issue,
             self._token, repository, issue['iid'])
+        self._prime_repository(data, repository, issue_obj)
         trigger_event = {
             'open': IssueActions.OPENED,
             'close': IssueActions.CLOSED,
@@ -209,6 +280,8 @@ class GitLab(GitLabMixin, Hoster):
             self._token,
             repository,
             merge_request_data['iid'])
+        self._prime_repository(data, repository, merge_request_obj)
+        self._prime_merge_request(merge_request_obj, merge_request_data)
         trigger_event = {
             'update': MergeRequestActions.ATTRIBUTES_CHANGED,
             'open': MergeRequestActions.OPENED,
@@ -247,6 +320,7 @@ class GitLab(GitLabMixin, Hoster):
             iid = data['merge_request']['iid']
             iss = GitLabMergeRequest.from_data(data['merge_request'],
                                                self._token, repository, iid)
+            self._prime_merge_request(iss, data['merge_request'])
             action = MergeRequestActions.COMMENTED
         elif comment_type == CommentType.ISSUE:
             iid = data['issue']['iid']
@@ -256,16 +330,17 @@ class GitLab(GitLabMixin, Hoster):
         else:
             raise NotImplementedError
 
-        yield action, [iss, GitLabComment.from_data(
+        comment_obj = GitLabComment.from_data(
             comment,
-            self._token, repository, iid, comment_type, comment['id']
-        )]
+            self._token, repository, iid, comment_type, comment['id'])
+        self._prime_repository(data, repository, iss, comment_obj)
+        yield action, [iss, comment_obj]
 
     def _handle_webhook_pipeline(self, data, repository):
-        yield PipelineActions.UPDATED, [GitLabCommit(
-            self._token,
-            repository,
-            data['commit']['id'])]
+        commit_obj = GitLabCommit.from_data(
+            data['commit'], self._token, repository, data['commit']['id'])
+        self._prime_repository(data, repository, commit_obj)
+        yield PipelineActions.UPDATED, [commit_obj]
 
     def handle_webhook(self, event: str, data: dict):
         """
@@ -291,4 +366,4 @@ class GitLab(GitLabMixin, Hoster):
         except AttributeError:
             raise NotImplementedError('Given webhook cannot be handled yet.')
         else:
-            yield from handler(data, repository)
+            yield from self._invalidating(handler(data, repository))
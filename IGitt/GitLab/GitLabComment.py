@@ -10,6 +10,10 @@ from IGitt.GitLab import GitLabOAuthToken, GitLabPrivateToken
 from IGitt.GitLab.GitLabUser import GitLabUser
 from IGitt.Interfaces.Comment import Comment
 from IGitt.Interfaces.Comment import CommentType
+from IGitt.Utils import memoized
+from IGitt.Utils import object_field
+from IGitt.Utils import Record
+from IGitt.Utils import timestamp_field
 
 
 class GitLabComment(GitLabMixin, Comment):
@@ -17,6 +21,12 @@ class GitLabComment(GitLabMixin, Comment):
     Represents a comment (or note as GitLab folks call it), with mainly a body
     and an author, which can ofcourse be deleted.
     """
+    record_class = Record.define(
+        'GitLabCommentRecord',
+        created=timestamp_field('created_at'),
+        updated=timestamp_field('updated_at'),
+        author=object_field('author', lambda note, user: GitLabUser.from_data(
+            user, note._token, user['id'])))
 
     def __init__(self, token: Union[GitLabOAuthToken, GitLabPrivateToken],
                  repository: str, iid: str, comment_type: CommentType,
@@ -81,9 +91,7 @@ class GitLabComment(GitLabMixin, Comment):
 
         :return: A GitLabUser object.
         """
-        return GitLabUser.from_data(self.data['author'],
-                                    self._token,
-                                    self.data['author']['id'])
+        return self.record.author
 
     @property
     def body(self) -> str:
@@ -123,8 +131,7 @@ class GitLabComment(GitLabMixin, Comment):
         >>> note.created
         datetime.datetime(2017, 6, 5, 5, 20, 28, 418000)
         """
-        return datetime.strptime(self.data['created_at'],
-                                 '%Y-%m-%dT%H:%M:%S.%fZ')
+        return self.record.created
 
     @property
     def updated(self) -> datetime:
@@ -138,8 +145,7 @@ class GitLabComment(GitLabMixin, Comment):
         >>> note.updated
         datetime.datetime(2017, 6, 5, 6, 5, 34, 491000)
         """
-        return datetime.strptime(self.data['updated_at'],
-                                 '%Y-%m-%dT%H:%M:%S.%fZ')
+        return self.record.updated
 
     def delete(self):
         """
@@ -148,6 +154,7 @@ class GitLabComment(GitLabMixin, Comment):
         delete(self._token, self._url)
 
     @property
+    @memoized()
     def repository(self):
         """
         Returns the GitLab repository this comment was posted in, as a
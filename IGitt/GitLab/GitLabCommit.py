@@ -7,14 +7,15 @@ from typing import Union
 from urllib.parse import quote_plus
 
 from IGitt import ElementDoesntExistError
-from IGitt.GitHub.GitHubCommit import get_diff_index
-from IGitt.GitLab import get, post, GitLabMixin
+from IGitt.GitLab import get, get_items, post, GitLabMixin
 from IGitt.GitLab import GitLabOAuthToken, GitLabPrivateToken
 from IGitt.GitLab.GitLabComment import GitLabComment
 from IGitt.GitLab.GitLabRepository import GitLabRepository
 from IGitt.Interfaces.Comment import CommentType
 from IGitt.Interfaces.Commit import Commit
 from IGitt.Interfaces.CommitStatus import Status, CommitStatus
+from IGitt.Interfaces.Diff import FileDiff
+from IGitt.Utils import memoized
 
 GL_STATE_TRANSLATION = {
     Status.RUNNING: 'running',
@@ -86,6 +87,7 @@ class GitLabCommit(GitLabMixin, Commit):
         return self._sha if self._sha else self.data['id']
 
     @property
+    @memoized()
     def repository(self):
         """
         Retrieves the repository that holds this commit.
@@ -144,24 +146,22 @@ class GitLabCommit(GitLabMixin, Commit):
                     status['target_url']))
                 contexts.add(status['name'])
 
+        self._remember_statuses(result)
         return result
 
-    @property
-    def combined_status(self) -> Status:
+    def _get_combined_status(self) -> Status:
+        """
+        Retrieves the combined status from the hoster.
         """
-        Retrieves a combined status of all the commits.
-
-        :return:
-            Status.FAILED if any of the commits report as error or failure or
-            canceled
-            Status.PENDING if there are no statuses or a commit is pending or a
-            test is running
-            Status.SUCCESS if the latest status for all commits is success
-        :raises AssertionError:
-            If the status couldn't be matched with any of the possible outcomes
-            Status.SUCCESS, Status.FAILED and Status.PENDING.
+        return self.combine_statuses(
+            set(map(lambda status: status.status, self.get_statuses())))
+
+    @staticmethod
+    def combine_statuses(statuses: Set[Status]) -> Status:
+        """
+        Combines the latest statuses of all contexts of a commit, see
+        ``combined_status``. Skipped ones don't fail a commit.
         """
-        statuses = set(map(lambda status: status.status, self.get_statuses()))
         if (
                 not len(statuses) or
                 Status.PENDING in statuses or
@@ -173,7 +173,7 @@ class GitLabCommit(GitLabMixin, Commit):
                 Status.ERROR in statuses or
                 Status.CANCELED in statuses):
             return Status.FAILED
-        assert all(status in {Status.SUCCESS, Status.MANUAL}
+        assert all(status in {Status.SUCCESS, Status.MANUAL, Status.SKIPPED}
                    for status in statuses)
         return Status.SUCCESS
 
@@ -206,12 +206,25 @@ class GitLabCommit(GitLabMixin, Commit):
         :param status: The CommitStatus to set to this commit.
         :raises RuntimeError: If something goes wrong (network, auth...).
         """
+        if self._has_status(status, GL_STATE_TRANSLATION):
+            return
+
         data = {'state': GL_STATE_TRANSLATION[status.status],
                 'target_url': status.url, 'description': status.description,
                 'name': status.context}
         status_url = '/projects/{repo}/statuses/{sha}'.format(
             repo=quote_plus(self._repository), sha=self.sha)
         post(self._token, status_url, data)
+        self._forget_combined_status()
+        self._remember_status(status)
+
+    def _final_status_key(self):
+        # Branches move, only commits known by SHA keep their status
+        return self.url if self._sha else None
+
+    def _drop_cached_state(self):
+        GitLabMixin._drop_cached_state(self)
+        self._statuses = None
 
     def get_patch_for_file(self, filename: str):
         r"""
@@ -237,13 +250,14 @@ class GitLabCommit(GitLabMixin, Commit):
         :return: A string containing the patch.
         :raises ElementDoesntExistError: If the given filename does not exist.
         """
-        diff = get(self._token, self._url + '/diff')
-
-        for patch in diff:
-            if filename in (patch['new_path'], patch['old_path']):
-                return patch['diff']
+        return self.diff_index.patch(filename)
 
-        raise ElementDoesntExistError('The file does not exist.')
+    def iter_diff(self):
+        for patch in get_items(self._token, self._url + '/diff'):
+            yield FileDiff(
+                None if patch.get('new_file') else patch['old_path'],
+                None if patch.get('deleted_file') else patch['new_path'],
+                patch['diff'])
 
     def comment(self, message: str, file: Optional[str]=None,
                 line: Optional[int]=None,
@@ -300,8 +314,7 @@ class GitLabCommit(GitLabMixin, Commit):
 
         if file is not None and line is not None:
             try:
-                patch = self.get_patch_for_file(file)
-                index = get_diff_index(patch, line)
+                index = self.diff_index.position(file, line)
                 if index:  # Else, fallback to comment below file
                     data['line'] = index
                     data['path'] = file
@@ -337,6 +350,4 @@ class GitLabCommit(GitLabMixin, Commit):
         """
         Retrieves the unified diff for the commit excluding the diff index.
         """
-        return '\n'.join(patch['diff']
-                         for patch in get(self._token, self._url + '/diff')
-                        )
+        return '\n'.join(file.text for file in self.diff)
@@ -0,0 +1,361 @@
+"""
+Bulk reads through the GitLab GraphQL API.
+
+Many issues or merge requests are retrieved with one query per batch, using
+an alias per object. The results are the usual GitLabIssue and
+GitLabMergeRequest objects with their data and related objects filled in, so
+accessing them needs no further requests::
+
+    mrs = get_merge_requests(token, [('gitmate-test-user/test', 2)])
+    for mr in mrs:
+        print(mr.title, mr.labels, mr.diffstat, mr.tests_passed)
+
+Connections holding more than a page of nodes are completed with further
+queries. Anything not retrieved here, e.g. the affected files, which GraphQL
+only offers by their new paths, is still read over REST when accessed.
+
+GitLab limits the complexity of every query, hence the batch sizes.
+"""
+from collections import OrderedDict
+from functools import partial
+from json import dumps
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+from IGitt.GitLab import GL_INSTANCE_URL
+from IGitt.GitLab import GitLabOAuthToken, GitLabPrivateToken
+from IGitt.GitLab.GitLabCommit import GitLabCommit
+from IGitt.GitLab.GitLabCommit import INV_GL_STATE_TRANSLATION
+from IGitt.GitLab.GitLabIssue import GitLabIssue
+from IGitt.GitLab.GitLabMergeRequest import GitLabMergeRequest
+from IGitt.GitLab.GitLabRepository import GitLabRepository
+from IGitt.Interfaces import _fetch
+from IGitt.Interfaces import batched_graphql
+from IGitt.Interfaces.CommitStatus import Status
+
+
+GRAPHQL_URL = GL_INSTANCE_URL + '/api/graphql'
+
+# The number of nodes retrieved per page of a connection, GitLab's maximum
+PAGE_SIZE = 100
+
+# The fields of the nodes of the connections read, by connection
+CONNECTION_FIELDS = {
+    'labels': 'title',
+    'assignees': 'id username',
+    'commits': 'sha message',
+}
+
+# Selects the statuses of a commit, from all of its pipelines like the REST
+# statuses listing. Commits with more pipelines or jobs are left to REST.
+STATUSES_SELECTION = """
+  pipelines(sha: {}, first: 20) {{
+    nodes {{ jobs(first: 100) {{
+      nodes {{ name status }} pageInfo {{ hasNextPage }} }} }}
+    pageInfo {{ hasNextPage }}
+  }}
+"""
+
+
+def _connection(name: str, after: Optional[str]=None) -> str:
+    """
+    Selects a page of the connection ``name``.
+
+    :param after: The cursor of the previous page, None for the first page.
+    """
+    return '{}(first: {}{}) {{ nodes {{ {} }} {} }}'.format(
+        name, PAGE_SIZE,
+        '' if after is None else ', after: {}'.format(dumps(after)),
+        CONNECTION_FIELDS[name], 'pageInfo { hasNextPage endCursor }')
+
+
+ISSUE_FIELDS = """
+  iid title description state createdAt updatedAt webUrl
+  author { id username }
+  """ + _connection('labels') + """
+  """ + _connection('assignees') + """
+"""
+
+ISSUE_FRAGMENT = """
+fragment IssueFields on Issue {""" + ISSUE_FIELDS + """}
+"""
+
+MERGE_REQUEST_FRAGMENT = """
+fragment MergeRequestFields on MergeRequest {""" + ISSUE_FIELDS + """
+  sourceBranch targetBranch sourceProjectId targetProjectId diffHeadSha
+  sourceProject { fullPath }
+  diffStatsSummary { additions deletions }
+  """ + _connection('commits') + """
+}
+"""
+
+
+def query(token: Union[GitLabOAuthToken, GitLabPrivateToken], graphql: str,
+          variables: Optional[dict]=None) -> dict:
+    """
+    Sends a GraphQL query.
+
+    :param token: A Token object.
+    :param graphql: The query.
+    :param variables: The values of the variables used in the query.
+    :return: The ``data`` of the result.
+    :raises RuntimeError: If the query fails. Errors reported by GraphQL are
+                          passed with the status 400.
+    """
+    result = _fetch(GRAPHQL_URL, 'post', token, '',
+                    {'query': graphql, 'variables': variables or {}},
+                    headers={'Authorization': 'Bearer ' + token.value})
+    if result.get('errors'):
+        raise RuntimeError(result['errors'], 400)
+    return result['data']
+
+
+def _project_selection(full_name: str, inner: str) -> str:
+    """
+    Selects ``inner`` of the project with the given full name.
+    """
+    return 'project(fullPath: {}) {{ {} }}'.format(dumps(full_name), inner)
+
+
+def _check_found(result: Optional[dict], key: str, what: str) -> dict:
+    """
+    Retrieves the object at ``key`` of a project result.
+
+    :raises RuntimeError: With status 404 if the project or object is missing.
+    """
+    if result is None or result[key] is None:
+        raise RuntimeError('{} not found.'.format(what), 404)
+    return result[key]
+
+
+def _complete_connections(token: Union[GitLabOAuthToken, GitLabPrivateToken],
+                          kind: str, objects: List[Tuple[str, int, dict]],
+                          batch_size: int):
+    """
+    Retrieves the remaining pages of connections whose first page doesn't
+    hold all nodes, adding their nodes to the first page.
+
+    :param token: A Token object.
+    :param kind: The field selecting the objects, e.g. ``mergeRequest``.
+    :param objects: The full repository names, numbers and retrieved data of
+                    the objects.
+    :param batch_size: The number of pages retrieved per query.
+    :raises RuntimeError: If something goes wrong (network, auth...).
+    """
+    pending = [(repository, number, name, data[name])
+               for repository, number, data in objects
+               for name in CONNECTION_FIELDS if name in data]
+    while True:
+        pending = [item for item in pending
+                   if item[3]['pageInfo']['hasNextPage']]
+        if not pending:
+            return
+
+        results = batched_graphql(
+            partial(query, token),
+            [_project_selection(repository, '{}(iid: "{}") {{ {} }}'.format(
+                kind, int(number),
+                _connection(name, connection['pageInfo']['endCursor'])))
+             for repository, number, name, connection in pending],
+            '', batch_size)
+        for (repository, number, name, connection), result in zip(pending,
+                                                                  results):
+            page = _check_found(result, kind, '{}{}{}'.format(
+                repository, '!' if kind == 'mergeRequest' else '#',
+                number))[name]
+            connection['nodes'].extend(page['nodes'])
+            connection['pageInfo'] = page['pageInfo']
+
+
+def _global_id(gid: str) -> int:
+    """
+    Extracts the numeric id from a global id like ``gid://gitlab/User/1``.
+    """
+    return int(gid.rsplit('/', 1)[-1])
+
+
+def _user_data(user: Optional[dict]) -> Optional[dict]:
+    """
+    Converts GraphQL user data to the REST format.
+    """
+    if user is None:
+        return None
+    return {'id': _global_id(user['id']), 'username': user['username']}
+
+
+def _issue_data(issue: dict) -> dict:
+    """
+    Converts GraphQL issue data to the REST format.
+    """
+    return {'iid': int(issue['iid']),
+            'title': issue['title'],
+            'description': issue['description'],
+            'state': issue['state'],
+            'created_at': issue['createdAt'],
+            'updated_at': issue['updatedAt'],
+            'web_url': issue['webUrl'],
+            'author': _user_data(issue['author']),
+            'labels': [label['title'] for label in issue['labels']['nodes']],
+            'assignees': [_user_data(user)
+                          for user in issue['assignees']['nodes']]}
+
+
+def _make_commit(token: Union[GitLabOAuthToken, GitLabPrivateToken],
+                 repository: str, commit: dict) -> GitLabCommit:
+    """
+    Creates a GitLabCommit from GraphQL data.
+    """
+    return GitLabCommit.from_data(
+        {'id': commit['sha'], 'message': commit['message']},
+        token, repository, commit['sha'])
+
+
+def _combined_status(pipelines: dict) -> Optional[Status]:
+    """
+    Combines the statuses in the pipelines of a commit like
+    ``GitLabCommit.combined_status``.
+
+    :return: The combined status, None if not all statuses were retrieved.
+    """
+    if pipelines['pageInfo']['hasNextPage'] or any(
+            pipeline['jobs']['pageInfo']['hasNextPage']
+            for pipeline in pipelines['nodes']):
+        return None
+
+    # Pipelines and jobs come newest first, the first of each name counts
+    latest = {}  # type: Dict[str, str]
+    for pipeline in pipelines['nodes']:
+        for job in pipeline['jobs']['nodes']:
+            latest.setdefault(job['name'], job['status'].lower())
+    # Other states, e.g. scheduled, are about to run
+    return GitLabCommit.combine_statuses(
+        {INV_GL_STATE_TRANSLATION.get(status, Status.PENDING)
+         for status in latest.values()})
+
+
+def _prime_combined_statuses(
+        token: Union[GitLabOAuthToken, GitLabPrivateToken],
+        commits: Iterable[GitLabCommit], batch_size: int):
+    """
+    Retrieves the statuses of many commits and primes their combined status.
+    Commits whose statuses can't be retrieved at once are left to REST.
+
+    :param token: A Token object.
+    :param commits: The commits, known by SHA.
+    :param batch_size: The number of commits retrieved per query.
+    :raises RuntimeError: If something goes wrong (network, auth...).
+    """
+    by_sha = OrderedDict()  # type: OrderedDict
+    for commit in commits:
+        by_sha.setdefault((commit._repository, commit.sha), []).append(commit)
+
+    results = batched_graphql(
+        partial(query, token),
+        [_project_selection(repository,
+                            STATUSES_SELECTION.format(dumps(sha)))
+         for repository, sha in by_sha],
+        '', batch_size)
+    for objects, result in zip(by_sha.values(), results):
+        status = (None if result is None
+                  else _combined_status(result['pipelines']))
+        if status is not None:
+            for commit in objects:
+                commit.prime('combined_status', status)
+
+
+def _make_merge_request(token: Union[GitLabOAuthToken, GitLabPrivateToken],
+                        repository: str, mr: dict) -> GitLabMergeRequest:
+    """
+    Creates a GitLabMergeRequest from GraphQL data, with its commits, head,
+    diffstat and source repository.
+    """
+    data = _issue_data(mr)
+    data.update({'source_branch': mr['sourceBranch'],
+                 'target_branch': mr['targetBranch'],
+                 'source_project_id': int(mr['sourceProjectId']),
+                 'target_project_id': int(mr['targetProjectId']),
+                 'sha': mr['diffHeadSha']})
+    result = GitLabMergeRequest.from_data(data, token, repository,
+                                          int(mr['iid']))
+    source = mr['sourceProject']['fullPath']
+    result.prime('source_repository', GitLabRepository(token, source))
+
+    result.prime('head', GitLabCommit.from_data(
+        {'id': mr['diffHeadSha']}, token, source, mr['diffHeadSha']))
+    result.prime('commits', tuple(
+        _make_commit(token, repository, commit)
+        for commit in mr['commits']['nodes']))
+    result.prime('diffstat', (mr['diffStatsSummary']['additions'],
+                              mr['diffStatsSummary']['deletions']))
+    return result
+
+
+def get_issues(token: Union[GitLabOAuthToken, GitLabPrivateToken],
+               issues: Iterable[Tuple[str, int]],
+               batch_size: int=20) -> List[GitLabIssue]:
+    """
+    Retrieves many issues with their labels, assignees and authors.
+
+    :param token: A Token object.
+    :param issues: The full repository names and numbers of the issues.
+    :param batch_size: The number of issues retrieved per query.
+    :return: The GitLabIssue objects in the same order.
+    :raises RuntimeError: If something goes wrong (network, auth...).
+    """
+    issues = list(issues)
+    results = batched_graphql(
+        partial(query, token),
+        [_project_selection(repository,
+                            'issue(iid: "{}") {{ ...IssueFields }}'.format(
+                                int(number)))
+         for repository, number in issues],
+        ISSUE_FRAGMENT, batch_size)
+    results = [(repository, number, _check_found(
+        result, 'issue', '{}#{}'.format(repository, number)))
+               for (repository, number), result in zip(issues, results)]
+    _complete_connections(token, 'issue', results, batch_size)
+    return [GitLabIssue.from_data(_issue_data(result), token, repository,
+                                  number)
+            for repository, number, result in results]
+
+
+def get_merge_requests(token: Union[GitLabOAuthToken, GitLabPrivateToken],
+                       merge_requests: Iterable[Tuple[str, int]],
+                       batch_size: int=5,
+                       status_batch_size: int=10) -> List[GitLabMergeRequest]:
+    """
+    Retrieves many merge requests with their commits and their combined
+    statuses, diffstat, labels, assignees and authors.
+
+    :param token: A Token object.
+    :param merge_requests: The full repository names and numbers of the merge
+                           requests.
+    :param batch_size: The number of merge requests retrieved per query.
+    :param status_batch_size: The number of commits whose statuses are
+                              retrieved per query.
+    :return: The GitLabMergeRequest objects in the same order.
+    :raises RuntimeError: If something goes wrong (network, auth...).
+    """
+    merge_requests = list(merge_requests)
+    results = batched_graphql(
+        partial(query, token),
+        [_project_selection(
+            repository, 'mergeRequest(iid: "{}") {{ ...MergeRequestFields }}'
+            .format(int(number)))
+         for repository, number in merge_requests],
+        MERGE_REQUEST_FRAGMENT, batch_size)
+    results = [(repository, number, _check_found(
+        result, 'mergeRequest', '{}!{}'.format(repository, number)))
+               for (repository, number), result in zip(merge_requests,
+                                                       results)]
+    _complete_connections(token, 'mergeRequest', results, batch_size)
+    objects = [_make_merge_request(token, repository, result)
+               for repository, _, result in results]
+    _prime_combined_statuses(token, [commit for mr in objects
+                                     for commit in mr.commits + (mr.head,)],
+                             status_batch_size)
+    return objects
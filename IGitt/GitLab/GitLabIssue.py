@@ -2,6 +2,7 @@
 This contains the Issue implementation for GitLab.
 """
 from datetime import datetime
+from functools import partial
 from typing import List
 from typing import Set
 from typing import Union
@@ -16,12 +17,25 @@ from IGitt.Interfaces.Comment import CommentType
 from IGitt.Interfaces.Issue import Issue
 from IGitt.Interfaces import IssueStates
 from IGitt.Interfaces import MergeRequestStates
+from IGitt.Utils import enum_field
+from IGitt.Utils import memoized
+from IGitt.Utils import object_field
+from IGitt.Utils import Record
+from IGitt.Utils import timestamp_field
 
 
 class GitLabIssue(GitLabMixin, Issue):
     """
     This class represents an issue on GitLab.
     """
+    record_class = Record.define(
+        'GitLabIssueRecord',
+        created=timestamp_field('created_at'),
+        updated=timestamp_field('updated_at'),
+        state=enum_field('state', lambda state: IssueStates[
+            {'opened': 'open'}.get(state, state).upper()]),
+        author=object_field('author', lambda issue, user: GitLabUser.from_data(
+            user, issue._token, user['id'])))
 
     def __init__(self, token: Union[GitLabOAuthToken, GitLabPrivateToken],
                  repository: str, number: int):
@@ -49,6 +63,7 @@ class GitLabIssue(GitLabMixin, Issue):
             repo=quote_plus(repository), issue_iid=number)
 
     @property
+    @memoized()
     def repository(self):
         """
         Returns the GitLab repository this issue is linked with as a
@@ -88,6 +103,9 @@ class GitLabIssue(GitLabMixin, Issue):
 
         :param new_title: The new title.
         """
+        if self._is_unchanged('title', lambda: self.title == new_title):
+            return
+
         self.data = put(self._token, self._url, {'title': new_title})
 
     @property
@@ -145,9 +163,56 @@ class GitLabIssue(GitLabMixin, Issue):
         """
         Setter for assignees.
         """
+        if self._is_unchanged('assignees', lambda: self.assignees == value):
+            return
+
         self.data = put(self._token, self._url,
                         {'assignee_ids': [u.identifier for u in value]})
 
+    def _edit_payload(self, changes: dict) -> dict:
+        """
+        Translates the changes collected by an IssueEdit to the payload of an
+        update request.
+        """
+        data = {}
+        if 'title' in changes:
+            data['title'] = changes['title']
+        if 'description' in changes:
+            data['description'] = changes['description']
+        if 'labels' in changes:
+            data['labels'] = ','.join(map(str, changes['labels']))
+        if 'assignees' in changes:
+            data['assignee_ids'] = [user.identifier
+                                    for user in changes['assignees']]
+        if 'state' in changes:
+            data['state_event'] = {IssueStates.OPEN: 'reopen',
+                                   IssueStates.CLOSED: 'close'
+                                  }[changes['state']]
+        return data
+
+    def _apply_edit(self, changes: dict):
+        """
+        Sends all changes collected by an IssueEdit in one PUT request.
+
+        :param changes: A dict mapping the field names to the new values.
+        :raises RuntimeError: If something goes wrong (network, auth...).
+        """
+        unchanged = {
+            'title': lambda title: self.title == title,
+            'description': lambda body: self.description == body,
+            'labels': lambda labels: self.labels == set(labels),
+            'assignees': lambda users: self.assignees == set(users),
+            'state': lambda state: self.data['state'] in {
+                IssueStates.OPEN: ('opened', 'open'),
+                IssueStates.CLOSED: ('closed',)}[state],
+        }
+        changes = {key: value for key, value in changes.items()
+                   if not self._is_unchanged(
+                       key, partial(unchanged[key], value))}
+        if changes:
+            self.data = put(self._token, self._url,
+                            self._edit_payload(changes))
+
     @property
     def description(self) -> str:
         r"""
@@ -170,6 +235,10 @@ class GitLabIssue(GitLabMixin, Issue):
 
         :param new_description: The new description.
         """
+        if self._is_unchanged('description',
+                              lambda: self.description == new_description):
+            return
+
         self.data = put(self._token,
                         self._url,
                         {'description': new_description})
@@ -181,9 +250,7 @@ class GitLabIssue(GitLabMixin, Issue):
 
         :return: A GitLabUser object.
         """
-        return GitLabUser.from_data(self.data['author'],
-                                    self._token,
-                                    self.data['author']['id'])
+        return self.record.author
 
     def add_comment(self, body):
         """
@@ -271,7 +338,7 @@ class GitLabIssue(GitLabMixin, Issue):
         :param value: A set of label texts.
         """
         # Only if self.data is populated we actually save a request here
-        if 'labels' in self.data and value == self.labels:
+        if self._is_unchanged('labels', lambda: value == self.labels):
             return  # No need to patch
 
         self.data = put(self._token, self._url,
@@ -305,8 +372,7 @@ class GitLabIssue(GitLabMixin, Issue):
         >>> issue.created
         datetime.datetime(2017, 6, 5, 9, 45, 20, 678000)
         """
-        return datetime.strptime(self.data['created_at'],
-                                 '%Y-%m-%dT%H:%M:%S.%fZ')
+        return self.record.created
 
     @property
     def updated(self) -> datetime:
@@ -319,8 +385,7 @@ class GitLabIssue(GitLabMixin, Issue):
         >>> issue.updated
         datetime.datetime(2017, 6, 5, 9, 45, 56, 115000)
         """
-        return datetime.strptime(self.data['updated_at'],
-                                 '%Y-%m-%dT%H:%M:%S.%fZ')
+        return self.record.updated
 
     def close(self):
         """
@@ -328,6 +393,10 @@ class GitLabIssue(GitLabMixin, Issue):
 
         :raises RuntimeError: If something goes wrong (network, auth...).
         """
+        if self._is_unchanged('state',
+                              lambda: self.data['state'] == 'closed'):
+            return
+
         self.data = put(self._token, self._url, {'state_event': 'close'})
 
     def reopen(self):
@@ -336,6 +405,10 @@ class GitLabIssue(GitLabMixin, Issue):
 
         :raises RuntimeError: If something goes wrong (network, auth...).
         """
+        if self._is_unchanged(
+                'state', lambda: self.data['state'] in ('opened', 'open')):
+            return
+
         self.data = put(self._token, self._url, {'state_event': 'reopen'})
 
     def delete(self):
@@ -380,10 +453,7 @@ class GitLabIssue(GitLabMixin, Issue):
         :return: Either <IssueStates.OPEN: 'open'> or
         <IssueStates.CLOSED: 'closed'>.
         """
-        if self.data['state'] == 'opened':
-            self.data['state'] = 'open'
-
-        return IssueStates[self.data['state'].upper()]
+        return self.record.state
 
     @property
     def reactions(self) -> Set[GitLabReaction]:
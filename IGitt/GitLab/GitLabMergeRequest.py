@@ -1,18 +1,25 @@
 """
 Contains a class representing the GitLab merge request.
 """
-from functools import lru_cache
 from typing import Set
 from typing import Union
 from urllib.parse import quote_plus
+import logging
 import re
 
-from IGitt.GitLab import get, put, GitLabOAuthToken, GitLabPrivateToken
+from IGitt.GitLab import delete, get, post, put
+from IGitt.GitLab import GitLabOAuthToken, GitLabPrivateToken
 from IGitt.GitLab.GitLabCommit import GitLabCommit
 from IGitt.GitLab.GitLabIssue import GitLabIssue
 from IGitt.GitLab.GitLabUser import GitLabUser
 from IGitt.Interfaces.MergeRequest import MergeRequest
 from IGitt.Interfaces import MergeRequestStates
+from IGitt.Interfaces.Diff import FileDiff
+from IGitt.Interfaces.Diff import LineType
+from IGitt.Utils import enum_field
+from IGitt.Utils import memoized
+from IGitt.Utils import primable
+from IGitt.Utils import Record
 
 
 # Issue is used as a Mixin, super() is never called by design!
@@ -20,6 +27,13 @@ class GitLabMergeRequest(GitLabIssue, MergeRequest):
     """
     A Merge Request on GitLab.
     """
+    record_class = Record.define(
+        'GitLabMergeRequestRecord',
+        **dict(GitLabIssue.record_class.fields,
+               state=enum_field('state', {
+                   'opened': MergeRequestStates.OPEN,
+                   'closed': MergeRequestStates.CLOSED,
+                   'merged': MergeRequestStates.MERGED}.__getitem__)))
 
     def __init__(self, token: Union[GitLabOAuthToken, GitLabPrivateToken],
                  repository: str, number: int):
@@ -47,6 +61,7 @@ class GitLabMergeRequest(GitLabIssue, MergeRequest):
         return self.data['target_branch']
 
     @property
+    @memoized()
     def base(self) -> GitLabCommit:
         """
         Retrieves the base commit as a GitLabCommit object.
@@ -75,6 +90,7 @@ class GitLabMergeRequest(GitLabIssue, MergeRequest):
         return self.data['source_branch']
 
     @property
+    @memoized()
     def head(self) -> GitLabCommit:
         """
         Retrieves the head commit as a GitLabCommit object.
@@ -93,7 +109,7 @@ class GitLabMergeRequest(GitLabIssue, MergeRequest):
                             sha=None, branch=quote_plus(self.head_branch_name))
 
     @property
-    @lru_cache(None)
+    @memoized()
     def commits(self):
         """
         Retrieves a tuple of commit objects that are included in the PR.
@@ -114,6 +130,7 @@ class GitLabMergeRequest(GitLabIssue, MergeRequest):
                      for commit in commits)
 
     @property
+    @memoized()
     def repository(self):
         """
         Retrieves the repository where this comes from.
@@ -132,7 +149,7 @@ class GitLabMergeRequest(GitLabIssue, MergeRequest):
         return GitLabRepository(self._token, self._repository)
 
     @property
-    @lru_cache(None)
+    @memoized()
     def source_repository(self):
         """
         Retrieves the repository where this PR's head branch is located at.
@@ -151,7 +168,64 @@ class GitLabMergeRequest(GitLabIssue, MergeRequest):
         return GitLabRepository(self._token,
                                 str(self.data['source_project_id']))
 
+    @memoized()
+    def _get_changes(self) -> list:
+        """
+        Retrieves the changes of the merge request, shared by
+        ``affected_files`` and ``diffstat``.
+        """
+        return get(self._token, self._url + '/changes')['changes']
+
+    def _get_file_diffs(self):
+        return [FileDiff(
+            None if change.get('new_file') else change['old_path'],
+            None if change.get('deleted_file') else change['new_path'],
+            change['diff']) for change in self._get_changes()]
+
+    def _submit_review(self, comments, message):
+        """
+        Submits all comments as draft notes and publishes them together, so
+        they come with one notification. GitLab takes one draft per request,
+        so if submitting fails, the drafts created so far are deleted again
+        instead of being published with the next review.
+        """
+        refs = self.data['diff_refs']
+        notes = []
+        for file, line, body in comments:
+            file_diff = self.diff.file(file)
+            position = {'position_type': 'text',
+                        'base_sha': refs['base_sha'],
+                        'start_sha': refs['start_sha'],
+                        'head_sha': refs['head_sha'],
+                        'old_path': file_diff.old_path or file_diff.new_path,
+                        'new_path': file_diff.new_path or file_diff.old_path,
+                        'new_line': line.new_number}
+            # Unchanged lines are on both sides
+            if line.type is LineType.CONTEXT:
+                position['old_line'] = line.old_number
+            notes.append({'note': body, 'position': position})
+        if message:
+            notes.append({'note': message})
+
+        drafts = []
+        try:
+            for note in notes:
+                drafts.append(post(self._token, self._url + '/draft_notes',
+                                   note)['id'])
+            post(self._token, self._url + '/draft_notes/bulk_publish', {})
+        except RuntimeError:
+            for draft in drafts:
+                try:
+                    delete(self._token,
+                           '{}/draft_notes/{}'.format(self._url, draft))
+                except RuntimeError:
+                    # Already published or gone
+                    logging.warning('Deleting draft note %s of %s failed.',
+                                    draft, self.url, exc_info=True)
+            raise
+
     @property
+    @primable
     def affected_files(self):
         """
         Retrieves affected files from a GitLab merge request.
@@ -166,10 +240,10 @@ class GitLabMergeRequest(GitLabIssue, MergeRequest):
 
         :return: A set of filenames.
         """
-        changes = get(self._token, self._url + '/changes')['changes']
-        return {change['old_path'] for change in changes}
+        return {change['old_path'] for change in self._get_changes()}
 
     @property
+    @primable
     def diffstat(self):
         """
         Gets additions and deletions of a merge request.
@@ -184,10 +258,9 @@ class GitLabMergeRequest(GitLabIssue, MergeRequest):
 
         :return: An (additions, deletions) tuple.
         """
-        changes = get(self._token, self._url + '/changes')['changes']
         results = []
         expr = re.compile(r'@@ [0-9+,-]+ [0-9+,-]+ @@')
-        for change in changes:
+        for change in self._get_changes():
             diff = change['diff']
             match = expr.search(diff)
             if not match: # for binary files match is None
@@ -227,9 +300,7 @@ class GitLabMergeRequest(GitLabIssue, MergeRequest):
 
         :return: A GitLabUser object.
         """
-        return GitLabUser.from_data(self.data['author'],
-                                    self._token,
-                                    self.data['author']['id'])
+        return self.record.author
 
     @property
     def assignees(self):
@@ -249,11 +320,31 @@ class GitLabMergeRequest(GitLabIssue, MergeRequest):
                 'GitLab does not support assigning multiple users to the same'
                 'Merge Request.')
 
+        if self._is_unchanged('assignee', lambda: self.assignees == value):
+            return
+
         # GitLab MR API unassigns all users when 0 is sent.
         # Reference: https://docs.gitlab.com/ee/api/merge_requests.html#update-mr
         user = value.pop().identifier if len(value) == 1 else 0
         self.data = put(self._token, self._url, {'assignee_id': user})
 
+    def _edit_payload(self, changes: dict) -> dict:
+        """
+        Translates the changes collected by an IssueEdit to the payload of an
+        update request. Merge requests have a single assignee on GitLab.
+        """
+        changes = dict(changes)
+        assignees = changes.pop('assignees', None)
+        data = GitLabIssue._edit_payload(self, changes)
+        if assignees is not None:
+            if len(assignees) > 1:
+                raise NotImplementedError(
+                    'GitLab does not support assigning multiple users to the '
+                    'same Merge Request.')
+            data['assignee_id'] = (next(iter(assignees)).identifier
+                                   if assignees else 0)
+        return data
+
     @property
     def state(self) -> MergeRequestStates:
         """
@@ -261,11 +352,7 @@ class GitLabMergeRequest(GitLabIssue, MergeRequest):
 
         :return:    A MergeRequestStates object.
         """
-        return {
-            'opened': MergeRequestStates.OPEN,
-            'closed': MergeRequestStates.CLOSED,
-            'merged': MergeRequestStates.MERGED
-        }[self.data['state']]
+        return self.record.state
 
     def merge(self, message: str=None, sha: str=None,
               should_remove_source_branch: bool=False,
@@ -3,7 +3,6 @@ This contains the Notification implementation for GitHub.
 
 Take note that GitHub Notifications are actually available via Todos API.
 """
-from functools import lru_cache
 from typing import Union
 
 from IGitt.GitLab import get
@@ -17,6 +16,9 @@ from IGitt.GitLab.GitLabMergeRequest import GitLabMergeRequest
 from IGitt.GitLab.GitLabRepository import GitLabRepository
 from IGitt.Interfaces.Notification import Notification
 from IGitt.Interfaces.Notification import Reason
+from IGitt.Utils import CachedDataMixin
+from IGitt.Utils import clear_memo
+from IGitt.Utils import memoized
 
 
 class GitLabNotification(GitLabMixin, Notification):
@@ -104,6 +106,13 @@ class GitLabNotification(GitLabMixin, Notification):
         """
         self.data = post(self._token, self._url + '/mark_as_done', {})
 
+    def refresh(self):
+        """
+        Refreshes the data, fetching the todos of the token again.
+        """
+        clear_memo(self._token, '_fetch_all')
+        CachedDataMixin.refresh(self)
+
     def _get_data(self):
         try:
             return [todo for todo in self._fetch_all(self._token)
@@ -113,7 +122,7 @@ class GitLabNotification(GitLabMixin, Notification):
             raise RuntimeError({'error':'404 Not Found'}, 404)
 
     @staticmethod
-    @lru_cache(None)
+    @memoized(ttl=60)
     def _fetch_all(token):
         return get(token, '/todos')
 
@@ -2,7 +2,6 @@
 This module contains the Issue abstraction class which provides properties and
 actions related to issues and bug reports.
 """
-from functools import lru_cache
 from typing import Set
 from urllib.parse import quote_plus
 
@@ -13,6 +12,7 @@ from IGitt.GitLab.GitLabUser import GitLabUser
 from IGitt.Interfaces import AccessLevel
 from IGitt.Interfaces.Organization import Organization
 from IGitt.Interfaces.Repository import Repository
+from IGitt.Utils import memoized
 
 
 class GitLabOrganization(GitLabMixin, Organization):
@@ -39,7 +39,7 @@ class GitLabOrganization(GitLabMixin, Organization):
         """
         return self.data['description']
 
-    @lru_cache()
+    @memoized()
     def raw_members(self) -> list:
         """
         Gets all members including the ones of groups around subgroups as a
@@ -114,7 +114,7 @@ class GitLabOrganization(GitLabMixin, Organization):
         return self._name
 
     @property
-    @lru_cache(None)
+    @memoized()
     def suborgs(self) -> Set[Organization]:
         """
         Returns the sub-organizations within this organization, recursively.
@@ -127,7 +127,7 @@ class GitLabOrganization(GitLabMixin, Organization):
         return result
 
     @property
-    @lru_cache(None)
+    @memoized()
     def repositories(self) -> Set[Repository]:
         """
         Returns the list of repositories contained in this organization
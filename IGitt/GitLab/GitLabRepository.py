@@ -2,13 +2,15 @@
 Contains the GitLab Repository implementation.
 """
 from datetime import datetime
+from typing import Iterator
 from typing import Optional
 from typing import Set
 from typing import Union
 from urllib.parse import quote_plus
 
 from IGitt import ElementAlreadyExistsError, ElementDoesntExistError
-from IGitt.GitLab import delete, get, post, GitLabMixin
+from IGitt.GitLab import delete, get, get_items, get_lazy, post, GitLabMixin
+from IGitt.GitLab import _order_params
 from IGitt.GitLab import GitLabOAuthToken, GitLabPrivateToken
 from IGitt.GitLab.GitLabIssue import GitLabIssue
 from IGitt.GitLab.GitLabOrganization import GitLabOrganization
@@ -17,7 +19,9 @@ from IGitt.Interfaces import IssueStates
 from IGitt.Interfaces import MergeRequestStates
 from IGitt.Interfaces.Repository import Repository
 from IGitt.Interfaces.Repository import WebhookEvents
+from IGitt.Utils import as_naive_utc
 from IGitt.Utils import eliminate_none
+from IGitt.Utils import parse_timestamp
 
 
 GL_WEBHOOK_TRANSLATION = {
@@ -47,19 +51,22 @@ def date_in_range(data,
                   updated_after: Optional[datetime]=None,
                   updated_before: Optional[datetime]=None):
     """
-    Returns true if issue/MR is in the given range.
+    Returns true if issue/MR is in the given range. The bounds are naive
+    datetimes in UTC, see ``as_naive_utc``.
     """
     is_created_after = not created_after
     is_created_before = not created_before
     is_updated_after = not updated_after
     is_updated_before = not updated_before
-    if created_after and data['created_at']>str(created_after):
+    created = parse_timestamp(data['created_at'])
+    updated = parse_timestamp(data['updated_at'])
+    if created_after and created > created_after:
         is_created_after = True
-    if created_before and data['created_at']<str(created_before):
+    if created_before and created < created_before:
         is_created_before = True
-    if updated_after and data['updated_at']>str(updated_after):
+    if updated_after and updated > updated_after:
         is_updated_after = True
-    if updated_before and data['updated_at']<str(updated_before):
+    if updated_before and updated < updated_before:
         is_updated_before = True
     return (is_created_after and is_created_before and is_updated_after and
             is_updated_before)
@@ -126,17 +133,15 @@ class GitLabRepository(GitLabMixin, Repository):
         """
         Retrieves the set of commits in this repository.
 
-        :return: A set of GitLabCommit objects.
+        :return: A LazyCollection of GitLabCommit objects.
         """
         # Don't move to module, leads to circular imports
         from IGitt.GitLab.GitLabCommit import GitLabCommit
 
-        return {GitLabCommit.from_data(commit,
-                                       self._token,
-                                       self.full_name,
-                                       commit['id'])
-                for commit in get(self._token,
-                                  self._url + '/repository/commits')}
+        return get_lazy(self._token, self._url + '/repository/commits',
+                        lambda commit: GitLabCommit.from_data(
+                            commit, self._token, self.full_name,
+                            commit['id']))
 
     @property
     def clone_url(self) -> str:
@@ -173,7 +178,7 @@ class GitLabRepository(GitLabMixin, Repository):
         return {label['name']
                 for label in get(self._token, self._url + '/labels')}
 
-    def create_label(self, name: str, color: str):
+    def create_label(self, name: str, color: str, exist_ok: bool=False):
         """
         Creates a new label with the given color. For an example,
         see delete_label.
@@ -195,10 +200,15 @@ class GitLabRepository(GitLabMixin, Repository):
 
         :param name: The name of the label to create.
         :param color: A HTML color value with a leading #.
-        :raises ElementAlreadyExistsError: If the label name already exists.
+        :param exist_ok: Whether to leave an existing label alone instead of
+                         raising, without writing anything.
+        :raises ElementAlreadyExistsError: If the label name already exists
+                                           and exist_ok is False.
         :raises RuntimeError: If something goes wrong (network, auth...).
         """
         if name in self.get_labels():
+            if exist_ok:
+                return
             raise ElementAlreadyExistsError(name + ' already exists.')
 
         self.data = post(
@@ -380,9 +390,9 @@ class GitLabRepository(GitLabMixin, Repository):
         4
         """
         from IGitt.GitLab.GitLabMergeRequest import GitLabMergeRequest
-        return {GitLabMergeRequest.from_data(res, self._token,
-                                             self.full_name, res['iid'])
-                for res in get(self._token, self._url + '/merge_requests')}
+        return get_lazy(self._token, self._url + '/merge_requests',
+                        lambda res: GitLabMergeRequest.from_data(
+                            res, self._token, self.full_name, res['iid']))
 
     def filter_issues(self, state: str='opened') -> set:
         """
@@ -390,11 +400,10 @@ class GitLabRepository(GitLabMixin, Repository):
 
         :param state: 'opened' or 'closed' or 'all'.
         """
-        return {GitLabIssue.from_data(res, self._token,
-                                      self.full_name, res['iid'])
-                for res in get(self._token,
-                               self._url + '/issues',
-                               {'state': state})}
+        return get_lazy(self._token, self._url + '/issues',
+                        lambda res: GitLabIssue.from_data(
+                            res, self._token, self.full_name, res['iid']),
+                        {'state': state})
 
     @property
     def issues(self) -> set:
@@ -478,38 +487,71 @@ class GitLabRepository(GitLabMixin, Repository):
 
     def _search(self,
                 search_type,
-                state: Union[MergeRequestStates, IssueStates, None]):
+                state: Union[MergeRequestStates, IssueStates, None],
+                created_after: Optional[datetime]=None,
+                created_before: Optional[datetime]=None,
+                updated_after: Optional[datetime]=None,
+                updated_before: Optional[datetime]=None,
+                order_by: Optional[str]=None,
+                descending: bool=True) -> Iterator[dict]:
         """
-        Retrives a list of all issues or merge requests.
+        Retrieves the issues or merge requests matching the given filters,
+        filtered on GitLab and page by page while they are used.
+
         :param search_type: A string for type of object i.e. issues for issue
                             and merge_requests for merge requests.
         :param state: A string for MR/issue state (opened or closed)
-        :return: List of issues/merge requests.
+        :param created_after: Only the ones created after this.
+        :param created_before: Only the ones created before this.
+        :param updated_after: Only the ones updated after this.
+        :param updated_before: Only the ones updated before this.
+        :param order_by: The field to order by, e.g. ``created`` or
+                         ``updated``. By default ``updated`` if filtering by
+                         update, else ``created``.
+        :param descending: Whether to start with the highest values.
+        :return: An iterator over the data of the issues/merge requests.
         """
         url = self._url + '/{}'.format(search_type)
-        if state is None:
-            return get(self._token, url)
-        elif isinstance(state, IssueStates):
-            state = GL_ISSUE_STATE_TRANSLATION[state]
+        dates = {'created_after': created_after,
+                 'created_before': created_before,
+                 'updated_after': updated_after,
+                 'updated_before': updated_before}
+        params = {name: as_naive_utc(value).strftime('%Y-%m-%dT%H:%M:%SZ')
+                  for name, value in dates.items() if value}
+        if order_by is None:
+            order_by = ('updated' if updated_after or updated_before
+                        else 'created')
+        params.update(_order_params(order_by, descending))
+        if isinstance(state, IssueStates):
+            params['state'] = GL_ISSUE_STATE_TRANSLATION[state]
         elif isinstance(state, MergeRequestStates):
-            state = GL_MR_STATE_TRANSLATION[state]
-        return get(self._token, url, {'state': state})
+            params['state'] = GL_MR_STATE_TRANSLATION[state]
+        return get_items(self._token, url, params)
 
     def search_issues(self,
                       created_after: Optional[datetime]=None,
                       created_before: Optional[datetime]=None,
                       updated_after: Optional[datetime]=None,
                       updated_before: Optional[datetime]=None,
-                      state: Optional[IssueStates] = None):
-        """
-        Searches for issues based on created and updated date.
-        """
-        for issue_data in filter(lambda data: date_in_range(data,
-                                                            created_after,
-                                                            created_before,
-                                                            updated_after,
-                                                            updated_before),
-                                 self._search('issues', state)):
+                      state: Optional[IssueStates] = None,
+                      order_by: Optional[str]=None,
+                      descending: bool=True):
+        """
+        Searches for issues based on created and updated date. Dates and
+        datetimes with a time zone are converted to UTC, naive datetimes are
+        taken as UTC.
+
+        :param order_by: The field to order by, e.g. ``created`` or
+                         ``updated``, see ``_search``.
+        :param descending: Whether to start with the highest values.
+        """
+        dates = tuple(map(as_naive_utc, (created_after, created_before,
+                                         updated_after, updated_before)))
+        # GitLab includes the bounds, they are excluded here
+        for issue_data in filter(lambda data: date_in_range(data, *dates),
+                                 self._search('issues', state, *dates,
+                                              order_by=order_by,
+                                              descending=descending)):
             issue = self.get_issue(issue_data['iid'])
             issue.data = issue_data
             yield issue
@@ -519,16 +561,25 @@ class GitLabRepository(GitLabMixin, Repository):
                    created_before: Optional[datetime]=None,
                    updated_after: Optional[datetime]=None,
                    updated_before: Optional[datetime]=None,
-                   state: Optional[MergeRequestStates]=None):
-        """
-        Searches for merge request based on created and updated date.
-        """
-        for mr_data in filter(lambda data: date_in_range(data,
-                                                         created_after,
-                                                         created_before,
-                                                         updated_after,
-                                                         updated_before),
-                              self._search('merge_requests', state)):
+                   state: Optional[MergeRequestStates]=None,
+                   order_by: Optional[str]=None,
+                   descending: bool=True):
+        """
+        Searches for merge request based on created and updated date. Dates
+        and datetimes with a time zone are converted to UTC, naive datetimes
+        are taken as UTC.
+
+        :param order_by: The field to order by, e.g. ``created`` or
+                         ``updated``, see ``_search``.
+        :param descending: Whether to start with the highest values.
+        """
+        dates = tuple(map(as_naive_utc, (created_after, created_before,
+                                         updated_after, updated_before)))
+        # GitLab includes the bounds, they are excluded here
+        for mr_data in filter(lambda data: date_in_range(data, *dates),
+                              self._search('merge_requests', state, *dates,
+                                           order_by=order_by,
+                                           descending=descending)):
             merge_request = self.get_mr(mr_data['iid'])
             merge_request.data = mr_data
             yield merge_request
@@ -3,13 +3,18 @@ This package contains the GitLab implementations of the interfaces in
 server.git.Interfaces. GitLab drops the support of API version 3 as of
 August 22, 2017. So, IGitt adopts v4 to stay future proof.
 """
+from typing import Callable
+from typing import Iterator
 from typing import Optional
+from typing import Tuple
 from typing import Union
 import os
 import logging
 
 from IGitt.Interfaces import Token
 from IGitt.Interfaces import _fetch
+from IGitt.Interfaces import _iter_items
+from IGitt.Interfaces import LazyCollection
 from IGitt.Utils import CachedDataMixin
 
 
@@ -125,6 +130,53 @@ def get(token: Union[GitLabOAuthToken, GitLabPrivateToken], url: str,
                   headers=headers)
 
 
+def get_items(token: Union[GitLabOAuthToken, GitLabPrivateToken], url: str,
+              params: Optional[dict]=None) -> Iterator[dict]:
+    """
+    Queries GitLab on the given URL for a listing and yields its items,
+    retrieving the next page only when they are used up.
+
+    :param token: An OAuth token.
+    :param url: E.g. ``/projects/1/repository/commits/abc/diff``
+    :param params: The query params to be sent.
+    :return: An iterator over the items.
+    :raises RuntimeError: If a response indicates any problem.
+    """
+    return _iter_items(BASE_URL, token, url,
+                       query_params={**dict(params or {}), 'per_page': 100})
+
+
+def _order_params(field: str, descending: bool) -> dict:
+    """
+    Builds the query parameters to order a GitLab listing. ``created`` and
+    ``updated`` are understood like on GitHub.
+    """
+    field = {'created': 'created_at', 'updated': 'updated_at'}.get(field,
+                                                                    field)
+    return {'order_by': field, 'sort': 'desc' if descending else 'asc'}
+
+
+def get_lazy(token: Union[GitLabOAuthToken, GitLabPrivateToken], url: str,
+             make: Callable, params: Optional[dict]=None,
+             headers: Optional[dict]=None, select: Optional[Callable]=None,
+             empty_on: Tuple[int, ...]=()) -> LazyCollection:
+    """
+    Like ``get``, but returns a LazyCollection of the objects built by
+    ``make`` from the listed items, requesting pages only when needed.
+
+    :param token: An OAuth token.
+    :param url: E.g. ``/projects/a%2Fb/issues``
+    :param make: Builds an IGitt object from the data of an item.
+    :param params: The query params to be sent.
+    :param headers: The request headers to be sent.
+    :param select: Tells which items to include, if not all.
+    :param empty_on: Status codes meaning that there are no items.
+    """
+    return LazyCollection(BASE_URL, token, url, make,
+                          {**dict(params or {}), 'per_page': 100}, headers,
+                          select, _order_params, empty_on)
+
+
 def post(token: Union[GitLabOAuthToken, GitLabPrivateToken],
          url: str,
          data: dict,
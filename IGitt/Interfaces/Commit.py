@@ -1,13 +1,36 @@
 """
 This module contains the actual commit object.
 """
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
 from typing import Optional
 from typing import Set
 
 from IGitt.Interfaces import IGittObject
 from IGitt.Interfaces import Comment
 from IGitt.Interfaces.CommitStatus import CommitStatus, Status
+from IGitt.Interfaces.Diff import Diff
+from IGitt.Interfaces.Diff import FileDiff
 from IGitt.Interfaces.Repository import Repository
+from IGitt.Utils import memoized
+
+
+# Combined statuses which don't change anymore, by commit URL, the least
+# recently used ones beyond FINAL_STATUSES_MAXSIZE are dropped. Dropped by
+# set_status and ``IGitt.Utils.invalidate_url``, e.g. on status webhooks.
+_FINAL_STATUSES = OrderedDict()  # type: Dict[str, Status]
+_FINAL_STATUSES_LOCK = Lock()
+FINAL_STATUSES_MAXSIZE = 10000
+FINAL_STATES = frozenset({Status.SUCCESS, Status.FAILED, Status.ERROR,
+                          Status.CANCELED})
+# Seconds for which the statuses and combined status retrieved last are
+# trusted, e.g. to skip setting a status again. A FreshnessPolicy overrides it
+# for skipping statuses.
+STATUSES_MAX_AGE = 10
 
 
 class Commit(IGittObject):
@@ -131,10 +154,58 @@ class Commit(IGittObject):
         """
         raise NotImplementedError
 
+    def _remember_statuses(self, statuses: Set[CommitStatus]):
+        """
+        Keeps the statuses just retrieved, see ``_has_status``.
+        """
+        self._statuses = monotonic(), set(statuses)
+
+    def _remember_status(self, status: CommitStatus):
+        """
+        Replaces the status of the same context in the statuses retrieved
+        last, after setting it. Their age stays the same.
+        """
+        if getattr(self, '_statuses', None) is not None:
+            retrieved_at, statuses = self._statuses
+            statuses = {old for old in statuses
+                        if old.context != status.context}
+            statuses.add(CommitStatus(status.status, status.description,
+                                      status.context, status.url))
+            self._statuses = retrieved_at, statuses
+
+    def _has_status(self, status: CommitStatus,
+                    translation: Dict[Status, str]) -> bool:
+        """
+        Tells if the statuses retrieved last already hold the given status, so
+        setting it again can be skipped. They only count while they are fresh
+        according to the FreshnessPolicy of the commit or, without one, for
+        ``STATUSES_MAX_AGE`` seconds, as others may set statuses too.
+
+        :param status:      The status to set.
+        :param translation: Translates statuses to the states of the hoster,
+                            since several statuses may have the same state.
+        """
+        if getattr(self, '_statuses', None) is None:
+            return False
+        retrieved_at, statuses = self._statuses
+        age = monotonic() - retrieved_at
+        policy = self._get_freshness_policy()
+        if not (policy.is_fresh(age) if policy is not None
+                else age <= STATUSES_MAX_AGE):
+            return False
+
+        wanted = (translation[status.status], status.description,
+                  status.context, status.url)
+        return any((translation[old.status], old.description, old.context,
+                    old.url) == wanted for old in statuses)
+
     @property
+    @memoized(ttl=STATUSES_MAX_AGE)
     def combined_status(self) -> Status:
         """
-        Retrieves a combined status of all the commits.
+        Retrieves a combined status of all the commits. Finished states are
+        kept for all objects of the same commit, since the SHA can't change,
+        others are retrieved again after ``STATUSES_MAX_AGE`` seconds.
 
         :return:
             Status.FAILED if any of the commits report as error or failure or
@@ -143,6 +214,81 @@ class Commit(IGittObject):
             test is running
             Status.SUCCESS if the latest status for all commits is success
         """
+        key = self._final_status_key()
+        with _FINAL_STATUSES_LOCK:
+            status = _FINAL_STATUSES.get(key) if key is not None else None
+            if status is not None:
+                _FINAL_STATUSES.move_to_end(key)
+                return status
+
+        status = self._get_combined_status()
+        if key is not None and status in FINAL_STATES:
+            with _FINAL_STATUSES_LOCK:
+                _FINAL_STATUSES[key] = status
+                _FINAL_STATUSES.move_to_end(key)
+                while len(_FINAL_STATUSES) > FINAL_STATUSES_MAXSIZE:
+                    _FINAL_STATUSES.popitem(last=False)
+        return status
+
+    def _get_combined_status(self) -> Status:
+        """
+        Retrieves the combined status from the hoster, see
+        ``combined_status``.
+        """
+        raise NotImplementedError
+
+    def _final_status_key(self) -> Optional[str]:
+        """
+        Identifies the commit for keeping finished statuses, None if it isn't
+        known by SHA.
+        """
+        return self.url
+
+    def _forget_combined_status(self):
+        """
+        Drops the combined status, e.g. after setting a status.
+        """
+        self.invalidate('combined_status')
+        with _FINAL_STATUSES_LOCK:
+            _FINAL_STATUSES.pop(self._final_status_key(), None)
+
+    @property
+    @memoized()
+    def diff_index(self) -> Diff:
+        """
+        Retrieves the patches of the commit by filename, to look up where to
+        comment on lines. Built once per commit, unlike ``diff`` it may use
+        data that is already there.
+
+        :raises RuntimeError: If something goes wrong (network, auth...).
+        """
+        return Diff(self._get_file_diffs())
+
+    def _get_file_diffs(self) -> Iterable[FileDiff]:
+        """
+        Retrieves the diffs of all changed files for ``diff_index``.
+        """
+        return self.diff
+
+    @property
+    @memoized()
+    def diff(self) -> Diff:
+        """
+        Retrieves the structured diff of the commit, see
+        ``IGitt.Interfaces.Diff``. Use ``iter_diff`` to go through a large
+        diff without keeping it.
+
+        :raises RuntimeError: If something goes wrong (network, auth...).
+        """
+        return Diff(self.iter_diff())
+
+    def iter_diff(self) -> Iterator[FileDiff]:
+        """
+        Retrieves the diff of the commit file by file, as it is received.
+
+        :return: An iterator over FileDiff objects.
+        :raises RuntimeError: If something goes wrong (network, auth...).
+        """
         raise NotImplementedError
 
     @property
@@ -0,0 +1,402 @@
+r"""
+This module contains a structured unified diff: the files of a diff, their
+hunks and the typed lines in them.
+
+Files keep their part of the diff as text and are split into hunks only when
+these are accessed, so a large diff costs little more than its text:
+
+>>> diff = Diff.parse('diff --git a/README.md b/README.md\n'
+...                   'index 1da2df..2dacdf 100644\n'
+...                   '--- a/README.md\n'
+...                   '+++ b/README.md\n'
+...                   '@@ -1,2 +1,3 @@\n'
+...                   ' # test\n'
+...                   '-a test repo\n'
+...                   '+a tested repo\n'
+...                   '+\n')
+>>> file, = diff
+>>> file.new_path
+'README.md'
+>>> hunk, = file.hunks
+>>> [(line.type.name, line.new_number) for line in hunk.lines]
+[('CONTEXT', 1), ('REMOVED', None), ('ADDED', 2), ('ADDED', 3)]
+>>> file.position(2)
+3
+
+``parse_diff`` reads a diff line by line and yields its files one after the
+other, so a diff of many megabytes never has to be held as a whole.
+"""
+from array import array
+from bisect import bisect_left
+from enum import Enum
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+import re
+
+from IGitt import ElementDoesntExistError
+
+
+_HUNK_HEADER = re.compile(r'@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@ ?(.*)')
+
+
+class LineType(Enum):
+    """
+    The kind of a line in a hunk, by its prefix.
+    """
+
+    CONTEXT = ' '  # Unchanged
+    ADDED = '+'
+    REMOVED = '-'
+    NOTE = '\\'  # E.g. ``\ No newline at end of file``
+
+
+class DiffLine:
+    """
+    A line in a hunk.
+    """
+    __slots__ = ('type', 'content', 'old_number', 'new_number', 'position')
+
+    def __init__(self, type: LineType, content: str,
+                 old_number: Optional[int], new_number: Optional[int],
+                 position: int):
+        """
+        :param type:       The kind of the line.
+        :param content:    The line without its prefix.
+        :param old_number: The number of the line in the old file, if it is
+                           there.
+        :param new_number: The number of the line in the new file, if it is
+                           there.
+        :param position:   The position of the line in the patch of its file,
+                           counted from the first hunk header.
+        """
+        self.type = type
+        self.content = content
+        self.old_number = old_number
+        self.new_number = new_number
+        self.position = position
+
+    def __repr__(self):  # dont cover
+        return '<DiffLine {} {!r}>'.format(self.type.name, self.content)
+
+
+class Hunk:
+    """
+    A hunk of a file diff. The lines are kept as text and typed when
+    iterating over ``lines``.
+    """
+    __slots__ = ('old_start', 'old_count', 'new_start', 'new_count',
+                 'section', 'position', '_lines')
+
+    def __init__(self, old_start: int, old_count: int, new_start: int,
+                 new_count: int, section: str, position: int,
+                 lines: Tuple[str, ...]):
+        """
+        :param old_start: The first line of the hunk in the old file.
+        :param old_count: The number of lines of the old file in the hunk.
+        :param new_start: The first line of the hunk in the new file.
+        :param new_count: The number of lines of the new file in the hunk.
+        :param section:   The text after the header, e.g. a function.
+        :param position:  The position of the header in the patch.
+        :param lines:     The lines of the hunk, with their prefix.
+        """
+        self.old_start = old_start
+        self.old_count = old_count
+        self.new_start = new_start
+        self.new_count = new_count
+        self.section = section
+        self.position = position
+        self._lines = lines
+
+    @property
+    def lines(self) -> Iterator[DiffLine]:
+        """
+        Yields the lines of the hunk.
+        """
+        old_number = self.old_start
+        new_number = self.new_start
+        for position, line in enumerate(self._lines, self.position + 1):
+            # Some tools strip the space of empty unchanged lines
+            line_type = LineType(line[:1] or ' ')
+            if line_type is LineType.ADDED:
+                yield DiffLine(line_type, line[1:], None, new_number,
+                               position)
+                new_number += 1
+            elif line_type is LineType.REMOVED:
+                yield DiffLine(line_type, line[1:], old_number, None,
+                               position)
+                old_number += 1
+            elif line_type is LineType.CONTEXT:
+                yield DiffLine(line_type, line[1:], old_number, new_number,
+                               position)
+                old_number += 1
+                new_number += 1
+            else:
+                yield DiffLine(line_type, line[1:], None, None, position)
+
+
+def _split(text: str) -> List[str]:
+    """
+    Splits text into lines. Unlike ``str.splitlines`` only ``\\n`` ends a
+    line, others like form feeds may be part of the content.
+    """
+    lines = text.split('\n')
+    if lines[-1] == '':
+        lines.pop()
+    return lines
+
+
+def _hunk_counts(match) -> Tuple[int, int, int, int]:
+    """
+    Retrieves the line numbers and counts from a matched hunk header, a
+    missing count means one line.
+    """
+    old_start, old_count, new_start, new_count, _ = match.groups()
+    return (int(old_start), 1 if old_count is None else int(old_count),
+            int(new_start), 1 if new_count is None else int(new_count))
+
+
+class FileDiff:
+    """
+    The diff of one file.
+    """
+    __slots__ = ('old_path', 'new_path', 'text', '_hunks', '_new_lines',
+                 '_lines')
+
+    def __init__(self, old_path: Optional[str], new_path: Optional[str],
+                 text: str):
+        """
+        :param old_path: The path before the change, None for new files.
+        :param new_path: The path after the change, None for deleted files.
+        :param text:     The unified diff of the file: optionally a header
+                         like ``--- a/file``, then the hunks.
+        """
+        self.old_path = old_path
+        self.new_path = new_path
+        self.text = text
+        self._hunks = None  # type: Optional[Tuple[Hunk, ...]]
+        self._new_lines = None  # type: Optional[array]
+        self._lines = None  # type: Optional[List[DiffLine]]
+
+    @property
+    def hunks(self) -> Tuple[Hunk, ...]:
+        """
+        Retrieves the hunks, parsed on first access.
+        """
+        if self._hunks is None:
+            self._hunks = tuple(self._parse_hunks())
+        return self._hunks
+
+    def _parse_hunks(self) -> Iterator[Hunk]:
+        """
+        Splits the text into hunks. Anything not belonging to a hunk, like
+        the header, is skipped.
+        """
+        header = None
+        lines = []  # type: List[str]
+        position = -1
+        for line in _split(self.text):
+            match = _HUNK_HEADER.match(line)
+            if match:
+                if header is not None:
+                    yield Hunk(*header, lines=tuple(lines))
+                position += len(lines) + 1
+                header = _hunk_counts(match) + (match.group(5), position)
+                lines = []
+            elif header is not None and line[:1] in ('', ' ', '+', '-', '\\'):
+                lines.append(line)
+
+        if header is not None:
+            yield Hunk(*header, lines=tuple(lines))
+
+    def line(self, line_nr: int) -> Optional[DiffLine]:
+        """
+        Retrieves a line of the new file if the diff covers it. The lines are
+        indexed on first use and looked up by bisection.
+
+        :param line_nr: The line number in the new file.
+        :return: The added or unchanged line, None if it isn't covered.
+        """
+        if self._new_lines is None:
+            new_lines, lines = array('l'), []
+            for hunk in self.hunks:
+                for line in hunk.lines:
+                    if line.new_number is not None:
+                        new_lines.append(line.new_number)
+                        lines.append(line)
+            self._new_lines, self._lines = new_lines, lines
+
+        index = bisect_left(self._new_lines, line_nr)
+        if (index < len(self._new_lines) and
+                self._new_lines[index] == line_nr):
+            return self._lines[index]
+        return None
+
+    def position(self, line_nr: int) -> Optional[int]:
+        """
+        Retrieves the position of a line of the new file in the patch,
+        counted from the first hunk header, as GitHub wants it for comments.
+
+        :param line_nr: The line number to identify.
+        :return: The position in the patch or None if the line isn't covered.
+        """
+        line = self.line(line_nr)
+        return None if line is None else line.position
+
+    def __str__(self):
+        return self.text
+
+    def __repr__(self):  # dont cover
+        return '<FileDiff {}>'.format(self.new_path or self.old_path)
+
+
+def _path(header: str) -> Optional[str]:
+    """
+    Retrieves the path from a ``---`` or ``+++`` line, None for
+    ``/dev/null``.
+    """
+    path = header[4:].split('\t', 1)[0]
+    if path == '/dev/null':
+        return None
+    return path[2:] if path[:2] in ('a/', 'b/') else path
+
+
+def _git_paths(header: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Guesses the paths from a ``diff --git a/old b/new`` line, used if the
+    diff has no ``---`` and ``+++`` lines like for binary files.
+    """
+    old, _, new = header[len('diff --git a/'):].partition(' b/')
+    return old or None, new or None
+
+
+def parse_diff(lines: Iterable[str]) -> Iterator[FileDiff]:
+    """
+    Reads a unified diff, as written by ``git diff``, line by line and yields
+    the diff of each file as soon as it is complete. The ``diff --git`` and
+    ``index`` lines are dropped.
+
+    >>> [file.new_path for file in parse_diff([
+    ...     '--- a/a.md', '+++ b/a.md', '@@ -1 +1 @@', '--- removed', '+a',
+    ...     '--- a/b.md', '+++ b/b.md', '@@ -1 +0,0 @@', '-b'])]
+    ['a.md', 'b.md']
+
+    :param lines: The lines of the diff, without line ends.
+    :return: An iterator over the FileDiff objects.
+    """
+    paths = [None, None]  # type: List[Optional[str]]
+    text = []  # type: List[str]
+    old_left = new_left = 0
+    has_hunks = False
+
+    for line in lines:
+        if old_left > 0 or new_left > 0:
+            # Inside a hunk, only its lines can come
+            text.append(line)
+            prefix = line[:1]
+            if prefix in ('', ' ', '-'):
+                old_left -= 1
+            if prefix in ('', ' ', '+'):
+                new_left -= 1
+            continue
+
+        match = _HUNK_HEADER.match(line)
+        if match:
+            old_left, new_left = _hunk_counts(match)[1::2]
+            has_hunks = True
+        elif line.startswith('diff --git') or (line.startswith('--- ') and
+                                                has_hunks):
+            if text:
+                yield FileDiff(paths[0], paths[1], '\n'.join(text) + '\n')
+            text = []
+            has_hunks = False
+            paths = list(_git_paths(line)) if line.startswith('diff') else [
+                None, None]
+            if line.startswith('diff'):
+                continue
+        elif line.startswith('index ') and not has_hunks:
+            continue
+
+        if not has_hunks:
+            if line.startswith('--- '):
+                paths[0] = _path(line)
+            elif line.startswith('+++ '):
+                paths[1] = _path(line)
+            elif line.startswith('rename from '):
+                paths[0] = line[len('rename from '):]
+            elif line.startswith('rename to '):
+                paths[1] = line[len('rename to '):]
+        text.append(line)
+
+    if text:
+        yield FileDiff(paths[0], paths[1], '\n'.join(text) + '\n')
+
+
+class Diff:
+    """
+    The diff of a commit, consisting of the diffs of its files.
+    """
+
+    def __init__(self, files: Iterable[FileDiff]):
+        """
+        :param files: The diffs of the files.
+        """
+        self.files = tuple(files)
+        self._by_path = {}
+        for file in self.files:
+            # The first diff of a path is used, for both of its names
+            for path in (file.new_path, file.old_path):
+                if path is not None:
+                    self._by_path.setdefault(path, file)
+
+    @classmethod
+    def parse(cls, text: str) -> 'Diff':
+        """
+        Creates a Diff from the text of a unified diff, see ``parse_diff``.
+        """
+        return cls(parse_diff(_split(text)))
+
+    def __iter__(self) -> Iterator[FileDiff]:
+        return iter(self.files)
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._by_path
+
+    def file(self, path: str) -> FileDiff:
+        """
+        Retrieves the diff of a file by its path before or after the change.
+
+        :raises ElementDoesntExistError: If the file isn't in the diff.
+        """
+        try:
+            return self._by_path[path]
+        except KeyError:
+            raise ElementDoesntExistError('The file does not exist.')
+
+    def patch(self, path: str) -> str:
+        """
+        Retrieves the unified diff of a file, see ``file``.
+        """
+        return self.file(path).text
+
+    def line(self, path: str, line_nr: int) -> Optional[DiffLine]:
+        """
+        Retrieves a line of the new version of a file, see ``file`` and
+        ``FileDiff.line``.
+        """
+        return self.file(path).line(line_nr)
+
+    def position(self, path: str, line_nr: int) -> Optional[int]:
+        """
+        Retrieves the position of a line of the new version of a file in its
+        patch, see ``file`` and ``FileDiff.position``.
+        """
+        return self.file(path).position(line_nr)
+
+    def __str__(self):
+        return ''.join(file.text for file in self.files)
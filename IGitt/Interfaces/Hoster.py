@@ -1,12 +1,102 @@
 """
 Contains the git Hoster abstraction.
 """
-from typing import Iterator, Set, Union
+from threading import Lock
+from time import monotonic
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, \
+    Union
 
 from IGitt.Interfaces import IGittObject, Token
 from IGitt.Interfaces.Repository import Repository
 from IGitt.Interfaces.Issue import Issue
 from IGitt.Interfaces.MergeRequest import MergeRequest
+from IGitt.Utils import invalidate_objects
+
+
+class RepositoryInventory:
+    """
+    The repositories a user has access to, kept in memory. The views a
+    hoster offers, like the repositories the user can write to, are selected
+    from it and their repository objects are shared.
+
+    The listing is renewed on every access unless ``max_age`` allows using
+    it for a while, and on ``refresh``. The hosters revalidate every page
+    with its ETag, so an unchanged listing is not transferred again and keeps
+    the views.
+    """
+
+    def __init__(self, fetch: Callable[[], List[dict]],
+                 make: Callable[[dict], Repository], max_age: float=0):
+        """
+        :param fetch:   Lists the data of the repositories.
+        :param make:    Creates a repository object from its data.
+        :param max_age: The number of seconds the listing is used for without
+                        revalidating it, 0 to revalidate it on every access.
+        """
+        self._fetch = fetch
+        self._make = make
+        self._max_age = max_age
+        self._lock = Lock()
+        self._data = None  # type: Optional[List[dict]]
+        self._fetched = 0.0
+        self._objects = {}  # type: Dict[int, Repository]
+        self._views = {}  # type: Dict[str, Set[Repository]]
+
+    def refresh(self):
+        """
+        Lists the repositories again. The views are only selected again if
+        anything changed.
+
+        :raises RuntimeError: If something goes wrong (network, auth...).
+        """
+        data = self._fetch()
+        with self._lock:
+            if data != self._data:
+                self._data = data
+                self._objects.clear()
+                self._views.clear()
+            self._fetched = monotonic()
+
+    @property
+    def data(self) -> List[dict]:
+        """
+        Retrieves the data of the repositories, listing them if needed.
+        """
+        self._ensure_fresh()
+        return self._data
+
+    def _ensure_fresh(self):
+        """
+        Lists the repositories if they weren't yet or ``max_age`` passed.
+        """
+        if (self._data is None or
+                monotonic() - self._fetched >= self._max_age):
+            self.refresh()
+
+    def view(self, name: str,
+             select: Callable[[List[dict]], Iterable[dict]]
+            ) -> Set[Repository]:
+        """
+        Retrieves the repositories selected by ``select``, which is only
+        called once per listing.
+
+        :param name:   Identifies the view, e.g. ``write``.
+        :param select: Selects the data of the repositories in the view from
+                       the data of all.
+        :return: A set of repository objects.
+        """
+        self._ensure_fresh()
+        # The view is selected from and stored with the same listing, even
+        # if another thread refreshes it meanwhile
+        with self._lock:
+            if name not in self._views:
+                view = set()
+                for repo in select(self._data):
+                    if repo['id'] not in self._objects:
+                        self._objects[repo['id']] = self._make(repo)
+                    view.add(self._objects[repo['id']])
+                self._views[name] = view
+            return set(self._views[name])
 
 
 class Hoster(IGittObject):
@@ -14,6 +104,17 @@ class Hoster(IGittObject):
     Abstracts a service like GitHub and allows e.g. to query for available
     repositories and stuff like that.
     """
+    @staticmethod
+    def _invalidating(events):
+        """
+        Passes through the events of a webhook handler. Everything cached
+        about the objects affected by an event is invalidated before it is
+        yielded, except for the objects built from the webhook payload.
+        """
+        for action, objects in events:
+            invalidate_objects(objects)
+            yield action, objects
+
     @staticmethod
     def get_repo_name(webhook) -> str:
         """
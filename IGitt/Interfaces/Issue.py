@@ -7,11 +7,60 @@ from typing import Set
 from typing import List
 
 from IGitt.Interfaces import IGittObject
+from IGitt.Interfaces import IssueStates
 from IGitt.Interfaces.Comment import Comment
 from IGitt.Interfaces.Repository import Repository
 from IGitt.Interfaces.User import User
 
 
+class IssueEdit:
+    """
+    Collects changes to an issue and sends them with as few requests as
+    possible when the ``with`` block is left without an exception:
+
+    >>> from unittest.mock import MagicMock
+    >>> issue = MagicMock()
+    >>> with IssueEdit(issue) as edit:
+    ...     edit.title = 'New title'
+    ...     edit.labels = {'bug'}
+    >>> issue._apply_edit.call_args[0][0] == {'title': 'New title',
+    ...                                       'labels': {'bug'}}
+    True
+
+    Fields which weren't changed in the block are read from the issue.
+    """
+    FIELDS = frozenset({'title', 'description', 'labels', 'assignees',
+                        'state'})
+
+    def __init__(self, issue):
+        """
+        :param issue: The Issue object to edit.
+        """
+        object.__setattr__(self, '_issue', issue)
+        object.__setattr__(self, 'changes', {})
+
+    def __getattr__(self, name):
+        if name not in self.FIELDS:
+            raise AttributeError(name)
+        if name in self.changes:
+            return self.changes[name]
+        return getattr(self._issue, name)
+
+    def __setattr__(self, name, value):
+        if name not in self.FIELDS:
+            raise AttributeError('{} cannot be edited.'.format(name))
+        if name == 'state':
+            value = IssueStates(getattr(value, 'value', value))
+        self.changes[name] = value
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None and self.changes:
+            self._issue._apply_edit(self.changes)
+
+
 class Issue(IGittObject):
     """
     Represents an issue on GitHub or GitLab or a bug report on bugzilla or so.
@@ -90,6 +139,27 @@ class Issue(IGittObject):
         """
         raise NotImplementedError
 
+    def edit(self) -> IssueEdit:
+        """
+        Returns a context manager collecting changes to ``title``,
+        ``description``, ``labels``, ``assignees`` and ``state``, which are
+        sent in as few requests as possible at the end of the block::
+
+            with issue.edit() as edit:
+                edit.title = 'New title'
+                edit.labels = {'bug'}
+        """
+        return IssueEdit(self)
+
+    def _apply_edit(self, changes: dict):
+        """
+        Sends the changes collected by an IssueEdit to the hoster.
+
+        :param changes: A dict mapping the field names to the new values.
+        :raises RuntimeError: If something goes wrong (network, auth...).
+        """
+        raise NotImplementedError
+
     def unassign(self, *usernames: List[User]):
         """
         Unassigns given users from issue.
@@ -2,17 +2,27 @@
 Contains a class that represents a request to merge something into some git
 branch.
 """
+from concurrent.futures import as_completed
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from itertools import chain
+from typing import Dict
+from typing import Iterable
 from typing import List
 from typing import Set
+from typing import Tuple
 import re
 
+from IGitt import ElementDoesntExistError
 from IGitt.Interfaces import MergeRequestStates
 from IGitt.Interfaces.Commit import Commit
 from IGitt.Interfaces.CommitStatus import Status
+from IGitt.Interfaces.Diff import Diff
+from IGitt.Interfaces.Diff import DiffLine
+from IGitt.Interfaces.Diff import FileDiff
 from IGitt.Interfaces.Issue import Issue
 from IGitt.Interfaces.User import User
+from IGitt.Utils import memoized
 
 
 SUPPORTED_HOST_KEYWORD_REGEX = {
@@ -152,6 +162,65 @@ class MergeRequest(Issue):
         """
         raise NotImplementedError
 
+    @property
+    @memoized()
+    def diff(self) -> Diff:
+        """
+        Retrieves the structured diff of all changes of the merge request, see
+        ``IGitt.Interfaces.Diff``.
+
+        :raises RuntimeError: If something goes wrong (network, auth...).
+        """
+        return Diff(self._get_file_diffs())
+
+    def _get_file_diffs(self) -> Iterable[FileDiff]:
+        """
+        Retrieves the diffs of all changed files from the hoster.
+        """
+        raise NotImplementedError
+
+    def review(self, comments: Iterable[Tuple[str, int, str]],
+               message: str=''):
+        """
+        Places many comments on lines of the merge request at once, e.g. the
+        findings of a linter, instead of one request and notification each.
+        The lines are looked up in one parse of the diff. Comments on lines
+        the diff doesn't cover are added to one summary comment with
+        ``message``.
+
+        :param comments: The file, relative to the repository root, the line
+                         in its new version and the text of each comment.
+        :param message:  The text of the summary comment.
+        :raises RuntimeError: If something goes wrong (network, auth...).
+        """
+        placed = []  # type: List[Tuple[str, DiffLine, str]]
+        summary = [message] if message else []
+        for file, line, body in comments:
+            try:
+                diff_line = self.diff.line(file, line)
+            except ElementDoesntExistError:
+                diff_line = None
+
+            if diff_line is None:
+                summary.append('Comment on file {}, line {}.\n\n{}'.format(
+                    file, line, body))
+            else:
+                placed.append((file, diff_line, body))
+
+        if placed or summary:
+            self._submit_review(placed, '\n\n'.join(summary))
+
+    def _submit_review(self, comments: List[Tuple[str, DiffLine, str]],
+                       message: str):
+        """
+        Submits the comments of ``review`` to the hoster.
+
+        :param comments: The file, the line in the diff and the text of each
+                         comment on a line.
+        :param message:  The text of the summary comment, may be empty.
+        """
+        raise NotImplementedError
+
     @property
     def created(self) -> datetime:
         """
@@ -268,11 +337,33 @@ class MergeRequest(Issue):
         Returns True if all commits of the merge request have a success state.
         If you wish to only get the head state, use mr.head.combined_status.
         """
-        statuses = set(map(lambda commit: commit.combined_status,
-                           self.commits))
-        if Status.PENDING in statuses or Status.FAILED in statuses:
-            return False
-        return True
+        statuses = self.get_combined_statuses(
+            stop_on={Status.PENDING, Status.FAILED})
+        return not {Status.PENDING, Status.FAILED} & set(statuses.values())
+
+    def get_combined_statuses(self, stop_on: Set[Status]=frozenset(),
+                              max_workers: int=8) -> Dict[str, Status]:
+        """
+        Retrieves the combined statuses of all commits concurrently.
+
+        :param stop_on:     Statuses after which no further ones are retrieved,
+                            e.g. if one failure is all one needs to know.
+        :param max_workers: The number of statuses retrieved at once.
+        :return: The statuses by commit SHA. If stopped early, only the ones
+                 retrieved until then.
+        """
+        statuses = {}  # type: Dict[str, Status]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(lambda commit: commit.combined_status,
+                                       commit): commit
+                       for commit in self.commits}
+            for future in as_completed(futures):
+                statuses[futures[future].sha] = future.result()
+                if future.result() in stop_on:
+                    for pending in futures:
+                        pending.cancel()
+                    break
+        return statuses
 
     @property
     def mentioned_issues(self) -> Set[Issue]:
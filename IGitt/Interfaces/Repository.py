@@ -108,13 +108,16 @@ class Repository(IGittObject):
         """
         raise NotImplementedError
 
-    def create_label(self, name: str, color: str):
+    def create_label(self, name: str, color: str, exist_ok: bool=False):
         """
         Creates a new label.
 
         :param name: The name of the label to create.
         :param color: A HTML color value with a leading #.
-        :raises ElementAlreadyExistsError: If the label name already exists.
+        :param exist_ok: Whether to leave an existing label alone instead of
+                         raising, without writing anything.
+        :raises ElementAlreadyExistsError: If the label name already exists
+                                           and exist_ok is False.
         :raises RuntimeError: If something goes wrong (network, auth...).
         """
         raise NotImplementedError
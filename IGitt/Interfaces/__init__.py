@@ -2,16 +2,29 @@
 This package contains an abstraction for a git repository.
 """
 from collections import defaultdict
+from collections.abc import Set
 from enum import Enum
 from json.decoder import JSONDecodeError
+from threading import Lock
+from threading import RLock
+from time import monotonic
+from typing import Callable
+from typing import Iterator
+from typing import List
 from typing import Optional
+from urllib.parse import parse_qs
+from urllib.parse import urlencode
+from urllib.parse import urlparse
 
 from backoff import on_exception, expo
 from requests import Session
 
+from IGitt.Utils import explain_request
+
 
 HEADERS = {'User-Agent': 'IGitt'}
 _RESPONSES = defaultdict()
+_RESPONSES_LOCK = Lock()
 
 
 class IGittObject:
@@ -58,7 +71,21 @@ class Token:
     """
     Base class for different types of tokens used for different methods of
     authentications.
+
+    Set ``freshness_policy`` to an ``IGitt.Utils.FreshnessPolicy`` to apply
+    it to all objects using this token.
     """
+    freshness_policy = None
+
+    def __getstate__(self):
+        """
+        Leaves out the locks of results memoized on the token, they can't be
+        pickled and are created again when needed.
+        """
+        state = dict(vars(self))
+        state.pop('_memo_locks', None)
+        return state
+
     @property
     def headers(self):
         """
@@ -87,27 +114,89 @@ def is_client_error_or_unmodified(exception):
     return (400 <= exception.args[1] < 500) or (exception.args[1] == 304)
 
 
+def _response_key(method, url: str) -> str:
+    """
+    Identifies the response to a request in ``_RESPONSES``: the URL with the
+    query parameters the session of ``method`` adds, as responses differ by
+    them.
+    """
+    params = getattr(getattr(method, '__self__', None), 'params', None)
+    if not params:
+        return url
+    return '{}{}{}'.format(url, '&' if '?' in url else '?',
+                           urlencode(sorted(params.items()), doseq=True))
+
+
 @on_exception(expo, ConnectionError, max_tries=8)
 @on_exception(expo,
               RuntimeError,
               max_tries=3,
               giveup=is_client_error_or_unmodified)
-def get_response(method, url, json=frozenset()):
+def get_response(method, url, json=frozenset(), stream: bool=False):
     """
     Sends a request and checks the response for errors, and retries unless it's
     a HTTP client error.
+
+    Streamed responses, whose body is read while it arrives, are neither
+    cached nor revalidated.
     """
-    headers = ({'If-None-Match': _RESPONSES[url].headers.get('ETag')}
-               if url in _RESPONSES else {})
-    response = method(url, json=dict(json or {}), headers=headers)
-    if response.status_code == 304 and url in _RESPONSES:
-        return _RESPONSES[url]
+    key = _response_key(method, url)
+    with _RESPONSES_LOCK:
+        cached = None if stream else _RESPONSES.get(key)
+    headers = ({'If-None-Match': cached.headers.get('ETag')}
+               if cached is not None else {})
+    started = monotonic()
+    kwargs = {'stream': True} if stream else {}
+    response = method(url, json=dict(json or {}), headers=headers, **kwargs)
+    explain_request(getattr(method, '__name__', '').upper(), url,
+                    response.status_code, monotonic() - started)
+    if response.status_code == 304 and cached is not None:
+        return cached
     elif response.status_code >= 300:
         raise RuntimeError(response.text, response.status_code)
-    _RESPONSES[url] = response
+    if not stream:
+        with _RESPONSES_LOCK:
+            _RESPONSES[key] = response
     return response
 
 
+def _get_session(token: Token, query_params: Optional[dict]=None,
+                 headers: Optional[dict]=None) -> Session:
+    """
+    Creates a session sending the given query parameters and headers as well
+    as the ones needed for authentication with each request.
+    """
+    session = Session()
+    session.headers.update({**dict(headers or {}), **HEADERS, **token.headers})
+    session.params.update({**dict(query_params or {}), **token.parameter})
+    return session
+
+
+def _iter_pages(method, url: str, data: Optional[dict]=None):
+    """
+    Yields the responses for all pages of ``url`` by following the ``Link``
+    header. The next page is only requested when asked for.
+    """
+    resp = get_response(method, url, json=data)
+    yield resp
+    while resp.links.get('next', False):
+        resp = get_response(method, resp.links.get('next')['url'], json=data)
+        yield resp
+
+
+def _merge_envelope(first: dict, pages) -> dict:
+    """
+    Adds the lists of further pages to the first page of an envelope, a
+    paginated response listing its items under a key other than ``items``.
+    Single objects have no further pages and are returned as they are.
+    """
+    for resp in pages:
+        for key, value in resp.json().items():
+            if isinstance(value, list) and isinstance(first.get(key), list):
+                first[key].extend(value)
+    return first
+
+
 def _fetch(base_url: str, req_type: str, token: Token, url: str,
            data: Optional[dict]=None, query_params: Optional[dict]=None,
            headers: Optional[dict]=None):
@@ -126,9 +215,7 @@ def _fetch(base_url: str, req_type: str, token: Token, url: str,
                   git patch or diff) and the HTTP status code.
     """
     data_container = []
-    session = Session()
-    session.headers.update({**dict(headers or {}), **HEADERS, **token.headers})
-    session.params.update({**dict(query_params or {}), **token.parameter})
+    session = _get_session(token, query_params, headers)
     req_methods = {
         'get': session.get,
         'post': session.post,
@@ -137,7 +224,8 @@ def _fetch(base_url: str, req_type: str, token: Token, url: str,
         'delete': session.delete
     }
     method = req_methods[req_type]
-    resp = get_response(method, base_url + url, json=data)
+    pages = _iter_pages(method, base_url + url, data)
+    resp = next(pages)
 
     # DELETE request returns no response
     if not len(resp.text):
@@ -146,8 +234,9 @@ def _fetch(base_url: str, req_type: str, token: Token, url: str,
     while True:
         try:
             if isinstance(resp.json(), dict) and 'items' not in resp.json():
-                # if response is a single object
-                return resp.json()
+                # if response is a single object or an envelope like
+                # ``{'total_count': 2, 'repositories': [...]}``
+                return _merge_envelope(resp.json(), pages)
             else:
                 if isinstance(resp.json(), list):
                     # if response is a list of objects
@@ -155,16 +244,331 @@ def _fetch(base_url: str, req_type: str, token: Token, url: str,
                 elif 'items' in resp.json():
                     # if response is a dict with `items` key
                     data_container.extend(resp.json()['items'])
-                if not resp.links.get('next', False):
+                resp = next(pages, None)
+                if resp is None:
                     return data_container
-                resp = get_response(method,
-                                    resp.links.get('next')['url'],
-                                    json=data)
         except JSONDecodeError:
             # if the request has a text response, for e.g. a git diff.
             return resp.text
 
 
+def _stream_lines(base_url: str, token: Token, url: str,
+                  query_params: Optional[dict]=None,
+                  headers: Optional[dict]=None,
+                  chunk_size: int=64 * 1024) -> Iterator[str]:
+    """
+    Retrieves a text response line by line while it arrives, e.g. a large
+    diff, without holding all of it. Only ``\\n`` ends a line.
+
+    :param base_url: The base URL which is used to generate sub URLs.
+    :param token: A Token object.
+    :param url: E.g. ``/repo``
+    :param query_params: The query parameters.
+    :param headers: The request headers, e.g. ``Accept``.
+    :param chunk_size: The number of bytes read at once.
+    :return: An iterator over the lines, without line ends.
+    :raises RuntimeError: If the response indicates any problem.
+    """
+    session = _get_session(token, query_params, headers)
+    response = get_response(session.get, base_url + url, stream=True)
+    encoding = response.encoding or 'utf-8'
+    rest = b''
+    with response:
+        for chunk in response.iter_content(chunk_size):
+            lines = (rest + chunk).split(b'\n')
+            rest = lines.pop()
+            for line in lines:
+                yield line.decode(encoding, 'replace')
+    if rest:
+        yield rest.decode(encoding, 'replace')
+
+
+def _iter_items(base_url: str, token: Token, url: str,
+                query_params: Optional[dict]=None,
+                headers: Optional[dict]=None) -> Iterator[dict]:
+    """
+    Retrieves the items of a paginated listing, requesting the next page only
+    when the items of the previous one are used up.
+
+    :param base_url: The base URL which is used to generate sub URLs.
+    :param token: A Token object.
+    :param url: E.g. ``/repo``
+    :param query_params: The query parameters.
+    :param headers: The request headers.
+    :return: An iterator over the items.
+    :raises RuntimeError: If a response indicates any problem.
+    """
+    session = _get_session(token, query_params, headers)
+    for resp in _iter_pages(session.get, base_url + url):
+        yield from _page_items(resp)
+
+
+def batched_graphql(query: Callable, selections: List[str], fragments: str,
+                    batch_size: int) -> List[Optional[dict]]:
+    """
+    Sends GraphQL selections, ``batch_size`` in one query, each under its own
+    alias.
+
+    :param query: Sends a query and returns its ``data``.
+    :param selections: The selections, e.g. ``project(fullPath: "a/b") {...}``.
+    :param fragments: The fragment definitions the selections use.
+    :param batch_size: The number of selections sent per query.
+    :return: The results of the selections in the same order.
+    """
+    results = []  # type: List[Optional[dict]]
+    for start in range(0, len(selections), batch_size):
+        batch = selections[start:start + batch_size]
+        data = query('query {{ {} }}\n{}'.format(
+            '\n'.join('o{}: {}'.format(index, selection)
+                      for index, selection in enumerate(batch)),
+            fragments))
+        results.extend(data['o{}'.format(index)]
+                       for index in range(len(batch)))
+    return results
+
+
+def _page_items(resp) -> list:
+    """
+    Retrieves the items listed in a page of a paginated response.
+    """
+    if not len(resp.text):
+        return []
+    items = resp.json()
+    if isinstance(items, dict):
+        if 'items' in items:
+            return items['items']
+        # An envelope like ``{'total_count': 2, 'repositories': [...]}``
+        return next((value for value in items.values()
+                     if isinstance(value, list)), [])
+    return items
+
+
+class LazyCollection(Set):
+    """
+    A set of IGitt objects which are retrieved page by page, only as far as
+    needed. ``len()`` is taken from the counts the hoster sends along if
+    possible, iterating and slicing stop requesting pages once they have
+    enough items. Items come in the order the hoster lists them in, which
+    can be chosen with ``order_by``::
+
+        latest = repository.issues.order_by('updated')[:20]
+
+    Related data all objects need can be loaded along with each page in
+    parallel, see ``prefetch``.
+
+    Besides that it behaves like a frozenset.
+    """
+
+    def __init__(self, base_url: str, token: Token, url: str,
+                 make: Callable[[dict], IGittObject],
+                 params: Optional[dict]=None, headers: Optional[dict]=None,
+                 select: Optional[Callable[[dict], bool]]=None,
+                 order_params: Optional[Callable[[str, bool], dict]]=None,
+                 empty_on: tuple=(), prefetch: tuple=()):
+        """
+        :param base_url: The API URL of the hoster.
+        :param token: The token to authenticate with.
+        :param url: The URL of the listing, e.g. ``/repos/a/b/issues``.
+        :param make: Builds an object from the data of an item.
+        :param params: The query parameters to send.
+        :param headers: The headers to send.
+        :param select: Tells which items belong to the collection, if not all.
+        :param order_params:
+            Turns a field and whether to order descending into the query
+            parameters ordering the listing on the hoster.
+        :param empty_on: Status codes meaning that the collection is empty.
+        :param prefetch:
+            Attributes to retrieve for all objects of a page as soon as it is
+            loaded, see ``IGitt.Utils.prefetch``.
+        """
+        self._base_url = base_url
+        self._token = token
+        self._url = url
+        self._make = make
+        self._params = dict(params or {})
+        self._headers = headers
+        self._select = select
+        self._order_params = order_params
+        self._empty_on = empty_on
+        self._prefetch = tuple(prefetch)
+        self._session = _get_session(token, self._params, headers)
+        self._pages = None  # type: Optional[Iterator]
+        self._first = None
+        self._objects = []
+        self._done = False
+        self._total = None  # type: Optional[int]
+        # Guards the page iterator, iterating from several threads is fine
+        self._lock = RLock()
+
+    @classmethod
+    def _from_iterable(cls, iterable):
+        """
+        Results of set operations are plain sets.
+        """
+        return set(iterable)
+
+    def _load_page(self, seen: Optional[int]=None) -> bool:
+        """
+        Retrieves the next page.
+
+        :param seen: The number of objects the caller knows about. If another
+                     thread loaded more meanwhile, no page is retrieved.
+        :return: False if there was no page left.
+        """
+        with self._lock:
+            if seen is not None and len(self._objects) > seen:
+                return True
+            return self._load_next_page()
+
+    def _load_next_page(self) -> bool:
+        """
+        Retrieves the next page, the lock must be held.
+        """
+        if self._done:
+            return False
+        if self._pages is None:
+            self._pages = _iter_pages(self._session.get,
+                                      self._base_url + self._url)
+
+        try:
+            resp = next(self._pages)
+        except StopIteration:
+            self._done = True
+            return False
+        except RuntimeError as ex:
+            if self._first is None and ex.args[1] in self._empty_on:
+                self._done = True
+                return False
+            raise
+
+        if self._first is None:
+            self._first = resp
+        objects = [self._make(item) for item in _page_items(resp)
+                   if self._select is None or self._select(item)]
+        if self._prefetch:
+            # Don't move to module, leads to circular imports
+            from IGitt.Utils import prefetch
+            prefetch(objects, self._prefetch)
+        self._objects.extend(objects)
+        self._done = not resp.links.get('next', False)
+        return True
+
+    def _load_until(self, count: Optional[int]=None):
+        """
+        Retrieves pages until ``count`` objects are known or all are loaded.
+        """
+        with self._lock:
+            while ((count is None or len(self._objects) < count) and
+                   self._load_next_page()):
+                pass
+
+    def _count(self) -> Optional[int]:
+        """
+        Determines the number of items without loading all pages, if possible.
+        """
+        if self._select is not None:
+            return None
+
+        headers = self._first.headers
+        if 'X-Total' in headers:
+            return int(headers['X-Total'])
+
+        data = self._first.json()
+        if isinstance(data, dict) and 'total_count' in data:
+            return data['total_count']
+
+        last = self._first.links.get('last')
+        page = last and parse_qs(urlparse(last['url']).query).get('page')
+        if not page:
+            return None
+
+        # all pages but the last one are as full as the first one
+        last_page = get_response(self._session.get, last['url'])
+        return ((int(page[0]) - 1) * len(_page_items(self._first)) +
+                len(_page_items(last_page)))
+
+    def __len__(self):
+        with self._lock:
+            if self._total is None:
+                self._load_until(1)
+                self._total = None if not self._done else len(self._objects)
+                if self._total is None:
+                    self._total = self._count()
+                if self._total is None:
+                    self._load_until()
+                    self._total = len(self._objects)
+        return self._total
+
+    def __iter__(self):
+        index = 0
+        while index < len(self._objects) or self._load_page(index):
+            if index < len(self._objects):
+                yield self._objects[index]
+                index += 1
+
+    def __contains__(self, value):
+        return any(obj == value for obj in self)
+
+    def __getitem__(self, index):
+        """
+        Retrieves the object(s) at the given index or slice, in the order the
+        hoster lists them in. Only the pages needed are requested.
+        """
+        if isinstance(index, slice):
+            bounds = (index.start or 0, index.stop)
+            if index.stop is None or min(bounds) < 0:
+                self._load_until()
+            else:
+                self._load_until(max(bounds))
+        else:
+            self._load_until(None if index < 0 else index + 1)
+        return self._objects[index]
+
+    def order_by(self, field: str, descending: bool=True) -> 'LazyCollection':
+        """
+        Returns a collection of the same objects, listed in the given order by
+        the hoster.
+
+        :param field: The field to order by, e.g. ``created`` or ``updated``.
+        :param descending: Whether to start with the highest values.
+        :raises NotImplementedError: If this listing can't be ordered.
+        """
+        if self._order_params is None:
+            raise NotImplementedError
+        return self._derive(
+            {**self._params, **self._order_params(field, descending)},
+            self._prefetch)
+
+    def prefetch(self, *hints: str) -> 'LazyCollection':
+        """
+        Returns a collection of the same objects, retrieving the given
+        attributes for all objects of a page concurrently when the page is
+        loaded::
+
+            for mr in repository.merge_requests.prefetch(
+                    'commits', 'author', 'head.combined_status'):
+                ...  # no further requests
+
+        :param hints:
+            The attributes to retrieve. Dots access attributes of attributes.
+        """
+        return self._derive(self._params, self._prefetch + hints)
+
+    def _derive(self, params: dict, prefetch: tuple) -> 'LazyCollection':
+        """
+        Creates a collection of the same listing with other query parameters
+        and prefetch hints.
+        """
+        return LazyCollection(
+            self._base_url, self._token, self._url, self._make, params,
+            self._headers, self._select, self._order_params, self._empty_on,
+            prefetch)
+
+    def __repr__(self):  # dont cover
+        return '<{} of {}{}>'.format(type(self).__name__,
+                                     self._base_url, self._url)
+
+
 class AccessLevel(Enum):
     """
     Different access levels for users.
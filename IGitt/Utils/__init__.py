@@ -1,7 +1,257 @@
 """
 Provides useful stuff, generally!
 """
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from datetime import datetime
+from datetime import timedelta
+from enum import Enum
+from functools import wraps
+from importlib import import_module
+from itertools import count
+from threading import Lock
+from threading import RLock
+from threading import Thread
+from time import monotonic
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
 from typing import Optional
+from typing import Tuple
+from typing import Union
+from weakref import WeakValueDictionary
+import logging
+import re
+import sys
+
+
+class FreshnessPolicy:
+    """
+    Describes for how long data retrieved from the hoster may be served
+    without asking the hoster again.
+
+    Every refresh goes through a conditional request (``If-None-Match``), so
+    revalidating unchanged data only costs a round trip and no rate limit.
+    """
+
+    def __init__(self,
+                 max_age: Optional[float]=None,
+                 stale_while_revalidate: float=0):
+        """
+        :param max_age:
+            Seconds for which fetched data is considered fresh. ``None``
+            means the data never gets stale.
+        :param stale_while_revalidate:
+            Seconds after ``max_age`` during which stale data is still served
+            while it gets refreshed in the background.
+        """
+        self.max_age = max_age
+        self.stale_while_revalidate = stale_while_revalidate
+
+    def is_fresh(self, age: float) -> bool:
+        """
+        Returns True if data of the given age can be served as is.
+        """
+        return self.max_age is None or age <= self.max_age
+
+    def may_serve_stale(self, age: float) -> bool:
+        """
+        Returns True if data of the given age can be served while it gets
+        refreshed in the background.
+        """
+        return age <= self.max_age + self.stale_while_revalidate
+
+
+def memoized(maxsize: Optional[int]=128, ttl: Optional[float]=None):
+    """
+    Caches the results of a method on the object it is called on. Unlike
+    ``functools.lru_cache`` this doesn't keep the objects alive, the results
+    are released together with the object. Put it below ``@property`` to
+    memoize a property.
+
+    >>> class Example(CachedDataMixin):
+    ...     calls = 0
+    ...     @memoized(maxsize=2)
+    ...     def square(self, number):
+    ...         Example.calls += 1
+    ...         return number ** 2
+    >>> example = Example()
+    >>> example.square(3), example.square(3), Example.calls
+    (9, 9, 1)
+
+    Results are computed again once the data of the object changed, e.g.
+    because it was refreshed. ``CachedDataMixin.refresh`` drops all results of
+    an object, single ones can be dropped with ``invalidate`` and set with
+    ``prime``:
+
+    >>> example.prime('square', 0, 3)
+    >>> example.square(3)
+    0
+    >>> example.invalidate('square')
+    >>> example.square(3), Example.calls
+    (9, 2)
+
+    :param maxsize:
+        The number of results kept per object and method, the least recently
+        used ones are dropped first. None for no limit.
+    :param ttl: Seconds after which a result is computed again, None for never.
+    """
+    def decorator(func):
+        """
+        Wraps ``func`` into the memoizing function.
+        """
+        @wraps(func)
+        def wrapper(obj, *args, **kwargs):
+            key = _memo_key(args, kwargs)
+            # Held while computing, so concurrent callers compute only once
+            with _compute_lock(obj, func.__name__, key):
+                with _memo_lock(obj):
+                    found, value = _lookup_memo(obj, func.__name__, key, ttl)
+                    if found:
+                        return value
+
+                value = func(obj, *args, **kwargs)
+                with _memo_lock(obj):
+                    _store_memo(obj, func.__name__, key, value, maxsize)
+                return value
+
+        return wrapper
+
+    return decorator
+
+
+def primable(func):
+    """
+    Lets the result of a method be set with ``CachedDataMixin.prime``, e.g.
+    because a bulk read retrieved it along with the object. Unlike with
+    ``memoized`` nothing is kept otherwise, the method runs on every call.
+    Primed results are dropped once the data of the object changes or the
+    FreshnessPolicy says they are stale. Put it below ``@property`` for
+    properties.
+    """
+    @wraps(func)
+    def wrapper(obj, *args, **kwargs):
+        policy = obj._get_freshness_policy()
+        with _memo_lock(obj):
+            found, value = _lookup_memo(
+                obj, func.__name__, _memo_key(args, kwargs),
+                policy.max_age if policy is not None else None)
+        if found:
+            return value
+        return func(obj, *args, **kwargs)
+
+    return wrapper
+
+
+# Guards the memoized results of objects without a lock of their own, e.g.
+# tokens. Only held while looking results up or storing them.
+_MEMO_LOCK = RLock()
+
+
+def _memo_lock(obj):
+    """
+    Retrieves the lock guarding the memoized results of ``obj``.
+    """
+    return vars(obj).get('_lock') or _MEMO_LOCK
+
+
+def _compute_lock(obj, name: str, key):
+    """
+    Retrieves the lock held while computing a memoized result. Objects with a
+    lock of their own compute one result at a time, others, e.g. tokens
+    shared by many threads, one per method and arguments.
+    """
+    lock = vars(obj).get('_lock')
+    if lock is not None:
+        return lock
+    with _MEMO_LOCK:
+        return vars(obj).setdefault('_memo_locks', {}).setdefault(
+            (name, key), RLock())
+
+
+def _get_memo(obj, name: str) -> OrderedDict:
+    """
+    Retrieves the memoized results of method ``name`` on ``obj``.
+    """
+    return vars(obj).setdefault('_memo', {}).setdefault(name, OrderedDict())
+
+
+def _memo_key(args: tuple, kwargs: dict):
+    """
+    Builds a hashable key from the arguments of a memoized call.
+    """
+    return args + tuple(sorted(kwargs.items()))
+
+
+def _data_version(obj) -> Optional[int]:
+    """
+    Retrieves the version of the data of ``obj``, None if it has none.
+    """
+    data = vars(obj).get('_data')
+    if isinstance(data, PossiblyIncompleteDict):
+        return data.version
+    return None
+
+
+def _lookup_memo(obj, name: str, key, ttl: Optional[float]=None) -> tuple:
+    """
+    Looks up a memoized result, holding the memo lock. Results older than
+    ``ttl`` seconds or computed from data that changed since are dropped;
+    results stored before there was any data belong to the first data.
+
+    :return: A (found, value) tuple.
+    """
+    cache = _get_memo(obj, name)
+    if key not in cache:
+        return False, None
+
+    stored_at, version, value = cache[key]
+    current = _data_version(obj)
+    if ((ttl is not None and monotonic() - stored_at >= ttl) or
+            (version is not None and version != current)):
+        del cache[key]
+        return False, None
+
+    cache[key] = stored_at, current, value
+    cache.move_to_end(key)
+    return True, value
+
+
+def _store_memo(obj, name: str, key, value, maxsize: Optional[int]):
+    """
+    Stores a memoized result along with the version of the data it was
+    computed from, dropping the least recently used ones beyond ``maxsize``.
+    """
+    cache = _get_memo(obj, name)
+    cache[key] = monotonic(), _data_version(obj), value
+    cache.move_to_end(key)
+    while maxsize is not None and len(cache) > maxsize:
+        cache.popitem(last=False)
+
+
+def clear_memo(obj, name: Optional[str]=None):
+    """
+    Drops memoized results of ``obj``, e.g. of a token for memoized static
+    methods taking it.
+
+    :param obj: The object the results are stored on.
+    :param name: The name of the memoized method, None for all.
+    """
+    with _memo_lock(obj):
+        memo = vars(obj).get('_memo', {})
+        if name is None:
+            memo.clear()
+        else:
+            memo.pop(name, None)
+
+
+# All living CachedDataMixin objects by id, to invalidate them on changes
+_INSTANCES = WeakValueDictionary()
+_INSTANCES_LOCK = Lock()
+# Data versions are unique across all PossiblyIncompleteDict objects
+_VERSIONS = count(1)
 
 
 class PossiblyIncompleteDict:
@@ -11,9 +261,31 @@ class PossiblyIncompleteDict:
     """
 
     def __init__(self, data: dict, refresh) -> None:
+        # Makes sure concurrent misses retrieve the data only once
+        self._lock = RLock()
+        # Changes whenever retrieved values do, so derived values can be
+        # rebuilt; adding missing values isn't a change
+        self.version = next(_VERSIONS)
         self.may_need_refresh = True
         self._data = self._del_nul(data)
         self._refresh = refresh
+        # Monotonic time of the last retrieval, None if nothing was retrieved
+        self.fetched_at = monotonic() if data else None
+
+    def __getstate__(self):
+        """
+        Leaves the lock out, it can't be pickled.
+        """
+        state = dict(vars(self))
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        """
+        Restores a pickled dict with a fresh lock.
+        """
+        vars(self).update(state)
+        self._lock = RLock()
 
     @staticmethod
     def _del_nul(elem):
@@ -38,10 +310,14 @@ class PossiblyIncompleteDict:
         if item in self._data:
             return self._data[item]
 
-        self.maybe_refresh()
+        with self._lock:
+            # Another thread may have retrieved it while we were waiting
+            if item not in self._data:
+                self.maybe_refresh()
         return self._data[item]
 
     def __setitem__(self, key, item):
+        self._track_changes({key: item})
         self._data[key] = item
 
     def __contains__(self, item):
@@ -54,21 +330,205 @@ class PossiblyIncompleteDict:
         """
         Updates the dict with provided dict.
         """
-        self._data.update(self._del_nul(value))
+        value = self._del_nul(value)
+        self._track_changes(value)
+        self._data.update(value)
+
+    def _track_changes(self, new: dict, complete: bool=False):
+        """
+        Bumps the version if ``new`` changes any of the values retrieved so
+        far, see ``changes``.
+        """
+        if self.changes(self._data, new, complete):
+            self.version = next(_VERSIONS)
+
+    @staticmethod
+    def changes(old: dict, new: dict, complete: bool=False) -> bool:
+        """
+        Tells if ``new`` changes any of the values in ``old``.
+
+        :param old: The values retrieved so far.
+        :param new: The new values.
+        :param complete: Whether ``new`` replaces all values, so values
+                         missing from it are removed.
+        """
+        # Data yet to be completed by its own refresh function is compared
+        # as far as it was retrieved, without retrieving more
+        while isinstance(old, PossiblyIncompleteDict):
+            old = old._data
+        while isinstance(new, PossiblyIncompleteDict):
+            new = new._data
+        return any(new[key] != value if key in new else complete
+                   for key, value in old.items())
 
     def maybe_refresh(self):
         """
         Refresh if it may need a refresh.
         """
-        if self.may_need_refresh:
-            self.refresh()
+        with self._lock:
+            if self.may_need_refresh:
+                self.refresh()
 
     def refresh(self):
         """
         Refreshes data unconditionally.
         """
-        self._data = self._del_nul(self._refresh())
-        self.may_need_refresh = False
+        with self._lock:
+            data = self._del_nul(self._refresh())
+            self._track_changes(data, complete=True)
+            self._data = data
+            self.may_need_refresh = False
+            self.fetched_at = monotonic()
+
+    def refresh_unless(self, is_fresh):
+        """
+        Refreshes data unless ``is_fresh`` returns True for its age. Checked
+        after acquiring the lock, so threads finding the same stale data
+        refresh it only once.
+        """
+        with self._lock:
+            if self.age is None or not is_fresh(self.age):
+                self.refresh()
+
+    @property
+    def age(self) -> Optional[float]:
+        """
+        Seconds since the data was retrieved or None if it never was.
+        """
+        if self.fetched_at is None:
+            return None
+        return monotonic() - self.fetched_at
+
+
+def parse_timestamp(value: str) -> datetime:
+    """
+    Parses an ISO 8601 timestamp as sent by the hosters into a naive UTC
+    datetime, a lot faster than ``datetime.strptime``:
+
+    >>> parse_timestamp('2016-01-13T07:56:23Z')
+    datetime.datetime(2016, 1, 13, 7, 56, 23)
+    >>> parse_timestamp('2017-06-05T09:45:20.678Z')
+    datetime.datetime(2017, 6, 5, 9, 45, 20, 678000)
+    >>> parse_timestamp('2017-06-05T11:45:20.678+02:00')
+    datetime.datetime(2017, 6, 5, 9, 45, 20, 678000)
+
+    :raises ValueError: If ``value`` isn't an ISO 8601 timestamp.
+    """
+    microsecond = 0
+    index = 19
+    if value[index:index + 1] == '.':
+        end = index + 1
+        while end < len(value) and value[end].isdigit():
+            end += 1
+        microsecond = int(value[index + 1:end][:6].ljust(6, '0'))
+        index = end
+
+    result = datetime(int(value[0:4]), int(value[5:7]), int(value[8:10]),
+                      int(value[11:13]), int(value[14:16]),
+                      int(value[17:19]), microsecond)
+
+    zone = value[index:]
+    if zone not in ('', 'Z', '+00:00'):
+        offset = timedelta(hours=int(zone[1:3]), minutes=int(zone[-2:]))
+        result += offset if zone[0] == '-' else -offset
+    return result
+
+
+def as_naive_utc(value: Union[date, datetime, None]) -> Optional[datetime]:
+    """
+    Turns dates into datetimes at midnight and datetimes with a time zone into
+    naive ones in UTC, e.g. to compare them with the times IGitt returns.
+    Naive datetimes are taken as UTC already, they and None are left as they
+    are:
+
+    >>> from datetime import timezone
+    >>> as_naive_utc(datetime(2017, 6, 5, 11, 45,
+    ...                       tzinfo=timezone(timedelta(hours=2))))
+    datetime.datetime(2017, 6, 5, 9, 45)
+    >>> as_naive_utc(date(2017, 6, 5))
+    datetime.datetime(2017, 6, 5, 0, 0)
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        if value.utcoffset() is not None:
+            return (value - value.utcoffset()).replace(tzinfo=None)
+        return value
+    return datetime(value.year, value.month, value.day)
+
+
+def timestamp_field(key: str) -> Callable:
+    """
+    Describes a Record field holding the parsed timestamp at ``key``.
+    """
+    def convert(data, _):
+        """
+        Parses the timestamp, None stays None.
+        """
+        return parse_timestamp(data[key]) if data[key] else None
+    return convert
+
+
+def enum_field(key: str, resolve: Callable) -> Callable:
+    """
+    Describes a Record field holding the enum ``resolve`` returns for the
+    value at ``key``.
+    """
+    return lambda data, _: resolve(data[key])
+
+
+def object_field(key: str, make: Callable) -> Callable:
+    """
+    Describes a Record field holding an IGitt object, e.g. a user, created by
+    ``make(owner, value)`` from the nested data at ``key``.
+    """
+    return lambda data, owner: make(owner, data[key])
+
+
+class Record:
+    """
+    A typed view on the data of an object. Fields are converted on their first
+    access and then kept in slots, so e.g. timestamps are parsed only once:
+
+    >>> IssueRecord = Record.define(
+    ...     'IssueRecord', created=timestamp_field('created_at'))
+    >>> record = IssueRecord({'created_at': '2016-01-13T07:56:23Z'}, None)
+    >>> record.created
+    datetime.datetime(2016, 1, 13, 7, 56, 23)
+
+    Objects provide it as ``record`` if they have a ``record_class``.
+    """
+    __slots__ = ('_data', '_owner')
+    fields = {}  # type: Dict[str, Callable]
+
+    def __init__(self, data, owner):
+        """
+        :param data: The data of the object, e.g. a PossiblyIncompleteDict.
+        :param owner: The object the data belongs to.
+        """
+        self._data = data
+        self._owner = owner
+
+    def __getattr__(self, name):
+        # Only called if the slot wasn't filled yet
+        convert = type(self).fields.get(name)
+        if convert is None:
+            raise AttributeError(name)
+        value = convert(self._data, self._owner)
+        setattr(self, name, value)
+        return value
+
+    @classmethod
+    def define(cls, name: str, **fields: Callable) -> type:
+        """
+        Creates a Record class with a slot for every field.
+
+        :param name: The name of the class.
+        :param fields: The converters of the fields by name, they're called
+                       with the data and the owner.
+        """
+        return type(name, (cls,), {'__slots__': tuple(fields),
+                                   'fields': fields})
 
 
 class CachedDataMixin:
@@ -76,11 +536,50 @@ class CachedDataMixin:
     You provide:
 
     - self._get_data for getting your data
+    - optionally a ``record_class`` (see Record), to convert often used
+      fields only once
 
     You can also create an IGitt instance with your own data using from_data
     classmethod.
+
+    Data is kept forever unless a FreshnessPolicy applies. It can be set on
+    the instance or the class as ``freshness_policy`` or on the token to
+    apply it to all objects of a client; the instance wins over the token,
+    the token wins over the class.
     """
     default_data = {}  # type: dict
+    freshness_policy = None  # type: Optional[FreshnessPolicy]
+    record_class = None  # type: Optional[type]
+
+    def __new__(cls, *args, **kwargs):
+        """
+        Remembers the constructor arguments so the object can be snapshotted.
+        """
+        instance = super().__new__(cls)
+        instance._init_args = args, kwargs
+        # Guards loading the data and computing memoized results
+        instance._lock = RLock()
+        with _INSTANCES_LOCK:
+            _INSTANCES[id(instance)] = instance
+        return instance
+
+    def __getstate__(self):
+        """
+        Leaves the locks out, they can't be pickled, as well as the record,
+        which is built again on the next access, and whether a background
+        refresh is running, which it isn't in the copy.
+        """
+        state = dict(vars(self))
+        for name in ('_lock', '_memo_locks', '_record', '_revalidating'):
+            state.pop(name, None)
+        return state
+
+    def __setstate__(self, state):
+        """
+        Restores a pickled or copied object with a fresh lock.
+        """
+        vars(self).update(state)
+        self._lock = RLock()
 
     @classmethod  # Ignore PyLintBear
     def from_data(cls, data: Optional[dict]=None, *args, **kwargs):
@@ -96,6 +595,54 @@ class CachedDataMixin:
 
         return instance
 
+    @classmethod
+    def from_snapshot(cls, snapshot: dict, token):
+        """
+        Recreates an object from a snapshot, binding it to the given token.
+        No requests are made.
+
+        :param snapshot: A snapshot as returned by ``to_snapshot``.
+        :param token: The token to use for the recreated object.
+        :raises TypeError:
+            If the snapshot doesn't describe an object of this class.
+        """
+        klass = _resolve_snapshot_name(snapshot['class'])
+        if not (isinstance(klass, type) and issubclass(klass, cls)):
+            raise TypeError('{} is not a {}.'.format(snapshot['class'],
+                                                     cls.__name__))
+
+        instance = klass(
+            *(_load_snapshot_arg(arg, token) for arg in snapshot['args']),
+            **{key: _load_snapshot_arg(arg, token)
+               for key, arg in snapshot['kwargs'].items()})
+        if snapshot['data'] is not None:
+            instance.data = snapshot['data']
+            instance.data.may_need_refresh = snapshot['incomplete']
+
+        return instance
+
+    def to_snapshot(self) -> dict:
+        """
+        Captures the class, the constructor arguments and the data retrieved
+        so far in a dict of JSON types, e.g. to hand this object to another
+        process. Tokens are left out, they are given to ``from_snapshot``.
+        """
+        args, kwargs = self._init_args
+        data, incomplete = getattr(self, '_data', None), True
+        while isinstance(data, PossiblyIncompleteDict):
+            incomplete = data.may_need_refresh
+            data = data._data
+
+        return {
+            'class': '{}:{}'.format(type(self).__module__,
+                                    type(self).__qualname__),
+            'args': [_dump_snapshot_arg(arg) for arg in args],
+            'kwargs': {key: _dump_snapshot_arg(arg)
+                       for key, arg in kwargs.items()},
+            'data': data,
+            'incomplete': incomplete,
+        }
+
     def _get_data(self):
         """
         Retrieves the data for the object.
@@ -106,29 +653,532 @@ class CachedDataMixin:
         """
         Refreshes all the data from the hoster!
         """
-        if not getattr(self, '_data', None):
-            self._data = PossiblyIncompleteDict(
-                self.default_data, self._get_data)
+        with self._lock:
+            self._ensure_data()
+            self.invalidate()
+            self._data.refresh()
+
+    def invalidate(self, name: Optional[str]=None):
+        """
+        Drops results memoized with ``@memoized`` so they are computed again
+        on the next access.
+
+        :param name: The name of the memoized member, None for all.
+        """
+        clear_memo(self, name)
+
+    def prime(self, name: str, value, *args, **kwargs):
+        """
+        Stores ``value`` as result of the ``memoized`` or ``primable`` member
+        ``name`` called with ``args`` and ``kwargs``, e.g. if it is known from
+        another response.
+        """
+        with self._lock:
+            _store_memo(self, name, _memo_key(args, kwargs), value, None)
+
+    def _cache_urls(self) -> tuple:
+        """
+        Returns the API URLs whose cached responses hold data of this object.
+        """
+        return self.url,
+
+    def _drop_cached_state(self):
+        """
+        Forgets the data and memoized results, so they are retrieved again on
+        the next access.
+        """
+        with self._lock:
+            vars(self).pop('_data', None)
+            self.invalidate()
 
-        self._data.refresh()
+    def _is_unchanged(self, key: str, is_equal) -> bool:
+        """
+        Tells if a write can be skipped because the data retrieved already
+        holds the desired state. Data that isn't fresh according to the
+        FreshnessPolicy is revalidated first.
+
+        :param key: The data key the write would change.
+        :param is_equal:
+            A function returning True if the data holds the desired state.
+        :return: False if ``key`` wasn't retrieved yet or the state differs.
+        """
+        data = getattr(self, '_data', None)
+        if data is None or key not in data:
+            return False
+
+        policy = self._get_freshness_policy()
+        if policy is not None and not policy.is_fresh(data.age or 0):
+            data.refresh()
+
+        return is_equal()
+
+    def _get_freshness_policy(self) -> Optional[FreshnessPolicy]:
+        """
+        Retrieves the FreshnessPolicy applying to this object, if any.
+        """
+        return (vars(self).get('freshness_policy') or
+                getattr(getattr(self, '_token', None),
+                        'freshness_policy', None) or
+                self.freshness_policy)
+
+    def _refresh_in_background(self):
+        """
+        Refreshes the data in a background thread unless that already happens.
+        """
+        with self._lock:
+            if getattr(self, '_revalidating', False):
+                return
+            self._revalidating = True
+
+        def revalidate():
+            """
+            Refreshes the data, logging instead of raising on failure.
+            """
+            try:
+                self._data.refresh()
+            except Exception:  # dont cover
+                logging.exception('Background refresh of %r failed.', self)
+            finally:
+                self._revalidating = False
+
+        Thread(target=revalidate, daemon=True).start()
+
+    def _revalidate(self):
+        """
+        Applies the FreshnessPolicy to the data already retrieved.
+        """
+        policy = self._get_freshness_policy()
+        data = self._data
+        age = data.age
+        if policy is None or age is None or policy.is_fresh(age):
+            return
+
+        if policy.may_serve_stale(age):
+            self._refresh_in_background()
+            return
+
+        data.refresh_unless(policy.is_fresh)
 
     @property
     def data(self):
         """
         Retrieves the data, if needed from the network.
         """
-        if not getattr(self, '_data', None):
-            self._data = PossiblyIncompleteDict(
-                self.default_data, self._get_data)
-
+        self._ensure_data()
+        self._revalidate()
         return self._data
 
+    @property
+    def record(self) -> Record:
+        """
+        Retrieves the data as instance of ``record_class``. It is built again
+        whenever the data changes.
+        """
+        data = self.data
+        cached = vars(self).get('_record')
+        if (cached is None or cached[0] is not data or
+                cached[1] != data.version):
+            with self._lock:
+                cached = data, data.version, self.record_class(data, self)
+                self._record = cached
+        return cached[2]
+
+    def _ensure_data(self):
+        """
+        Creates the PossiblyIncompleteDict holding the data, once.
+        """
+        if getattr(self, '_data', None) is None:
+            with self._lock:
+                if getattr(self, '_data', None) is None:
+                    self._data = PossiblyIncompleteDict(
+                        self.default_data, self._get_data)
+
     @data.setter
     def data(self, value):
         """
         Setter for the data, use it to override, refresh, ...
         """
-        self._data = PossiblyIncompleteDict(value, self._get_data)
+        data = PossiblyIncompleteDict(value, self._get_data)
+        old = vars(self).get('_data')
+        # Results memoized from the old data stay valid if it is the same
+        if (isinstance(old, PossiblyIncompleteDict) and
+                not data.changes(old._data, data._data, complete=True)):
+            data.version = old.version
+        self._data = data
+
+
+def _dump_snapshot_arg(arg):
+    """
+    Converts a constructor argument to JSON types, replacing tokens with a
+    placeholder.
+    """
+    # Don't move to module, leads to circular imports
+    from IGitt.Interfaces import Token
+
+    if isinstance(arg, Token):
+        return {'token': True}
+    if isinstance(arg, CachedDataMixin):
+        return {'object': arg.to_snapshot()}
+    if isinstance(arg, Enum):
+        return {'enum': '{}:{}'.format(type(arg).__module__,
+                                       type(arg).__qualname__),
+                'name': arg.name}
+    return {'value': arg}
+
+
+def _resolve_snapshot_name(path: str):
+    """
+    Resolves a ``module:qualname`` path from a snapshot. Only IGitt modules
+    are imported, so a snapshot can't make us import arbitrary code.
+
+    >>> _resolve_snapshot_name('IGitt.Interfaces:IssueStates')
+    <enum 'IssueStates'>
+    >>> _resolve_snapshot_name('os:getcwd')
+    Traceback (most recent call last):
+     ...
+    TypeError: os:getcwd is not part of IGitt.
+
+    :raises TypeError: If the module is not part of IGitt.
+    """
+    module, _, qualname = path.partition(':')
+    if module != 'IGitt' and not module.startswith('IGitt.'):
+        raise TypeError('{} is not part of IGitt.'.format(path))
+    resolved = import_module(module)
+    for name in qualname.split('.'):
+        resolved = getattr(resolved, name)
+    return resolved
+
+
+def _load_snapshot_arg(arg: dict, token):
+    """
+    Restores a constructor argument converted by ``_dump_snapshot_arg``.
+    """
+    if 'token' in arg:
+        return token
+    if 'object' in arg:
+        return CachedDataMixin.from_snapshot(arg['object'], token)
+    if 'enum' in arg:
+        enum = _resolve_snapshot_name(arg['enum'])
+        if not isinstance(enum, type) or not issubclass(enum, Enum):
+            raise TypeError('{} is not an Enum.'.format(arg['enum']))
+        return enum[arg['name']]
+    return arg['value']
+
+
+def hydrate(objects: Iterable[CachedDataMixin],
+            fields: Optional[Iterable[str]]=None,
+            max_workers: int=8) -> List[CachedDataMixin]:
+    """
+    Loads the data of many IGitt objects concurrently, e.g. for the issues
+    returned by ``GitHubMergeRequest.closes_issues``. Objects pointing to the
+    same URL share one request.
+
+    :param objects: The objects to load data for.
+    :param fields:
+        The data keys needed. Objects holding all of them already are not
+        refreshed. If None, all data is loaded unless it is complete already.
+    :param max_workers: The maximum number of requests running in parallel.
+    :return: The objects as a list.
+    :raises RuntimeError: If a request fails.
+    """
+    objects = list(objects)
+    fields = None if fields is None else list(fields)
+    by_url = {}
+    for obj in objects:
+        by_url.setdefault(obj.url, []).append(obj)
+
+    def load(group):
+        """
+        Loads the data of the first object and shares it with the others.
+        """
+        data = group[0].data
+        if fields is None or not all(field in data for field in fields):
+            data.maybe_refresh()
+        for obj in group[1:]:
+            obj._data = data
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # consume the results to raise the first exception, if any
+        list(executor.map(load, by_url.values()))
+
+    return objects
+
+
+def prefetch(objects: Iterable, hints: Iterable[str], max_workers: int=8):
+    """
+    Retrieves attributes of many objects concurrently, so accessing them
+    later is answered from the data, memoized results and response caches
+    instead of one request after the other::
+
+        prefetch(repository.merge_requests,
+                 ['commits', 'author', 'head.combined_status'])
+
+    :param objects: The IGitt objects.
+    :param hints:
+        The attributes to retrieve. Dots access attributes of attributes,
+        ``data`` loads the data of objects that have none yet.
+    :param max_workers: The maximum number of objects loaded in parallel.
+    :raises RuntimeError: If a request fails.
+    """
+    hints = [hint.split('.') for hint in hints]
+
+    def load(obj):
+        """
+        Evaluates all hints on the object.
+        """
+        for hint in hints:
+            value = obj
+            for name in hint:
+                value = getattr(value, name)
+            if (isinstance(value, PossiblyIncompleteDict) and
+                    value.fetched_at is None):
+                value.maybe_refresh()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # consume the results to raise the first exception, if any
+        list(executor.map(load, objects))
+
+
+def invalidate_url(url: str, keep: Iterable[CachedDataMixin]=()):
+    """
+    Drops everything cached about the resource at ``url``, e.g. because a
+    webhook reported a change: the responses for it and its sub resources as
+    well as the data and memoized results of all objects pointing to it.
+
+    :param url: The full API URL of the resource.
+    :param keep: Objects which are left untouched.
+    """
+    # Don't move to module, leads to circular imports
+    from IGitt.Interfaces import _RESPONSES, _RESPONSES_LOCK
+    from IGitt.Interfaces.Commit import _FINAL_STATUSES
+    from IGitt.Interfaces.Commit import _FINAL_STATUSES_LOCK
+
+    def drop(cache: dict):
+        """
+        Drops the entries of ``url`` and its sub resources.
+        """
+        for key in [key for key in cache
+                    if key == url or key.startswith((url + '/', url + '?'))]:
+            cache.pop(key, None)
+
+    with _RESPONSES_LOCK:
+        drop(_RESPONSES)
+    with _FINAL_STATUSES_LOCK:
+        drop(_FINAL_STATUSES)
+
+    keep = {id(obj) for obj in keep}
+    with _INSTANCES_LOCK:
+        objects = list(_INSTANCES.values())
+    for obj in objects:
+        if (id(obj) not in keep and getattr(obj, '_url', None) is not None
+                and obj.url == url):
+            obj._drop_cached_state()
+
+
+def invalidate_objects(objects: Iterable):
+    """
+    Invalidates everything cached about the resources the given objects
+    represent, except for the objects themselves. This is meant for objects
+    built from fresh data, e.g. from a webhook payload. Lists are searched
+    recursively, anything else that isn't a CachedDataMixin is ignored.
+
+    :param objects: The up to date objects.
+    """
+    def flatten(items):
+        """
+        Yields the CachedDataMixin objects in nested lists.
+        """
+        for item in items:
+            if isinstance(item, (list, tuple, set)):
+                yield from flatten(item)
+            elif isinstance(item, CachedDataMixin):
+                yield item
+
+    objects = list(flatten(objects))
+    for url in {url for obj in objects for url in obj._cache_urls()}:
+        invalidate_url(url, keep=objects)
+
+
+# Explanations currently recording, requests are reported to all of them
+_EXPLANATIONS = []  # type: List[Explanation]
+_EXPLANATIONS_LOCK = Lock()
+# Numbers and commit SHAs in API paths, replaced to find repeated requests
+_ID_PATTERN = re.compile(r'(?<=/)(?:[0-9]+|[0-9a-f]{40})(?=/|$)')
+# Frames of these modules are passed when looking for the call site
+_PLUMBING_MODULES = ('IGitt', 'concurrent', 'threading', 'backoff',
+                     'requests', 'urllib3')
+
+
+class ExplainedRequest:
+    """
+    A request recorded by an Explanation, attributed to the IGitt object
+    member and the line of code that triggered it.
+    """
+
+    def __init__(self, method: str, url: str, status: int, elapsed: float,
+                 owner: Optional[str], member: Optional[str],
+                 call_site: Optional[str]):
+        """
+        :param method:    The HTTP method, e.g. ``'GET'``.
+        :param url:       The requested URL.
+        :param status:    The status code of the response.
+        :param elapsed:   The seconds the request took.
+        :param owner:     The class of the IGitt object whose member was
+                          accessed, None if the request wasn't made by one.
+        :param member:    The name of the property or method accessed.
+        :param call_site: ``file:line`` of the code outside of IGitt that
+                          accessed it, None if unknown (e.g. a worker thread).
+        """
+        self.method = method
+        self.url = url
+        self.status = status
+        self.elapsed = elapsed
+        self.owner = owner
+        self.member = member
+        self.call_site = call_site
+
+    @property
+    def pattern(self) -> Tuple[str, str]:
+        """
+        The method and the URL path with numbers and SHAs replaced by
+        ``{id}``, equal for requests of the same kind.
+        """
+        return self.method, _ID_PATTERN.sub('{id}', self.url.split('?')[0])
+
+    @property
+    def trigger(self) -> str:
+        """
+        Describes what triggered the request, e.g.
+        ``GitHubUser.username at script.py:12``.
+        """
+        member = ('{}.{}'.format(self.owner, self.member)
+                  if self.owner else '<no IGitt object>')
+        return '{} at {}'.format(member, self.call_site or '<unknown>')
+
+    def __repr__(self):
+        return '<ExplainedRequest {} {} ({}) by {}>'.format(
+            self.method, self.url, self.status, self.trigger)
+
+
+class Explanation:
+    """
+    Records all requests made while the ``with`` block runs, also in other
+    threads, and attributes them to the IGitt property or method and the line
+    of code that triggered them::
+
+        with Explanation() as explanation:
+            for issue in repository.issues:
+                issue.author.username
+        print(explanation.report())
+
+    Requests of the same kind (see ``ExplainedRequest.pattern``) triggered
+    by the same code for different resources, typically in a loop, are
+    reported as N+1 patterns. Prefetching or listing the data at once avoids
+    them.
+    """
+
+    def __init__(self, threshold: int=3):
+        """
+        :param threshold: The number of requests for different resources
+                          from the same code that are reported as N+1.
+        """
+        self.threshold = threshold
+        self.requests = []  # type: List[ExplainedRequest]
+
+    def __enter__(self):
+        with _EXPLANATIONS_LOCK:
+            _EXPLANATIONS.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        with _EXPLANATIONS_LOCK:
+            _EXPLANATIONS.remove(self)
+
+    @property
+    def elapsed(self) -> float:
+        """
+        The seconds spent in all recorded requests.
+        """
+        return sum(request.elapsed for request in self.requests)
+
+    def n_plus_one(self) -> List[List[ExplainedRequest]]:
+        """
+        Groups the requests of the same kind made by the same code for at
+        least ``threshold`` different resources, largest group first.
+        """
+        groups = OrderedDict()  # type: OrderedDict
+        for request in self.requests:
+            key = (request.owner, request.member, request.call_site,
+                   request.pattern)
+            groups.setdefault(key, []).append(request)
+
+        return sorted(
+            (group for group in groups.values()
+             if len({request.url.split('?')[0] for request in group})
+             >= self.threshold),
+            key=len, reverse=True)
+
+    def report(self) -> str:
+        """
+        Describes the recorded requests grouped by what triggered them and
+        the N+1 patterns found.
+        """
+        lines = ['{} requests in {:.3f}s'.format(len(self.requests),
+                                                 self.elapsed)]
+        by_trigger = OrderedDict()  # type: OrderedDict
+        for request in self.requests:
+            by_trigger.setdefault(request.trigger, []).append(request)
+        for trigger, requests in by_trigger.items():
+            lines.append('  {}: {} requests'.format(trigger, len(requests)))
+            lines.extend('    {} {} ({})'.format(request.method, request.url,
+                                                 request.status)
+                         for request in requests)
+
+        for group in self.n_plus_one():
+            lines.append('N+1: {} {} {} times by {}'.format(
+                group[0].pattern[0], group[0].pattern[1], len(group),
+                group[0].trigger))
+        return '\n'.join(lines)
+
+
+def _find_trigger(frame) -> Tuple[Optional[str], Optional[str],
+                                  Optional[str]]:
+    """
+    Walks up the stack from ``frame`` to the first frame outside of IGitt.
+
+    :return: The class and the member name of the outermost IGitt object
+             accessed and the ``file:line`` of the code accessing it.
+    """
+    owner = member = None
+    while frame is not None:
+        module = frame.f_globals.get('__name__', '')
+        if module.split('.')[0] not in _PLUMBING_MODULES:
+            return (owner, member,
+                    '{}:{}'.format(frame.f_code.co_filename, frame.f_lineno))
+        obj = frame.f_locals.get('self')
+        if isinstance(obj, CachedDataMixin):
+            owner, member = type(obj).__name__, frame.f_code.co_name
+        frame = frame.f_back
+    return owner, member, None
+
+
+def explain_request(method: str, url: str, status: int, elapsed: float):
+    """
+    Reports a request to the Explanations currently recording, if any.
+
+    :param method:  The HTTP method, e.g. ``'GET'``.
+    :param url:     The requested URL.
+    :param status:  The status code of the response.
+    :param elapsed: The seconds the request took.
+    """
+    if not _EXPLANATIONS:
+        return
+
+    request = ExplainedRequest(method, url, status, elapsed,
+                               *_find_trigger(sys._getframe(1)))
+    with _EXPLANATIONS_LOCK:
+        for explanation in _EXPLANATIONS:
+            explanation.requests.append(request)
 
 
 def eliminate_none(data):
@@ -1,5 +1,7 @@
 import os
 
+import requests_mock
+
 from IGitt.GitHub import GitHubToken
 from IGitt.GitHub.GitHubCommit import GitHubCommit, get_diff_index
 from IGitt.Interfaces.CommitStatus import CommitStatus, Status
@@ -40,6 +42,28 @@ class GitHubCommitTest(IGittTestCase):
                       [status.description
                        for status in self.commit.get_statuses()])
 
+    def test_set_known_status(self):
+        status = CommitStatus(Status.FAILED, 'Theres a problem',
+                              'gitmate/test', 'http://example.com')
+        with requests_mock.Mocker() as m:
+            m.get(requests_mock.ANY, json=[{
+                'state': 'failure', 'description': 'Theres a problem',
+                'context': 'gitmate/test', 'target_url': 'http://example.com'
+            }])
+            m.post(requests_mock.ANY, json={})
+            self.commit.get_statuses()
+            self.commit.set_status(status)
+            self.assertEqual(m.call_count, 1)
+            status.status = Status.SUCCESS
+            self.commit.set_status(status)
+            self.commit.set_status(status)
+            self.assertEqual(m.call_count, 2)
+            # Statuses retrieved too long ago may have been changed by others
+            retrieved_at, statuses = self.commit._statuses
+            self.commit._statuses = retrieved_at - 60, statuses
+            self.commit.set_status(status)
+            self.assertEqual(m.call_count, 3)
+
     def test_combined_status(self):
         self.assertEqual(self.commit.combined_status, Status.PENDING)
 
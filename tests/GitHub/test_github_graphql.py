@@ -0,0 +1,192 @@
+from datetime import datetime
+
+import requests_mock
+
+from IGitt.GitHub import BASE_URL
+from IGitt.GitHub import GitHubToken
+from IGitt.GitHub.GitHubGraphQL import get_issues
+from IGitt.GitHub.GitHubGraphQL import get_merge_requests
+from IGitt.GitHub.GitHubGraphQL import get_repositories
+from IGitt.GitHub.GitHubGraphQL import query
+from IGitt.GitHub.GitHubGraphQL import query_cost
+from IGitt.GitHub.GitHubGraphQL import rate_limit
+from IGitt.Interfaces import IssueStates
+from IGitt.Interfaces import MergeRequestStates
+from IGitt.Interfaces.CommitStatus import Status
+
+from tests import IGittTestCase
+
+
+RATE_LIMIT = {'cost': 1, 'remaining': 4999, 'resetAt': '2030-01-01T00:00:00Z'}
+
+
+def connection(*nodes, more=False):
+    return {'nodes': list(nodes), 'pageInfo': {'hasNextPage': more}}
+
+
+REPOSITORY = {'databaseId': 1, 'nameWithOwner': 'a/b',
+              'url': 'https://github.com/a/b', 'sshUrl': 'git@github.com:a/b',
+              'isFork': False, 'isPrivate': False, 'description': 'Test',
+              'owner': {'login': 'a'},
+              'labels': connection({'name': 'bug'}, {'name': 'feature'})}
+
+
+def issue(number, **fields):
+    return {'number': number, 'title': 'Issue {}'.format(number),
+            'body': None, 'state': 'OPEN',
+            'createdAt': '2017-01-01T10:00:00Z',
+            'updatedAt': '2017-01-02T10:00:00Z',
+            'url': 'https://github.com/a/b/issues/{}'.format(number),
+            'author': {'login': 'sils', 'databaseId': 2},
+            'labels': connection({'name': 'bug', 'color': 'ff0000'}),
+            'assignees': connection(),
+            **fields}
+
+
+PULL_REQUEST = issue(
+    7, state='MERGED', mergedAt='2017-01-02T10:00:00Z', additions=2,
+    deletions=0, headRefName='patch', headRefOid='f' * 40,
+    baseRefName='master', baseRefOid='0' * 40, headRepository=REPOSITORY,
+    baseRepository=REPOSITORY,
+    commits=connection({'commit': {'oid': 'f' * 40, 'message': 'Fix',
+                                   'status': {'state': 'SUCCESS'}}}),
+    files=connection({'path': 'README.md'}))
+
+
+class GitHubGraphQLTest(IGittTestCase):
+
+    def setUp(self):
+        self.token = GitHubToken('secret')
+
+    def respond(self, m, *results):
+        m.post(BASE_URL + '/graphql',
+               [{'json': {'data': dict(result, rateLimit=RATE_LIMIT)}}
+                for result in results])
+
+    def test_query(self):
+        with requests_mock.Mocker() as m:
+            self.respond(m, {'viewer': {'login': 'sils'}})
+            self.assertEqual(query(self.token, 'query { viewer { login } }'),
+                             {'viewer': {'login': 'sils'}})
+            sent = m.last_request.json()
+            self.assertEqual(m.last_request.headers['Authorization'],
+                             'bearer secret')
+
+        self.assertIn('rateLimit { cost remaining resetAt }', sent['query'])
+        self.assertEqual(rate_limit(self.token).remaining, 4999)
+
+    def test_errors(self):
+        with requests_mock.Mocker() as m:
+            m.post(BASE_URL + '/graphql', json={'data': None, 'errors': [
+                {'type': 'NOT_FOUND', 'message': 'Could not resolve'}]})
+            with self.assertRaises(RuntimeError) as context:
+                query(self.token, 'query { viewer { login } }')
+        self.assertEqual(context.exception.args[1], 404)
+
+    def test_rate_limit_exceeded(self):
+        expensive = ('query { viewer { repositories(first: 100) { nodes { '
+                     'issues(first: 10) { nodes { labels(first: 1) { '
+                     'nodes { name } } } } } } } }')
+        self.assertEqual(query_cost(expensive), 11)
+        with requests_mock.Mocker() as m:
+            m.post(BASE_URL + '/graphql', json={'data': {'rateLimit': {
+                'cost': 10, 'remaining': 5,
+                'resetAt': '2030-01-01T00:00:00Z'}}})
+            query(self.token, expensive)
+            # The cost of the query to send counts, not of the last one
+            query(self.token, 'query { viewer { login } }')
+            with self.assertRaises(RuntimeError) as context:
+                query(self.token, expensive)
+            self.assertEqual(m.call_count, 2)
+        self.assertEqual(context.exception.args[1], 403)
+
+    def test_query_cost_with_fragments(self):
+        self.assertEqual(query_cost(
+            'query { a: repository(owner: "a", name: "b") { ...Fields } }\n'
+            'fragment Fields on Repository { issues(first: 100) { nodes { '
+            '...on Issue { labels(first: 100) { nodes { ...Label } } } } } }\n'
+            'fragment Label on Label { issues(first: 10) { totalCount } }'),
+            101)
+
+    def test_get_issues_in_batches(self):
+        with requests_mock.Mocker() as m:
+            self.respond(m,
+                         {'o0': {'issue': issue(1)}, 'o1': {'issue': issue(2)}},
+                         {'o0': {'issue': issue(3, state='CLOSED')}})
+            issues = get_issues(self.token,
+                                [('a/b', 1), ('a/b', 2), ('a/b', 3)],
+                                batch_size=2)
+            self.assertEqual(m.call_count, 2)
+            self.assertIn('o1: repository(owner: "a", name: "b") '
+                          '{ issue(number: 2) { ...IssueFields } }',
+                          m.request_history[0].json()['query'])
+
+            self.assertEqual([issue.number for issue in issues], [1, 2, 3])
+            self.assertEqual(issues[0].title, 'Issue 1')
+            self.assertEqual(issues[0].labels, {'bug'})
+            self.assertEqual(issues[0].author.username, 'sils')
+            self.assertEqual(issues[0].created, datetime(2017, 1, 1, 10))
+            self.assertEqual(issues[2].state, IssueStates.CLOSED)
+            self.assertEqual(m.call_count, 2)
+
+    def test_get_merge_requests(self):
+        with requests_mock.Mocker() as m:
+            self.respond(m, {'o0': {'pullRequest': PULL_REQUEST}})
+            mr, = get_merge_requests(self.token, [('a/b', 7)])
+
+            self.assertEqual(mr.state, MergeRequestStates.MERGED)
+            self.assertEqual(mr.head_branch_name, 'patch')
+            self.assertEqual(mr.head.sha, 'f' * 40)
+            self.assertEqual([commit.sha for commit in mr.commits], ['f' * 40])
+            self.assertEqual(mr.commits[0].combined_status, Status.SUCCESS)
+            self.assertEqual(mr.affected_files, {'README.md'})
+            self.assertEqual(mr.diffstat, (2, 0))
+            self.assertEqual(mr.source_repository.full_name, 'a/b')
+            self.assertEqual(mr.repository.get_labels(), {'bug', 'feature'})
+            self.assertEqual(m.call_count, 1)
+
+    def test_incomplete_connections(self):
+        pull_request = dict(
+            PULL_REQUEST,
+            labels=connection({'name': 'bug', 'color': 'ff0000'}, more=True),
+            commits=connection(*PULL_REQUEST['commits']['nodes'], more=True),
+            files=connection(*PULL_REQUEST['files']['nodes'], more=True),
+            baseRepository=dict(REPOSITORY, labels=connection(
+                *REPOSITORY['labels']['nodes'], more=True)))
+        with requests_mock.Mocker() as m:
+            self.respond(m, {'o0': {'pullRequest': pull_request}})
+            mr, = get_merge_requests(self.token, [('a/b', 7)])
+            self.assertEqual(mr.assignees, set())
+            self.assertEqual(m.call_count, 1)
+
+            m.get(BASE_URL + '/repos/a/b/issues/7',
+                  json={'labels': [{'name': 'bug'}, {'name': 'docs'}]})
+            m.get(BASE_URL + '/repos/a/b/pulls/7/commits', json=[])
+            m.get(BASE_URL + '/repos/a/b/pulls/7/files',
+                  json=[{'filename': 'README.md'}, {'filename': 'setup.py'}])
+            m.get(BASE_URL + '/repos/a/b/labels',
+                  json=[{'name': 'bug'}, {'name': 'docs'}])
+            self.assertEqual(mr.labels, {'bug', 'docs'})
+            self.assertEqual(mr.commits, ())
+            self.assertEqual(mr.affected_files, {'README.md', 'setup.py'})
+            self.assertEqual(mr.repository.get_labels(), {'bug', 'docs'})
+
+    def test_primed_results_follow_the_data(self):
+        with requests_mock.Mocker() as m:
+            self.respond(m, {'o0': REPOSITORY})
+            repo, = get_repositories(self.token, ['a/b'])
+            self.assertEqual(repo.get_labels(), {'bug', 'feature'})
+
+            m.get(BASE_URL + '/repos/a/b', json={'full_name': 'a/c'})
+            m.get(BASE_URL + '/repos/a/b/labels', json=[{'name': 'docs'}])
+            repo.data.refresh()
+            self.assertEqual(repo.get_labels(), {'docs'})
+
+    def test_get_repositories(self):
+        with requests_mock.Mocker() as m:
+            self.respond(m, {'o0': REPOSITORY})
+            repo, = get_repositories(self.token, ['a/b'])
+            self.assertEqual(repo.identifier, 1)
+            self.assertEqual(repo.web_url, 'https://github.com/a/b')
+            self.assertEqual(repo.get_labels(), {'bug', 'feature'})
+            self.assertEqual(m.call_count, 1)
@@ -1,5 +1,8 @@
+from unittest.mock import patch
 import os
 
+import requests_mock
+
 from IGitt.GitHub import GitHubToken, GitHubInstallationToken, GitHubJsonWebToken
 from IGitt.GitHub.GitHub import GitHub
 from IGitt.GitHub.GitHubComment import GitHubComment
@@ -9,8 +12,10 @@ from IGitt.GitHub.GitHubIssue import GitHubIssue
 from IGitt.GitHub.GitHubMergeRequest import GitHubMergeRequest
 from IGitt.GitHub.GitHubRepository import GitHubRepository
 from IGitt.GitHub.GitHubUser import GitHubUser
+from IGitt.Interfaces import _RESPONSES
 from IGitt.Interfaces.Actions import IssueActions, MergeRequestActions, \
     PipelineActions, InstallationActions
+from IGitt.Interfaces.Hoster import RepositoryInventory
 
 from tests import IGittTestCase
 
@@ -28,8 +33,23 @@ class GitHubHosterTest(IGittTestCase):
                           'gitmate-test-user/test'])
 
     def test_owned_repositories(self):
-        self.assertEqual(sorted(map(lambda x: x.full_name, self.gh.owned_repositories)),
-                         ['gitmate-test-user/empty', 'gitmate-test-user/test'])
+        repos = [{'id': 1, 'full_name': 'gitmate-test-user/test',
+                  'owner': {'login': 'gitmate-test-user'},
+                  'permissions': {'admin': True, 'push': True}},
+                 {'id': 2, 'full_name': 'GitMateIO/IGitt',
+                  'owner': {'login': 'GitMateIO'},
+                  'permissions': {'admin': False, 'push': True}}]
+        github = GitHub(GitHubToken('secret'))
+        with requests_mock.Mocker() as m:
+            m.get('https://api.github.com/user',
+                  json={'login': 'gitmate-test-user'})
+            m.get('https://api.github.com/user/repos', json=repos)
+            owned, = github.owned_repositories
+            self.assertEqual(owned.full_name, 'gitmate-test-user/test')
+            # Selected from the same listing as the other views
+            self.assertIn(owned, github.write_repositories)
+            self.assertEqual([request.path for request in m.request_history],
+                             ['/user', '/user/repos', '/user/repos'])
 
     def test_write_repositories(self):
         self.assertEqual(sorted(map(lambda x: x.full_name, self.gh.write_repositories)),
@@ -146,11 +166,89 @@ class TestGitHubWebhook(IGittTestCase):
             self.assertEqual(event, IssueActions.OPENED)
             self.assertIsInstance(obj[0], GitHubIssue)
 
+    def test_hook_invalidates_caches(self):
+        stale = GitHubIssue.from_data({'title': 'old'}, self.gh._token,
+                                      self.repo_name, 0)
+        stale.prime('comments', [])
+        _RESPONSES[stale.url + '/comments'] = 'stale'
+        _RESPONSES[stale.url + '0'] = 'other issue'
+        self.default_data['issue']['title'] = 'new'
+
+        for _, obj in self.gh.handle_webhook('issues', self.default_data):
+            self.assertEqual(obj[0].title, 'new')
+
+        self.assertNotIn('_data', vars(stale))
+        self.assertEqual(stale._memo, {})
+        self.assertNotIn(stale.url + '/comments', _RESPONSES)
+        self.assertEqual(_RESPONSES.pop(stale.url + '0'), 'other issue')
+
     def test_pr_hook(self):
         for event, obj in self.gh.handle_webhook('pull_request', self.default_data):
             self.assertEqual(event, MergeRequestActions.OPENED)
             self.assertIsInstance(obj[0], GitHubMergeRequest)
 
+    def test_pr_hook_needs_no_requests(self):
+        repo = {'full_name': self.repo_name, 'id': 1,
+                'clone_url': 'https://github.com/org/test_repo.git'}
+        self.default_data['repository'] = repo
+        self.default_data['pull_request'] = {
+            'number': 0, 'title': 'A PR', 'user': {'login': 'sils'},
+            'head': {'sha': 'deadbeef', 'ref': 'feature', 'repo': repo},
+            'base': {'sha': 'cafebabe', 'ref': 'master', 'repo': repo},
+        }
+        with requests_mock.Mocker() as m:
+            for _, obj in self.gh.handle_webhook('pull_request',
+                                                 self.default_data):
+                pr = obj[0]
+                self.assertEqual(pr.title, 'A PR')
+                self.assertEqual(pr.author.username, 'sils')
+                self.assertEqual(pr.repository.identifier, 1)
+                self.assertEqual(pr.head.sha, 'deadbeef')
+                self.assertEqual(pr.base.sha, 'cafebabe')
+                self.assertEqual(pr.source_repository.full_name,
+                                 self.repo_name)
+            self.assertEqual(m.call_count, 0)
+
+    def test_repository_inventory(self):
+        repos = [{'id': 1, 'full_name': 'a/admin',
+                  'permissions': {'admin': True, 'push': True}},
+                 {'id': 2, 'full_name': 'a/push',
+                  'permissions': {'admin': False, 'push': True}},
+                 {'id': 3, 'full_name': 'a/pull',
+                  'permissions': {'admin': False, 'push': False}}]
+        github = GitHub(GitHubToken('secret'))
+        url = 'https://api.github.com/user/repos'
+        with requests_mock.Mocker() as m:
+            m.get(url, [{'json': repos, 'headers': {'ETag': '"1"'}},
+                        {'status_code': 304}])
+            self.assertEqual({repo.full_name
+                              for repo in github.master_repositories},
+                             {'a/admin'})
+            write = github.write_repositories
+            self.assertEqual({repo.full_name for repo in write},
+                             {'a/admin', 'a/push'})
+            # Every access revalidates the listing
+            self.assertEqual(m.call_count, 2)
+            self.assertEqual(m.request_history[1].headers['If-None-Match'],
+                             '"1"')
+
+            # An unchanged listing keeps the repository objects
+            self.assertEqual(github.write_repositories, write)
+            admin, = github.master_repositories
+            self.assertIn(admin, write)
+            self.assertIs(admin, [repo for repo in write
+                                  if repo.full_name == 'a/admin'][0])
+            self.assertEqual(m.call_count, 4)
+
+    def test_repository_inventory_max_age(self):
+        inventory = RepositoryInventory(lambda: [{'id': 1}], lambda repo: 1,
+                                        max_age=60)
+        with patch.object(inventory, 'refresh',
+                          wraps=inventory.refresh) as refresh:
+            inventory.view('all', lambda data: data)
+            inventory.view('all', lambda data: data)
+            self.assertEqual(refresh.call_count, 1)
+
     def test_pr_merge_hook(self):
         data = {**self.default_data, 'action': 'closed'}
         data['pull_request']['merged'] = True
@@ -1,7 +1,21 @@
+from datetime import datetime
+from datetime import timedelta
+from unittest.mock import patch
 import asyncio
+import os
+import pickle
+import time
 
+import requests_mock
+
+from IGitt.GitHub import BASE_URL
+from IGitt.GitHub import INSTALLATION_TOKENS
+from IGitt.GitHub import GitHubInstallationToken
+from IGitt.GitHub import GitHubJsonWebToken
 from IGitt.GitHub import GitHubToken
+from IGitt.GitHub import InstallationTokenManager
 from IGitt.GitHub import lazy_get
+from IGitt.GitHub.GitHubIssue import GitHubIssue
 
 from tests import IGittTestCase
 
@@ -20,3 +34,92 @@ class GitHubInitTest(IGittTestCase):
         loop = asyncio.get_event_loop()
         loop.run_until_complete(lazy_get('/repos/gitmate-test-user/test/stats/contributors',
                                          self.lazy_get_response))
+
+    def test_installation_tokens_shared(self):
+        manager = InstallationTokenManager()
+        jwt = GitHubToken('jwt')
+        expiry = datetime.utcnow() + timedelta(hours=1)
+        with requests_mock.Mocker() as m:
+            m.post(BASE_URL + '/installations/3/access_tokens',
+                   json={'token': 'new',
+                         'expires_at': expiry.strftime('%Y-%m-%dT%H:%M:%SZ')})
+            first = GitHubInstallationToken(3, jwt, manager=manager)
+            second = GitHubInstallationToken(3, jwt, manager=manager)
+            self.assertEqual(first.value, 'new')
+            self.assertEqual(second.value, 'new')
+            self.assertEqual(m.call_count, 1)
+
+            # Known tokens are used until they are about to expire
+            GitHubInstallationToken(4, jwt, 'known',
+                                    datetime.utcnow() + timedelta(hours=1),
+                                    manager=manager)
+            self.assertEqual(GitHubInstallationToken(4, jwt,
+                                                     manager=manager).value,
+                             'known')
+            self.assertEqual(m.call_count, 1)
+
+            manager.invalidate(3)
+            self.assertTrue(first.is_expired)
+            self.assertEqual(second.value, 'new')
+            self.assertEqual(m.call_count, 2)
+
+    def test_installation_token_refreshed_before_expiry(self):
+        manager = InstallationTokenManager()
+        jwt = GitHubToken('jwt')
+        expiry = datetime.utcnow() + timedelta(hours=1)
+        token = GitHubInstallationToken(
+            3, jwt, 'old', datetime.utcnow() + timedelta(minutes=1),
+            manager=manager)
+        with requests_mock.Mocker() as m:
+            m.post(BASE_URL + '/installations/3/access_tokens',
+                   json={'token': 'new',
+                         'expires_at': expiry.strftime('%Y-%m-%dT%H:%M:%SZ')})
+            # The old token still works while the new one is requested
+            self.assertEqual(token.value, 'old')
+            manager._threads[3].join(5)
+            self.assertEqual(token.value, 'new')
+            self.assertEqual(m.call_count, 1)
+
+    def test_failed_refresh_is_retried_later(self):
+        manager = InstallationTokenManager()
+        jwt = GitHubToken('jwt')
+        token = GitHubInstallationToken(
+            3, jwt, 'old', datetime.utcnow() + timedelta(minutes=1),
+            manager=manager)
+        with requests_mock.Mocker() as m:
+            m.post(BASE_URL + '/installations/3/access_tokens',
+                   status_code=401)
+            self.assertEqual(token.value, 'old')
+            manager._threads[3].join(5)
+            failed, calls = manager._threads[3], m.call_count
+            for _ in range(3):
+                self.assertEqual(token.value, 'old')
+            self.assertIs(manager._threads[3], failed)
+            self.assertEqual(m.call_count, calls)
+
+            with patch('IGitt.GitHub.time.monotonic',
+                       return_value=time.monotonic() + 60):
+                self.assertEqual(token.value, 'old')
+            self.assertIsNot(manager._threads[3], failed)
+            manager._threads[3].join(5)
+
+    def test_pickle_tokens(self):
+        jwt = GitHubJsonWebToken(os.environ['GITHUB_PRIVATE_KEY'], 5408)
+        value = jwt.value
+        token = GitHubInstallationToken(
+            5, jwt, 'known', datetime.utcnow() + timedelta(hours=1),
+            manager=InstallationTokenManager())
+        issue = GitHubIssue.from_data({'title': 'test'}, token, 'a/b', 1)
+
+        restored = pickle.loads(pickle.dumps(issue))
+        self.assertIsNot(restored._token.jwt._lock, jwt._lock)
+        self.assertEqual(restored._token.jwt.value, value)
+        self.assertIs(restored._token._manager, INSTALLATION_TOKENS)
+        self.assertEqual(restored.title, 'test')
+
+        INSTALLATION_TOKENS.put(5, 'shared',
+                                datetime.utcnow() + timedelta(hours=1))
+        try:
+            self.assertEqual(restored._token.value, 'shared')
+        finally:
+            INSTALLATION_TOKENS.invalidate(5)
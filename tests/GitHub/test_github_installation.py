@@ -1,8 +1,16 @@
+from datetime import datetime
+from datetime import timedelta
 import os
 
+import requests_mock
+
+from IGitt.GitHub import BASE_URL
 from IGitt.GitHub import GitHubJsonWebToken
 from IGitt.GitHub import GitHubInstallationToken
+from IGitt.GitHub import GitHubToken
+from IGitt.GitHub import InstallationTokenManager
 from IGitt.GitHub.GitHubInstallation import GitHubInstallation
+from IGitt.GitHub.GitHubInstallation import installation_repositories
 
 from tests import IGittTestCase
 
@@ -47,3 +55,40 @@ class GitHubInstallationTest(IGittTestCase):
         self.assertEqual({repo.full_name
                           for repo in self.installation.repositories},
                          {'gitmate-test-org/test'})
+
+
+class InstallationRepositoriesTest(IGittTestCase):
+
+    def test_installation_repositories(self):
+        manager = InstallationTokenManager()
+        expiry = datetime.utcnow() + timedelta(hours=1)
+        for installation_id in (1, 2, 3):
+            manager.put(installation_id, 'token{}'.format(installation_id),
+                        expiry)
+        url = BASE_URL + '/installation/repositories'
+        repositories = {
+            'token token1': [{'id': 10, 'full_name': 'a/a'},
+                             {'id': 11, 'full_name': 'a/b'}],
+            'token token2': [{'id': 20, 'full_name': 'b/a'}],
+            'token token3': []}
+
+        def respond(request, context):
+            repos = repositories[request.headers['Authorization']]
+            if 'page=2' in request.url:
+                return {'total_count': len(repos), 'repositories': repos[1:]}
+            if len(repos) > 1:
+                context.headers['Link'] = '<{}?page=2>; rel="next"'.format(url)
+            return {'total_count': len(repos), 'repositories': repos[:1]}
+
+        with requests_mock.Mocker() as m:
+            m.get(BASE_URL + '/app/installations',
+                  json=[{'id': 1}, {'id': 2}, {'id': 3}])
+            m.get(url, json=respond)
+            pairs = installation_repositories(GitHubToken('jwt'),
+                                              max_workers=2, manager=manager)
+            self.assertEqual(m.call_count, 0)
+            pairs = sorted((installation.identifier, repository.full_name)
+                           for installation, repository in pairs)
+
+            self.assertEqual(pairs, [(1, 'a/a'), (1, 'a/b'), (2, 'b/a')])
+            self.assertEqual(m.call_count, 5)
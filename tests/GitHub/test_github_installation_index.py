@@ -0,0 +1,92 @@
+from datetime import datetime
+from datetime import timedelta
+from unittest.mock import patch
+
+import requests_mock
+
+from IGitt.GitHub import BASE_URL
+from IGitt.GitHub import GitHubInstallationToken
+from IGitt.GitHub import GitHubToken
+from IGitt.GitHub import InstallationTokenManager
+from IGitt.GitHub.GitHub import GitHub
+from IGitt.GitHub.GitHubInstallation import GitHubInstallation
+from IGitt.GitHub.GitHubRepository import GitHubRepository
+from IGitt.GitHub.GitHubInstallationIndex import InstallationIndex
+
+from tests import IGittTestCase
+
+
+def repo(repo_id, full_name):
+    return {'id': repo_id, 'name': full_name.split('/')[1],
+            'full_name': full_name}
+
+
+class InstallationIndexTest(IGittTestCase):
+
+    def setUp(self):
+        self.manager = InstallationTokenManager()
+        self.jwt = GitHubToken('jwt')
+        expiry = datetime.utcnow() + timedelta(hours=1)
+        for installation_id in (1, 2):
+            self.manager.put(installation_id, 'token', expiry)
+        self.index = InstallationIndex(self.jwt, self.manager)
+        self.github = GitHub(GitHubInstallationToken(1, self.jwt,
+                                                     manager=self.manager))
+
+    def webhook(self, event, **data):
+        data.update(installation={'id': 2}, sender={'login': 'sils'})
+        for action, objects in self.github.handle_webhook(event, data):
+            self.index.handle(action, objects)
+
+    def test_index(self):
+        with requests_mock.Mocker() as m:
+            m.get(BASE_URL + '/app/installations', json=[{'id': 1}])
+            m.get(BASE_URL + '/installation/repositories',
+                  json={'total_count': 2,
+                        'repositories': [repo(10, 'a/b'), repo(11, 'a/C')]})
+            self.assertEqual(self.index.installation_id('a/b'), 1)
+            self.assertEqual(self.index.installation_id('A/c'), 1)
+            self.assertEqual(self.index.installation_id(11), 1)
+            self.assertIsNone(self.index.installation_id('a/d'))
+            self.assertEqual(self.index.token(10).value, 'token')
+            self.assertIsNone(self.index.token(12))
+            self.assertEqual(m.call_count, 2)
+
+            self.webhook('installation', action='created',
+                         repositories=[repo(12, 'b/a')])
+            self.webhook('installation_repositories', action='added',
+                         repositories_added=[repo(13, 'b/b')])
+            self.assertEqual(self.index.repositories(2), {'b/a', 'b/b'})
+            self.assertIn('b/b', self.index)
+
+            self.webhook('installation_repositories', action='removed',
+                         repositories_removed=[repo(12, 'b/a')])
+            self.assertNotIn(12, self.index)
+            self.assertEqual(self.index.installation_id(13), 2)
+
+            self.webhook('installation', action='deleted')
+            self.assertNotIn('b/b', self.index)
+            self.assertEqual(self.index.repositories(2), set())
+            self.assertIn('a/b', self.index)
+            self.assertEqual(m.call_count, 2)
+
+    def test_changes_while_building(self):
+        def listing(jwt_token, manager=None):
+            installation = GitHubInstallation(
+                GitHubInstallationToken(1, self.jwt, manager=self.manager), 1)
+            yield installation, GitHubRepository.from_data(
+                repo(10, 'a/b'), self.jwt, 'a/b')
+            # Webhooks arrive while the rest is listed
+            self.webhook('installation', action='created',
+                         repositories=[repo(12, 'b/a')])
+            removed = GitHubRepository.from_data(repo(11, 'a/c'), self.jwt,
+                                                 'a/c')
+            self.index.remove(1, [removed])
+            yield installation, removed
+
+        with patch('IGitt.GitHub.GitHubInstallationIndex.'
+                   'installation_repositories', listing):
+            self.index.build()
+        self.assertEqual(self.index.installation_id('a/b'), 1)
+        self.assertEqual(self.index.installation_id('b/a'), 2)
+        self.assertIsNone(self.index.installation_id('a/c'))
@@ -1,6 +1,8 @@
 import os
 import datetime
 
+import requests_mock
+
 from IGitt.GitHub import GitHubToken
 from IGitt.GitHub.GitHubIssue import GitHubIssue
 from IGitt.GitHub.GitHubUser import GitHubUser
@@ -92,3 +94,55 @@ class GitHubIssueTest(IGittTestCase):
     def test_mrs_closed_by(self):
         issue = GitHubIssue(self.token, 'gitmate-test-user/test', 131)
         self.assertEqual({int(i.number) for i in issue.mrs_closed_by}, {132})
+
+    def test_edit(self):
+        with requests_mock.Mocker() as m:
+            m.patch(requests_mock.ANY, json={'title': 'edited',
+                                             'labels': [{'name': 'bug'}]})
+            with self.iss.edit() as edit:
+                edit.title = 'edited'
+                edit.description = 'new description'
+                edit.labels = {'bug'}
+                edit.assignees = {GitHubUser(self.token, 'sils')}
+                edit.state = IssueStates.CLOSED
+                self.assertEqual(edit.title, 'edited')
+            self.assertEqual(m.call_count, 1)
+            self.assertEqual(m.last_request.json(), {
+                'title': 'edited',
+                'body': 'new description',
+                'labels': ['bug'],
+                'assignees': ['sils'],
+                'state': 'closed',
+            })
+        self.assertEqual(self.iss.title, 'edited')
+        self.assertEqual(self.iss.labels, {'bug'})
+
+    def test_unchanged_writes_are_skipped(self):
+        issue = GitHubIssue.from_data({'title': 'same', 'body': 'text',
+                                       'state': 'closed',
+                                       'labels': [{'name': 'bug'}],
+                                       'assignees': []},
+                                      self.token, 'gitmate-test-user/test', 1)
+        with requests_mock.Mocker() as m:
+            issue.title = 'same'
+            issue.description = 'text'
+            issue.labels = {'bug'}
+            issue.unassign(GitHubUser(self.token, 'sils'))
+            issue.close()
+            with issue.edit() as edit:
+                edit.title = 'same'
+                edit.state = IssueStates.CLOSED
+            self.assertEqual(m.call_count, 0)
+
+    def test_edit_aborted(self):
+        with requests_mock.Mocker() as m:
+            with self.assertRaises(ValueError):
+                with self.iss.edit() as edit:
+                    edit.title = 'edited'
+                    raise ValueError
+            with self.iss.edit():
+                pass
+            with self.assertRaises(AttributeError):
+                with self.iss.edit() as edit:
+                    edit.number = 3
+            self.assertEqual(m.call_count, 0)
@@ -1,7 +1,11 @@
 import os
 import datetime
 
+import requests_mock
+
+from IGitt.GitHub import BASE_URL
 from IGitt.GitHub import GitHubToken
+from IGitt.GitHub.GitHubCommit import GitHubCommit
 from IGitt.GitHub.GitHubMergeRequest import GitHubMergeRequest
 from IGitt.Interfaces.MergeRequest import MergeRequestStates
 
@@ -91,6 +95,8 @@ class GitHubMergeRequestTest(IGittTestCase):
                          {114, 115, 127})
 
     def test_tests_passed(self):
+        with self.replay('GitHubMergeRequestTest.test_commits.yaml'):
+            self.mr.commits
         self.assertEqual(self.mr.tests_passed, True)
         mr = GitHubMergeRequest(self.token, 'gitmate-test-user/test', 6)
         self.assertEqual(mr.tests_passed, False)
@@ -122,3 +128,28 @@ class GitHubMergeRequestTest(IGittTestCase):
         mr = GitHubMergeRequest(self.token, 'gitmate-test-user/test', 134)
         mr.merge(message=commit_msg, sha=head_sha, _github_merge_method=method)
         self.assertEqual(mr.state, MergeRequestStates.MERGED)
+
+    def test_review(self):
+        mr = GitHubMergeRequest.from_data({}, self.token, 'a/b', 7)
+        mr.prime('head', GitHubCommit(self.token, 'a/b', 'f' * 40))
+        with requests_mock.Mocker() as m:
+            m.get(BASE_URL + '/repos/a/b/pulls/7/files', json=[
+                {'filename': 'README.md',
+                 'patch': '@@ -1,2 +1,3 @@\n # test\n+\n a test repo'},
+                {'filename': 'logo.png'}])
+            m.post(BASE_URL + '/repos/a/b/pulls/7/reviews', json={'id': 1})
+            mr.review([('README.md', 2, 'Empty line.'),
+                       ('README.md', 3, 'Typo.'),
+                       ('README.md', 8, 'Too long.'),
+                       ('logo.png', 1, 'Too big.')], 'Found 4 problems.')
+            self.assertEqual(m.call_count, 2)
+            self.assertEqual(m.last_request.json(), {
+                'commit_id': 'f' * 40, 'event': 'COMMENT',
+                'body': 'Found 4 problems.\n\n'
+                        'Comment on file README.md, line 8.\n\nToo long.\n\n'
+                        'Comment on file logo.png, line 1.\n\nToo big.',
+                'comments': [
+                    {'path': 'README.md', 'position': 2,
+                     'body': 'Empty line.'},
+                    {'path': 'README.md', 'position': 3, 'body': 'Typo.'}]})
+        self.assertEqual(mr.affected_files, {'README.md', 'logo.png'})
@@ -1,8 +1,12 @@
 import os
 
+import requests_mock
+
+from IGitt.GitHub import BASE_URL
 from IGitt.GitHub import GitHubToken
 from IGitt.GitHub.GitHubIssue import GitHubIssue
 from IGitt.GitHub.GitHubReaction import GitHubReaction
+from IGitt.Utils import FreshnessPolicy
 
 from tests import IGittTestCase
 
@@ -23,4 +27,28 @@ class GitHubReactionTest(IGittTestCase):
         self.assertEqual(self.reaction.name, 'heart')
 
     def test_user(self):
-        self.assertEqual(self.reaction.user.username, 'nkprince007')
+        with self.replay('GitHubReactionTest.test_name.yaml'):
+            self.assertEqual(self.reaction.user.username, 'nkprince007')
+
+    def test_listing_is_shared_and_renewed(self):
+        token = GitHubToken('secret')
+        issue = GitHubIssue(token, 'a/b', 1)
+        url = BASE_URL + '/repos/a/b/issues/1/reactions'
+        with requests_mock.Mocker() as m:
+            m.get(url, [{'json': [{'id': 1, 'content': 'heart'},
+                                  {'id': 2, 'content': '+1'}]},
+                        {'json': [{'id': 1, 'content': 'laugh'}]},
+                        {'json': [{'id': 1, 'content': 'hooray'}]}])
+            heart = GitHubReaction(token, issue, 1)
+            self.assertEqual(heart.name, 'heart')
+            self.assertEqual(GitHubReaction(token, issue, 2).name, '+1')
+            self.assertEqual(m.call_count, 1)
+
+            heart.refresh()
+            self.assertEqual(heart.name, 'laugh')
+            self.assertEqual(m.call_count, 2)
+
+            heart.freshness_policy = FreshnessPolicy(max_age=60)
+            heart.data.fetched_at -= 120
+            self.assertEqual(heart.name, 'hooray')
+            self.assertEqual(m.call_count, 3)
@@ -1,6 +1,8 @@
 from datetime import datetime
 import os
 
+import requests_mock
+
 from IGitt.GitHub import GitHubToken
 from IGitt.GitHub import GitHubJsonWebToken
 from IGitt.GitHub import GitHubInstallationToken
@@ -73,6 +75,14 @@ class GitHubRepositoryTest(IGittTestCase):
         self.repo.delete_label('bug')
         self.assertEqual(sorted(self.repo.get_labels()), ['a', 'b', 'c', 'dem'])
 
+    def test_create_existing_label(self):
+        with requests_mock.Mocker() as m:
+            m.get(requests_mock.ANY, json=[{'name': 'a'}])
+            self.repo.create_label('a', '000000', exist_ok=True)
+            self.assertEqual(m.call_count, 1)
+            with self.assertRaises(ElementAlreadyExistsError):
+                self.repo.create_label('a', '000000')
+
     def test_get_issue(self):
         self.assertEqual(self.repo.get_issue(1).title, 'test issue')
 
@@ -0,0 +1,90 @@
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from unittest.mock import patch
+from urllib.parse import parse_qs
+from urllib.parse import urlparse
+
+import requests_mock
+
+from IGitt.GitHub import BASE_URL
+from IGitt.GitHub import GitHubToken
+from IGitt.GitHub.GitHubIssue import GitHubIssue
+from IGitt.GitHub.GitHubMergeRequest import GitHubMergeRequest
+from IGitt.GitHub.GitHubSearch import search
+
+from tests import IGittTestCase
+
+
+TIME_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+
+def item(number, created):
+    kind = 'pull' if number % 2 else 'issues'
+    return {'number': number,
+            'url': 'https://api.github.com/repos/a/b/issues/{}'.format(number),
+            'html_url': 'https://github.com/a/b/{}/{}'.format(kind, number),
+            'created_at': created.strftime(TIME_FORMAT)}
+
+
+class GitHubSearchTest(IGittTestCase):
+
+    def setUp(self):
+        self.token = GitHubToken('secret')
+        start = datetime(2017, 1, 1)
+        # Most of them in one day, so windows need to be split again
+        self.items = [item(number, start + timedelta(days=number))
+                      for number in range(10)]
+        self.items += [item(number, start + timedelta(days=100, hours=number))
+                       for number in range(10, 25)]
+        self.queries = []
+
+    def respond(self, request, context):
+        query = parse_qs(urlparse(request.url).query)['q'][0]
+        self.queries.append(query)
+        items = self.items
+        window = query.partition('created:')[2]
+        if window.startswith('>='):
+            items = [item for item in items if item['created_at'] >= window[2:]]
+        elif '..' in window:
+            after, before = window.split('..')
+            items = [item for item in items
+                     if after <= item['created_at'] <= before]
+        context.headers['X-RateLimit-Remaining'] = '29'
+        return {'total_count': len(items), 'items': items}
+
+    def test_search_splits_windows(self):
+        with requests_mock.Mocker() as m, \
+                patch('IGitt.GitHub.GitHubSearch.RESULT_LIMIT', 10):
+            m.get(BASE_URL + '/search/issues', json=self.respond)
+            results = list(search(self.token, 'repo:a/b',
+                                  after=datetime(2017, 1, 1)))
+
+        self.assertEqual(sorted(result.number for result in results),
+                         list(range(25)))
+        self.assertEqual({type(result) for result in results},
+                         {GitHubIssue, GitHubMergeRequest})
+        self.assertEqual(self.queries[0],
+                         'repo:a/b created:>=2017-01-01T00:00:00Z')
+        self.assertGreater(len(self.queries), 3)
+
+    def test_search_with_time_zone(self):
+        with requests_mock.Mocker() as m, \
+                patch('IGitt.GitHub.GitHubSearch.RESULT_LIMIT', 10):
+            m.get(BASE_URL + '/search/issues', json=self.respond)
+            results = list(search(
+                self.token, 'repo:a/b',
+                after=datetime(2017, 1, 1, 2,
+                               tzinfo=timezone(timedelta(hours=2)))))
+
+        self.assertEqual(sorted(result.number for result in results),
+                         list(range(25)))
+        self.assertEqual(self.queries[0],
+                         'repo:a/b created:>=2017-01-01T00:00:00Z')
+
+    def test_search_unchanged(self):
+        with requests_mock.Mocker() as m:
+            m.get(BASE_URL + '/search/issues', json=self.respond)
+            results = list(search(self.token, 'repo:a/b'))
+        self.assertEqual(len(results), 25)
+        self.assertEqual(self.queries, ['repo:a/b'])
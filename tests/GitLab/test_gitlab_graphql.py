@@ -0,0 +1,167 @@
+from datetime import datetime
+
+import requests_mock
+
+from IGitt.GitLab import GitLabOAuthToken
+from IGitt.GitLab.GitLabGraphQL import GRAPHQL_URL
+from IGitt.GitLab.GitLabGraphQL import get_issues
+from IGitt.GitLab.GitLabGraphQL import get_merge_requests
+from IGitt.Interfaces import IssueStates
+from IGitt.Interfaces import MergeRequestStates
+from IGitt.Interfaces.CommitStatus import Status
+
+from tests import IGittTestCase
+
+
+def connection(*nodes, cursor=None):
+    return {'nodes': list(nodes),
+            'pageInfo': {'hasNextPage': cursor is not None,
+                         'endCursor': cursor}}
+
+
+def issue(number, **fields):
+    return {'iid': str(number), 'title': 'Issue {}'.format(number),
+            'description': 'Text', 'state': 'opened',
+            'createdAt': '2017-06-05T09:45:20.678Z',
+            'updatedAt': '2017-06-05T09:45:56.115Z',
+            'webUrl': 'https://gitlab.com/a/b/issues/{}'.format(number),
+            'author': {'id': 'gid://gitlab/User/7', 'username': 'sils'},
+            'labels': connection({'title': 'bug'}),
+            'assignees': connection(),
+            **fields}
+
+
+def commit(sha):
+    return {'sha': sha, 'message': 'Fix'}
+
+
+MERGE_REQUEST = issue(
+    2, sourceBranch='patch', targetBranch='master', sourceProjectId='3',
+    targetProjectId='3', diffHeadSha='f' * 40,
+    sourceProject={'fullPath': 'a/b'},
+    diffStatsSummary={'additions': 2, 'deletions': 0},
+    commits=connection(commit('f' * 40), commit('e' * 40)))
+
+
+def pipelines(*jobs, cursor=None):
+    return {'pipelines': connection(
+        *({'jobs': connection(*({'name': name, 'status': status}
+                                for name, status in pipeline))}
+          for pipeline in jobs), cursor=cursor)}
+
+
+class GitLabGraphQLTest(IGittTestCase):
+
+    def setUp(self):
+        self.token = GitLabOAuthToken('secret')
+
+    def respond(self, m, *results):
+        m.post(GRAPHQL_URL, [{'json': {'data': result}} for result in results])
+
+    def test_get_issues_in_batches(self):
+        with requests_mock.Mocker() as m:
+            self.respond(m,
+                         {'o0': {'issue': issue(1)}, 'o1': {'issue': issue(2)}},
+                         {'o0': {'issue': issue(3, state='closed')}})
+            issues = get_issues(self.token,
+                                [('a/b', 1), ('a/b', 2), ('a/b', 3)],
+                                batch_size=2)
+            self.assertEqual(m.call_count, 2)
+            self.assertIn('o1: project(fullPath: "a/b") '
+                          '{ issue(iid: "2") { ...IssueFields } }',
+                          m.request_history[0].json()['query'])
+            self.assertEqual(m.request_history[0].headers['Authorization'],
+                             'Bearer secret')
+
+            self.assertEqual([issue.number for issue in issues], [1, 2, 3])
+            self.assertEqual(issues[0].labels, {'bug'})
+            self.assertEqual(issues[0].author.identifier, 7)
+            self.assertEqual(issues[0].created,
+                             datetime(2017, 6, 5, 9, 45, 20, 678000))
+            self.assertEqual(issues[0].state, IssueStates.OPEN)
+            self.assertEqual(issues[2].state, IssueStates.CLOSED)
+            self.assertEqual(m.call_count, 2)
+
+    def test_missing(self):
+        with requests_mock.Mocker() as m:
+            self.respond(m, {'o0': {'issue': None}})
+            with self.assertRaises(RuntimeError) as context:
+                get_issues(self.token, [('a/b', 1)])
+        self.assertEqual(context.exception.args[1], 404)
+
+    def test_errors(self):
+        with requests_mock.Mocker() as m:
+            m.post(GRAPHQL_URL, json={'data': None,
+                                      'errors': [{'message': 'Too complex'}]})
+            with self.assertRaises(RuntimeError) as context:
+                get_issues(self.token, [('a/b', 1)])
+        self.assertEqual(context.exception.args[1], 400)
+
+    def test_get_merge_requests(self):
+        with requests_mock.Mocker() as m:
+            self.respond(
+                m, {'o0': {'mergeRequest': MERGE_REQUEST}},
+                {'o0': pipelines([('test', 'SUCCESS'), ('lint', 'SKIPPED')]),
+                 'o1': pipelines([('test', 'SUCCESS')],
+                                 [('test', 'FAILED'), ('ext', 'SUCCESS')])})
+            mr, = get_merge_requests(self.token, [('a/b', 2)])
+            self.assertEqual(m.call_count, 2)
+            self.assertIn('o1: project(fullPath: "a/b") {{ pipelines(sha: '
+                          '"{}", first: 20)'.format('e' * 40),
+                          ' '.join(m.request_history[1].json()['query']
+                                   .split()))
+
+            self.assertEqual(mr.state, MergeRequestStates.OPEN)
+            self.assertEqual(mr.head_branch_name, 'patch')
+            self.assertEqual(mr.head.sha, 'f' * 40)
+            self.assertEqual([commit.sha for commit in mr.commits],
+                             ['f' * 40, 'e' * 40])
+            self.assertEqual(mr.diffstat, (2, 0))
+            self.assertEqual(mr.source_repository.full_name, 'a/b')
+            self.assertEqual(mr.head.combined_status, Status.SUCCESS)
+            self.assertEqual(mr.get_combined_statuses(),
+                             {'f' * 40: Status.SUCCESS,
+                              'e' * 40: Status.SUCCESS})
+            self.assertTrue(mr.tests_passed)
+            self.assertEqual(m.call_count, 2)
+
+    def test_affected_files_and_many_statuses_use_rest(self):
+        with requests_mock.Mocker() as m:
+            self.respond(m, {'o0': {'mergeRequest': MERGE_REQUEST}},
+                         {'o0': pipelines([('test', 'FAILED')], cursor='p1'),
+                          'o1': None})
+            mr, = get_merge_requests(self.token, [('a/b', 2)])
+            m.get(requests_mock.ANY, json={'changes': [
+                {'old_path': 'old.md', 'new_path': 'new.md', 'diff': ''}]})
+            self.assertEqual(mr.affected_files, {'old.md'})
+            for commit in mr.commits + (mr.head,):
+                self.assertNotIn('combined_status',
+                                 vars(commit).get('_memo', {}))
+
+    def test_remaining_pages(self):
+        merge_request = dict(
+            MERGE_REQUEST,
+            labels=connection({'title': 'bug'}, cursor='l1'),
+            commits=connection(commit('f' * 40), cursor='c1'))
+        with requests_mock.Mocker() as m:
+            self.respond(
+                m, {'o0': {'mergeRequest': merge_request}},
+                {'o0': {'mergeRequest': {'labels': connection(
+                    {'title': 'docs'}, cursor='l2')}},
+                 'o1': {'mergeRequest': {
+                     'commits': connection(commit('e' * 40))}}},
+                {'o0': {'mergeRequest': {'labels': connection(
+                    {'title': 'feature'})}}},
+                {'o0': pipelines(), 'o1': pipelines()})
+            mr, = get_merge_requests(self.token, [('a/b', 2)])
+            self.assertEqual(m.call_count, 4)
+            self.assertIn('labels(first: 100, after: "l1")',
+                          m.request_history[1].json()['query'])
+            self.assertIn('commits(first: 100, after: "c1")',
+                          m.request_history[1].json()['query'])
+            self.assertIn('labels(first: 100, after: "l2")',
+                          m.request_history[2].json()['query'])
+
+        self.assertEqual(mr.labels, {'bug', 'docs', 'feature'})
+        self.assertEqual([commit.sha for commit in mr.commits],
+                         ['f' * 40, 'e' * 40])
@@ -1,5 +1,7 @@
 import os
 
+import requests_mock
+
 from IGitt.GitLab import GitLabOAuthToken
 from IGitt.GitLab.GitLab import GitLab
 from IGitt.GitLab.GitLabComment import GitLabComment
@@ -7,6 +9,7 @@ from IGitt.GitLab.GitLabCommit import GitLabCommit
 from IGitt.GitLab.GitLabIssue import GitLabIssue
 from IGitt.GitLab.GitLabMergeRequest import GitLabMergeRequest
 from IGitt.Interfaces import AccessLevel
+from IGitt.Interfaces import _RESPONSES
 from IGitt.Interfaces.Actions import IssueActions, MergeRequestActions, \
     PipelineActions
 
@@ -49,8 +52,34 @@ class GitLabHosterTest(IGittTestCase):
                          ['gitmate-test-user/test'])
 
     def test_owned_repositories(self):
-        self.assertEqual(sorted(map(lambda x: x.full_name, self.gl.owned_repositories)),
-                         ['gitmate-test-user/test'])
+        def project(identifier, full_name, kind, permissions):
+            namespace, _, path = full_name.rpartition('/')
+            return {'id': identifier, 'path_with_namespace': full_name,
+                    'namespace': {'id': identifier, 'kind': kind,
+                                  'path': namespace, 'parent_id': None},
+                    'permissions': permissions}
+
+        projects = [
+            project(1, 'gitmate-test-user/test', 'user',
+                    {'project_access': None, 'group_access': None}),
+            project(2, 'gitmate/owned', 'group',
+                    {'project_access': None,
+                     'group_access': {'access_level': 50}}),
+            project(3, 'gitmate/developer', 'group',
+                    {'project_access': {'access_level': 30},
+                     'group_access': None})]
+        gitlab = GitLab(GitLabOAuthToken('secret'))
+        with requests_mock.Mocker() as m:
+            m.get('https://gitlab.com/api/v4/user',
+                  json={'username': 'gitmate-test-user'})
+            m.get('https://gitlab.com/api/v4/projects', json=projects)
+            self.assertEqual({repo.full_name
+                              for repo in gitlab.owned_repositories},
+                             {'gitmate-test-user/test', 'gitmate/owned'})
+            self.assertEqual(m.call_count, 2)
+            self.assertEqual(m.request_history[1].qs['membership'], ['true'])
+        # The listing is kept as it was retrieved, to compare it when renewed
+        self.assertEqual(gitlab.inventory._data, projects)
 
     def test_write_repositories(self):
         self.assertEqual(sorted(map(lambda x: x.full_name, self.gl.write_repositories)),
@@ -105,12 +134,48 @@ class GitLabWebhookTest(IGittTestCase):
             self.assertEqual(event, IssueActions.OPENED)
             self.assertIsInstance(obj[0], GitLabIssue)
 
+    def test_hook_invalidates_caches(self):
+        stale = GitLabMergeRequest.from_data({'title': 'old'}, self.gl._token,
+                                             self.repo_name, 23)
+        _RESPONSES[stale.url + '/commits'] = 'stale'
+
+        for _, obj in self.gl.handle_webhook('Merge Request Hook',
+                                             self.default_data):
+            self.assertEqual(obj[0].number, 23)
+
+        self.assertNotIn('_data', vars(stale))
+        self.assertNotIn(stale.url + '/commits', _RESPONSES)
+
     def test_pr_hook(self):
         for event, obj in self.gl.handle_webhook('Merge Request Hook',
                                                  self.default_data):
             self.assertEqual(event, MergeRequestActions.OPENED)
             self.assertIsInstance(obj[0], GitLabMergeRequest)
 
+    def test_hooks_need_no_requests(self):
+        self.default_data['project']['web_url'] = 'https://gitlab.com/test/test'
+        self.default_data['commit']['message'] = 'Fix things'
+        self.default_data['object_attributes'].update({
+            'source_project_id': 5,
+            'source': {'path_with_namespace': 'fork/test'},
+            'last_commit': {'id': 'deadbeef', 'message': 'Fix things'},
+        })
+        with requests_mock.Mocker() as m:
+            for _, obj in self.gl.handle_webhook('Merge Request Hook',
+                                                 self.default_data):
+                mr = obj[0]
+                self.assertEqual(mr.repository.web_url,
+                                 'https://gitlab.com/test/test')
+                self.assertEqual(mr.source_repository.full_name, 'fork/test')
+                self.assertEqual(mr.head.sha, 'deadbeef')
+                self.assertEqual(mr.head.repository.full_name, 'fork/test')
+            for _, obj in self.gl.handle_webhook('Pipeline Hook',
+                                                 self.default_data):
+                self.assertEqual(obj[0].message, 'Fix things')
+                self.assertEqual(obj[0].repository.web_url,
+                                 'https://gitlab.com/test/test')
+            self.assertEqual(m.call_count, 0)
+
     def test_pr_synchronized(self):
         data = self.default_data
         data['object_attributes']['oldrev'] = 'deadbeef'
@@ -1,6 +1,8 @@
 import os
 import datetime
 
+import requests_mock
+
 from IGitt.GitLab import GitLabOAuthToken
 from IGitt.GitLab.GitLabIssue import GitLabIssue
 from IGitt.GitLab.GitLabUser import GitLabUser
@@ -93,3 +95,35 @@ class GitLabIssueTest(IGittTestCase):
     def test_mrs_closed_by(self):
         issue = GitLabIssue(self.token, 'coala/package_manager', 152)
         self.assertEqual({int(i.number) for i in issue.mrs_closed_by}, {98})
+
+    def test_edit(self):
+        with requests_mock.Mocker() as m:
+            m.put(requests_mock.ANY, json={'title': 'edited'})
+            with self.iss.edit() as edit:
+                edit.title = 'edited'
+                edit.labels = {'bug'}
+                edit.assignees = {GitLabUser(self.token, 2)}
+                edit.state = IssueStates.CLOSED
+            self.assertEqual(m.call_count, 1)
+            self.assertEqual(m.last_request.json(), {
+                'title': 'edited',
+                'labels': 'bug',
+                'assignee_ids': [2],
+                'state_event': 'close',
+            })
+        self.assertEqual(self.iss.title, 'edited')
+
+    def test_unchanged_writes_are_skipped(self):
+        issue = GitLabIssue.from_data({'title': 'same', 'description': 'text',
+                                       'state': 'closed', 'labels': ['bug'],
+                                       'assignees': []},
+                                      self.token, 'gitmate-test-user/test', 1)
+        with requests_mock.Mocker() as m:
+            issue.title = 'same'
+            issue.description = 'text'
+            issue.labels = {'bug'}
+            issue.assignees = set()
+            issue.close()
+            with issue.edit() as edit:
+                edit.state = IssueStates.CLOSED
+            self.assertEqual(m.call_count, 0)
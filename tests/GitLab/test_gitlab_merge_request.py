@@ -1,6 +1,9 @@
 import os
 import datetime
 
+import requests_mock
+
+from IGitt.GitLab import BASE_URL
 from IGitt.GitLab import GitLabOAuthToken
 from IGitt.GitLab.GitLabMergeRequest import GitLabMergeRequest
 from IGitt.GitLab.GitLabUser import GitLabUser
@@ -39,10 +42,11 @@ class GitLabMergeRequestTest(IGittTestCase):
                          ['f6d2b7c66372236a090a2a74df2e47f42a54456b'])
 
     def test_repository(self):
-        self.assertEqual(self.mr.target_repository.full_name,
-                         'gitmate-test-user/test')
-        self.assertEqual(self.mr.source_repository.full_name,
-                         'gitmate-test-user/test')
+        with self.replay('GitLabMergeRequestTest.test_head.yaml'):
+            self.assertEqual(self.mr.target_repository.full_name,
+                             'gitmate-test-user/test')
+            self.assertEqual(self.mr.source_repository.full_name,
+                             'gitmate-test-user/test')
 
     def test_diffstat(self):
         self.assertEqual(self.mr.diffstat, (2, 0))
@@ -124,3 +128,79 @@ class GitLabMergeRequestTest(IGittTestCase):
                  should_remove_source_branch=True,
                  _gitlab_merge_when_pipeline_succeeds=True)
         self.assertEqual(mr.state, MergeRequestStates.MERGED)
+
+    def test_edit(self):
+        with requests_mock.Mocker() as m:
+            m.put(requests_mock.ANY, json={'title': 'edited'})
+            with self.mr.edit() as edit:
+                edit.description = 'new description'
+                edit.assignees = set()
+            self.assertEqual(m.last_request.json(),
+                             {'description': 'new description',
+                              'assignee_id': 0})
+            with self.assertRaises(NotImplementedError):
+                with self.mr.edit() as edit:
+                    edit.assignees = {GitLabUser(self.token, 1),
+                                      GitLabUser(self.token, 2)}
+            self.assertEqual(m.call_count, 1)
+
+    def test_review(self):
+        refs = {'base_sha': 'a' * 40, 'start_sha': 'b' * 40,
+                'head_sha': 'c' * 40}
+        mr = GitLabMergeRequest.from_data({'diff_refs': refs}, self.token,
+                                          'a/b', 7)
+        url = BASE_URL + '/projects/a%2Fb/merge_requests/7'
+        with requests_mock.Mocker() as m:
+            m.get(url + '/changes', json={'changes': [
+                {'old_path': 'old.md', 'new_path': 'README.md',
+                 'new_file': False, 'deleted_file': False,
+                 'diff': '@@ -1,2 +1,3 @@\n # test\n+\n a test repo\n'}]})
+            m.post(url + '/draft_notes', json={'id': 1})
+            m.post(url + '/draft_notes/bulk_publish', status_code=204)
+            mr.review([('README.md', 2, 'Empty line.'),
+                       ('README.md', 3, 'Typo.'),
+                       ('other.md', 1, 'Missing.')])
+            self.assertEqual([request.json() for request in m.request_history
+                              if request.method == 'POST'], [
+                {'note': 'Empty line.',
+                 'position': dict(refs, position_type='text',
+                                  old_path='old.md', new_path='README.md',
+                                  new_line=2)},
+                {'note': 'Typo.',
+                 'position': dict(refs, position_type='text',
+                                  old_path='old.md', new_path='README.md',
+                                  new_line=3, old_line=2)},
+                {'note': 'Comment on file other.md, line 1.\n\nMissing.'},
+                {}])
+            self.assertEqual(m.call_count, 5)
+
+    def test_review_failure_deletes_drafts(self):
+        refs = {'base_sha': 'a' * 40, 'start_sha': 'b' * 40,
+                'head_sha': 'c' * 40}
+        mr = GitLabMergeRequest.from_data({'diff_refs': refs}, self.token,
+                                          'a/b', 7)
+        url = BASE_URL + '/projects/a%2Fb/merge_requests/7'
+        with requests_mock.Mocker() as m:
+            m.get(url + '/changes', json={'changes': [
+                {'old_path': 'README.md', 'new_path': 'README.md',
+                 'new_file': False, 'deleted_file': False,
+                 'diff': '@@ -1,2 +1,3 @@\n # test\n+\n a test repo\n'}]})
+            m.post(url + '/draft_notes', [{'json': {'id': 1}},
+                                          {'json': {'id': 2}},
+                                          {'json': {'message': 'Error'},
+                                           'status_code': 500}])
+            m.delete(url + '/draft_notes/1', status_code=204)
+            m.delete(url + '/draft_notes/2', status_code=404)
+            with self.assertRaises(RuntimeError):
+                mr.review([('README.md', 2, 'Empty line.'),
+                           ('README.md', 3, 'Typo.'),
+                           ('other.md', 1, 'Missing.')])
+            self.assertEqual([(request.method, request.path)
+                              for request in m.request_history
+                              if request.method == 'DELETE'],
+                             [('DELETE', '/api/v4/projects/a%2fb/'
+                                         'merge_requests/7/draft_notes/1'),
+                              ('DELETE', '/api/v4/projects/a%2fb/'
+                                         'merge_requests/7/draft_notes/2')])
+            self.assertNotIn('/draft_notes/bulk_publish',
+                             [request.path for request in m.request_history])
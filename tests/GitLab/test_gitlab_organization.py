@@ -26,10 +26,13 @@ class GitLabOrganizationTest(IGittTestCase):
     def test_admins(self):
         self.assertEqual({o.username for o in self.suborg.owners},
                          {'sils', 'nkprince007'})
-        self.assertEqual({o.username for o in self.org.owners},
-                         {'sils', 'nkprince007'})
-        self.assertEqual({m.username for m in self.org.masters},
-                         {'sils', 'nkprince007', 'gitmate-test-user'})
+        # The subgroup read the members of its parent with an object of its
+        # own, this object reads them again
+        with self.replay('GitLabOrganizationTest.test_billable_users.yaml'):
+            self.assertEqual({o.username for o in self.org.owners},
+                             {'sils', 'nkprince007'})
+            self.assertEqual({m.username for m in self.org.masters},
+                             {'sils', 'nkprince007', 'gitmate-test-user'})
         self.assertEqual({o.username for o in self.user.owners},
                          {'gitmate-test-user'})
 
@@ -54,10 +57,12 @@ class GitLabOrganizationTest(IGittTestCase):
         self.assertEqual(self.org.description, '')
 
     def test_suborgs(self):
-        self.assertEqual({o.name for o in self.org.suborgs},
-                         {'gitmate-test-org/subgroup',
-                          'gitmate-test-org/another-subgroup',
-                          'gitmate-test-org/another-subgroup/nested-subgroup'})
+        with self.replay('GitLabOrganizationTest.test_repositories.yaml'):
+            self.assertEqual(
+                {o.name for o in self.org.suborgs},
+                {'gitmate-test-org/subgroup',
+                 'gitmate-test-org/another-subgroup',
+                 'gitmate-test-org/another-subgroup/nested-subgroup'})
 
     def test_repositories(self):
         self.assertEqual(
@@ -1,7 +1,14 @@
 from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from urllib.parse import parse_qs
+from urllib.parse import urlparse
 
 import os
 
+import requests_mock
+
+from IGitt.GitLab import BASE_URL
 from IGitt.GitLab import GitLabOAuthToken, GitLabPrivateToken
 from IGitt.GitLab.GitLabContent import GitLabContent
 from IGitt.GitLab.GitLabMergeRequest import GitLabMergeRequest
@@ -16,6 +23,41 @@ from IGitt import ElementAlreadyExistsError, ElementDoesntExistError
 from tests import IGittTestCase
 
 
+def search_item(iid, state, created, updated):
+    return {'iid': iid, 'state': state, 'created_at': created + 'Z',
+            'updated_at': updated + 'Z'}
+
+
+# Issues and merge requests as GitLab would list them, see filtered_search
+SEARCH_ITEMS = [
+    search_item(34, 'opened', '2017-09-24T17:52:59.375', '2017-09-24T17:52:59'),
+    search_item(32, 'opened', '2017-07-07T10:38:34.299', '2017-07-07T10:38:57'),
+    search_item(31, 'opened', '2017-06-20T08:00:00.000', '2017-06-20T08:00:00'),
+    search_item(30, 'opened', '2017-06-18T00:00:00.000', '2017-06-25T00:00:00'),
+    search_item(29, 'closed', '2017-06-16T10:37:24.767', '2017-06-19T05:21:15'),
+    search_item(28, 'closed', '2017-06-14T09:00:00.000', '2017-06-30T09:00:00'),
+    search_item(2, 'opened', '2017-06-07T03:51:41.112', '2017-06-16T08:11:45'),
+]
+
+
+def filtered_search(request, context):
+    """
+    Answers a search like GitLab, which includes the bounds of the dates.
+    """
+    query = {name: values[0]
+             for name, values in parse_qs(urlparse(request.url).query).items()}
+    items = [item for item in SEARCH_ITEMS
+             if query.get('state', item['state']) == item['state']]
+    for field in ('created', 'updated'):
+        after = query.get(field + '_after')
+        before = query.get(field + '_before')
+        items = [item for item in items
+                 if (after is None or item[field + '_at'] >= after) and
+                 (before is None or item[field + '_at'][:19] + 'Z' <= before)]
+    return sorted(items, key=lambda item: item[query['order_by']],
+                  reverse=True)
+
+
 class GitLabRepositoryTest(IGittTestCase):
 
     def setUp(self):
@@ -149,32 +191,85 @@ class GitLabRepositoryTest(IGittTestCase):
     def test_search_issues(self):
         created_after = datetime(2017, 6, 18).date()
         created_before = datetime(2017, 7, 15).date()
-        issues = list(self.repo.search_issues(created_after=created_after,
-                                              created_before=created_before,
-                                              state=IssueStates.OPEN))
-        self.assertEqual(len(issues), 2)
-        issues = list(self.repo.search_issues(created_after=created_after,
-                                              created_before=created_before,
-                                              state=IssueStates.CLOSED))
-        self.assertEqual(len(issues), 0)
+        with requests_mock.Mocker() as m:
+            m.get(BASE_URL + '/projects/gitmate-test-user%2Ftest/issues',
+                  json=filtered_search)
+            issues = list(self.repo.search_issues(
+                created_after=created_after, created_before=created_before,
+                state=IssueStates.OPEN))
+            # Issue 30 was created right at the bound
+            self.assertEqual([issue.number for issue in issues], [32, 31])
+            self.assertIn('created_after=2017-06-18T00%3A00%3A00Z',
+                          m.last_request.url)
+            self.assertIn('created_before=2017-07-15T00%3A00%3A00Z',
+                          m.last_request.url)
+            issues = list(self.repo.search_issues(
+                created_after=created_after, created_before=created_before,
+                state=IssueStates.CLOSED))
+            self.assertEqual(len(issues), 0)
+            self.assertIn('state=closed', m.last_request.url)
 
     def test_search_mrs(self):
         updated_after = datetime(2017, 6, 18).date()
         updated_before = datetime(2017, 7, 2).date()
-        merge_requests = list(self.repo.search_mrs(
-            updated_after=updated_after,
-            updated_before=updated_before,
-            state=MergeRequestStates.OPEN))
-        self.assertEqual(len(merge_requests), 1)
-        merge_requests = list(self.repo.search_mrs(
-            updated_after=updated_after,
-            updated_before=updated_before,
-            state=MergeRequestStates.CLOSED))
-        self.assertEqual(len(merge_requests), 2)
-        merge_requests = list(self.repo.search_mrs(
-            updated_after=updated_after,
-            updated_before=updated_before))
-        self.assertEqual(len(merge_requests), 3)
+        with requests_mock.Mocker() as m:
+            m.get(BASE_URL + '/projects/gitmate-test-user%2Ftest/'
+                  'merge_requests', json=filtered_search)
+            merge_requests = list(self.repo.search_mrs(
+                updated_after=updated_after,
+                updated_before=updated_before,
+                state=MergeRequestStates.OPEN))
+            self.assertEqual([mr.number for mr in merge_requests], [30, 31])
+            merge_requests = list(self.repo.search_mrs(
+                updated_after=updated_after,
+                updated_before=updated_before,
+                state=MergeRequestStates.CLOSED))
+            self.assertEqual([mr.number for mr in merge_requests], [28, 29])
+            merge_requests = list(self.repo.search_mrs(
+                updated_after=updated_after,
+                updated_before=updated_before))
+            self.assertEqual(len(merge_requests), 4)
+            self.assertEqual(m.call_count, 3)
+            self.assertIn('order_by=updated_at', m.last_request.url)
+
+    def test_search_filters_on_server(self):
+        repo = GitLabRepository(GitLabOAuthToken('secret'), 'a/b')
+        url = BASE_URL + '/projects/a%2Fb/merge_requests'
+        page = [{'iid': iid, 'created_at': '2017-06-01T10:00:00.000Z',
+                 'updated_at': '2017-07-01T10:00:00.000Z'}
+                for iid in (3, 2)]
+        with requests_mock.Mocker() as m:
+            m.get(url, json=page, headers={
+                'Link': '<{}?page=2>; rel="next"'.format(url)})
+            merge_requests = repo.search_mrs(
+                updated_after=datetime(2017, 6, 30, 12),
+                state=MergeRequestStates.OPEN)
+            self.assertEqual(next(merge_requests).number, 3)
+            self.assertEqual(m.call_count, 1)
+            self.assertEqual(m.last_request.qs, {
+                'updated_after': ['2017-06-30t12:00:00z'],
+                'order_by': ['updated_at'], 'sort': ['desc'],
+                'state': ['opened'], 'per_page': ['100'],
+                'access_token': ['secret']})
+
+    def test_search_with_time_zone_and_order(self):
+        repo = GitLabRepository(GitLabOAuthToken('secret'), 'a/b')
+        page = [{'iid': 3, 'created_at': '2017-06-01T10:00:00.000Z',
+                 'updated_at': '2017-06-30T11:00:00.000Z'},
+                {'iid': 2, 'created_at': '2017-06-02T10:00:00.000Z',
+                 'updated_at': '2017-06-30T12:30:00.000Z'}]
+        with requests_mock.Mocker() as m:
+            m.get(BASE_URL + '/projects/a%2Fb/issues', json=page)
+            issues = repo.search_issues(
+                updated_after=datetime(2017, 6, 30, 14, tzinfo=timezone(
+                    timedelta(hours=2))),
+                order_by='created', descending=False)
+            # Issue 3 was updated an hour before the bound
+            self.assertEqual([issue.number for issue in issues], [2])
+            self.assertEqual(m.last_request.qs['updated_after'],
+                             ['2017-06-30t12:00:00z'])
+            self.assertEqual(m.last_request.qs['order_by'], ['created_at'])
+            self.assertEqual(m.last_request.qs['sort'], ['asc'])
 
     def test_commits(self):
         self.assertEqual({commit.sha for commit in self.repo.commits},
@@ -1,5 +1,12 @@
+from unittest.mock import patch
+
+from IGitt import ElementDoesntExistError
 from IGitt.Interfaces.CommitStatus import Status
 from IGitt.Interfaces.Commit import Commit
+from IGitt.Interfaces.Commit import _FINAL_STATUSES
+from IGitt.Interfaces.Diff import LineType
+from IGitt.Interfaces.Diff import parse_diff
+from IGitt.Utils import invalidate_url
 
 from tests import IGittTestCase
 
@@ -22,3 +29,103 @@ class TestCommit(IGittTestCase):
         assert commit.get_statuses()[2].status == Status.FAILED
         commit.pending()
         assert len(commit.get_statuses()) == 3
+
+    def test_final_status_is_kept(self):
+        calls = []
+
+        class StatusCommit(Commit):
+            url = 'https://api.example.com/commits/abc'
+
+            def __init__(self, status):
+                self.status = status
+
+            def _get_combined_status(self):
+                calls.append(self.status)
+                return self.status
+
+        self.assertEqual(StatusCommit(Status.PENDING).combined_status,
+                         Status.PENDING)
+        self.assertEqual(StatusCommit(Status.FAILED).combined_status,
+                         Status.FAILED)
+        # finished, so other objects of the same commit don't ask again
+        self.assertEqual(StatusCommit(Status.SUCCESS).combined_status,
+                         Status.FAILED)
+        self.assertEqual(calls, [Status.PENDING, Status.FAILED])
+
+        invalidate_url(StatusCommit.url)
+        self.assertEqual(StatusCommit(Status.SUCCESS).combined_status,
+                         Status.SUCCESS)
+        invalidate_url(StatusCommit.url)
+
+    def test_pending_status_expires(self):
+        class StatusCommit(Commit):
+            url = 'https://api.example.com/commits/def'
+
+            def __init__(self):
+                self.status = Status.PENDING
+
+            def _get_combined_status(self):
+                return self.status
+
+        commit = StatusCommit()
+        self.assertEqual(commit.combined_status, Status.PENDING)
+        commit.status = Status.SUCCESS
+        self.assertEqual(commit.combined_status, Status.PENDING)
+        with patch('IGitt.Utils.monotonic', return_value=10 ** 9):
+            self.assertEqual(commit.combined_status, Status.SUCCESS)
+        invalidate_url(StatusCommit.url)
+
+    def test_final_statuses_are_bounded(self):
+        class StatusCommit(Commit):
+            def __init__(self, sha):
+                self.name = sha
+
+            def _final_status_key(self):
+                return 'https://api.example.com/commits/' + self.name
+
+            def _get_combined_status(self):
+                return Status.SUCCESS
+
+        with patch('IGitt.Interfaces.Commit.FINAL_STATUSES_MAXSIZE', 2):
+            for sha in ('a', 'b', 'a', 'c'):
+                StatusCommit(sha).combined_status
+            self.assertEqual(list(_FINAL_STATUSES),
+                             ['https://api.example.com/commits/a',
+                              'https://api.example.com/commits/c'])
+        invalidate_url('https://api.example.com/commits')
+
+    def test_diff_index(self):
+        patches = []
+
+        class DiffCommit(Commit):
+            def iter_diff(self):
+                patches.append(1)
+                return parse_diff(['diff --git a/README.md b/README.md',
+                                   'index 1da2df..2dacdf 100644',
+                                   '--- a/README.md', '+++ b/README.md',
+                                   '@@ -1,2 +1,3 @@', ' a', '+b', ' c',
+                                   'diff --git a/old.py b/new.py',
+                                   'similarity index 90%',
+                                   'rename from old.py', 'rename to new.py',
+                                   '--- a/old.py', '+++ b/new.py',
+                                   '@@ -5 +5 @@', '-x', '+y'])
+
+        commit = DiffCommit()
+        self.assertEqual(commit.diff_index.position('README.md', 2), 2)
+        self.assertEqual(commit.diff_index.position('README.md', 4), None)
+        self.assertEqual(commit.diff_index.position('old.py', 5), 2)
+        self.assertEqual(commit.diff_index.patch('new.py'),
+                         'similarity index 90%\nrename from old.py\n'
+                         'rename to new.py\n--- a/old.py\n+++ b/new.py\n'
+                         '@@ -5 +5 @@\n-x\n+y\n')
+        with self.assertRaises(ElementDoesntExistError):
+            commit.diff_index.position('other.py', 1)
+        self.assertEqual(len(patches), 1)
+
+        added, = commit.diff.file('README.md').hunks
+        self.assertEqual([(line.type, line.content, line.old_number,
+                           line.new_number) for line in added.lines],
+                         [(LineType.CONTEXT, 'a', 1, 1),
+                          (LineType.ADDED, 'b', None, 2),
+                          (LineType.CONTEXT, 'c', 2, 3)])
+        self.assertEqual(str(commit.diff).count('\n'), 14)
@@ -1,15 +1,24 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+import requests_mock
 
 from IGitt.Interfaces import _RESPONSES
 from IGitt.Interfaces import _fetch
+from IGitt.Interfaces import _get_session
+from IGitt.Interfaces import _response_key
+from IGitt.Interfaces import _stream_lines
+from IGitt.Interfaces import LazyCollection
 from IGitt.GitHub import BASE_URL as GITHUB_BASE_URL
 from IGitt.GitHub import get
+from IGitt.GitHub import get_lazy
 from IGitt.GitHub import GitHubToken
 from IGitt.GitHub import GitHubJsonWebToken
 from IGitt.GitHub import GitHubInstallationToken
 from IGitt.GitHub.GitHubRepository import GitHubRepository
 from IGitt.GitLab import BASE_URL as GITLAB_BASE_URL
 from IGitt.GitLab import GitLabOAuthToken
+from IGitt.GitLab import get_lazy as gitlab_get_lazy
 
 from tests import IGittTestCase
 
@@ -70,16 +79,174 @@ class TestInterfacesInit(IGittTestCase):
         repo = GitHubRepository(token, os.environ.get('GITHUB_TEST_REPO',
                                                       'gitmate-test-user/test'))
 
+        key = _response_key(_get_session(token, {'per_page': 100}).get,
+                            repo.url)
         repo.refresh()
         prev_data = repo.data._data
-        prev_count = _RESPONSES[repo.url].headers.get('X-RateLimit-Remaining')
+        prev_count = _RESPONSES[key].headers.get('X-RateLimit-Remaining')
 
         repo.refresh()
         new_data = repo.data._data
-        new_count = _RESPONSES[repo.url].headers.get('X-RateLimit-Remaining')
+        new_count = _RESPONSES[key].headers.get('X-RateLimit-Remaining')
 
         # check that no reduction in rate limit is observed
         assert prev_count == new_count
 
         # check that response data hasn't been modified
         assert prev_data == new_data
+
+    def test_responses_by_query(self):
+        token = GitHubToken('')
+        url = GITHUB_BASE_URL + '/user/repos'
+        with requests_mock.Mocker() as m:
+            m.get(url, [{'json': [{'id': 1}], 'headers': {'ETag': '"all"'}},
+                        {'json': [], 'headers': {'ETag': '"owner"'}},
+                        {'status_code': 304}])
+            self.assertEqual(get(token, '/user/repos'), [{'id': 1}])
+            self.assertEqual(get(token, '/user/repos',
+                                 {'affiliation': 'owner'}), [])
+            # The other listing doesn't replace the cached one
+            self.assertEqual(get(token, '/user/repos'), [{'id': 1}])
+            self.assertEqual(m.request_history[2].headers['If-None-Match'],
+                             '"all"')
+
+    def test_stream_lines(self):
+        token = GitHubToken('')
+        with requests_mock.Mocker() as m:
+            m.get(GITHUB_BASE_URL + '/diff',
+                  content='+ä\x0c\n-b\n\n c'.encode('utf-8'))
+            lines = _stream_lines(GITHUB_BASE_URL, token, '/diff',
+                                  chunk_size=3)
+            self.assertEqual(m.call_count, 0)
+            self.assertEqual(list(lines), ['+ä\x0c', '-b', '', ' c'])
+        self.assertNotIn(GITHUB_BASE_URL + '/diff', _RESPONSES)
+
+    def test_envelope_pagination(self):
+        token = GitHubToken('')
+        url = GITHUB_BASE_URL + '/installation/repositories'
+        with requests_mock.Mocker() as m:
+            m.get(url, json={'total_count': 3,
+                             'repositories': [{'id': 1}, {'id': 2}]},
+                  headers={'Link': '<{}?page=2>; rel="next"'.format(url)})
+            m.get(url + '?page=2', json={'total_count': 3,
+                                         'repositories': [{'id': 3}]})
+            data = get(token, '/installation/repositories')
+        self.assertEqual(data['total_count'], 3)
+        self.assertEqual([repo['id'] for repo in data['repositories']],
+                         [1, 2, 3])
+
+
+class LazyCollectionTest(IGittTestCase):
+
+    def setUp(self):
+        self.token = GitHubToken('')
+        self.url = GITHUB_BASE_URL + '/repos/a/b/pulls'
+
+    def link(self, **pages):
+        return ', '.join('<{}?per_page=2&page={}>; rel="{}"'.format(
+            self.url, page, rel) for rel, page in pages.items())
+
+    def mock_pages(self, m, last=True):
+        m.get(self.url, json=[{'number': 1}, {'number': 2}],
+              headers={'Link': self.link(next=2, last=3) if last
+                                else self.link(next=2)})
+        m.get(self.url + '?page=2', json=[{'number': 3}, {'number': 4}],
+              headers={'Link': self.link(next=3, last=3)})
+        m.get(self.url + '?page=3', json=[{'number': 5}])
+
+    def collection(self, **kwargs):
+        return get_lazy(self.token, '/repos/a/b/pulls',
+                        lambda item: item['number'], **kwargs)
+
+    def test_slicing(self):
+        with requests_mock.Mocker() as m:
+            self.mock_pages(m)
+            collection = self.collection()
+            self.assertEqual(collection[:2], [1, 2])
+            self.assertEqual(collection[0], 1)
+            self.assertEqual(m.call_count, 1)
+            self.assertEqual(collection[1:4], [2, 3, 4])
+            self.assertEqual(m.call_count, 2)
+            self.assertEqual(collection[-1], 5)
+            self.assertEqual(list(collection), [1, 2, 3, 4, 5])
+            self.assertEqual(m.call_count, 3)
+
+    def test_concurrent_iteration(self):
+        with requests_mock.Mocker() as m:
+            self.mock_pages(m, last=False)
+            collection = self.collection()
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                results = list(executor.map(lambda _: list(collection),
+                                            range(4)))
+            self.assertEqual(results, [[1, 2, 3, 4, 5]] * 4)
+            self.assertEqual(m.call_count, 3)
+
+    def test_len_from_last_page(self):
+        with requests_mock.Mocker() as m:
+            self.mock_pages(m)
+            self.assertEqual(len(self.collection()), 5)
+            self.assertEqual(m.call_count, 2)
+
+    def test_len_by_loading(self):
+        with requests_mock.Mocker() as m:
+            self.mock_pages(m, last=False)
+            self.assertEqual(len(self.collection()), 5)
+            self.assertEqual(
+                len(self.collection(select=lambda item: item['number'] > 1)),
+                4)
+
+    def test_len_from_total(self):
+        url = GITLAB_BASE_URL + '/projects/a%2Fb/issues'
+        token = GitLabOAuthToken('')
+        with requests_mock.Mocker() as m:
+            m.get(url, json=[{'iid': 1}],
+                  headers={'X-Total': '42', 'Link': '<{}?page=2>; '
+                                                    'rel="next"'.format(url)})
+            collection = gitlab_get_lazy(token, '/projects/a%2Fb/issues',
+                                         lambda item: item['iid'])
+            self.assertEqual(len(collection), 42)
+            self.assertEqual(m.call_count, 1)
+
+    def test_set_behaviour(self):
+        with requests_mock.Mocker() as m:
+            self.mock_pages(m)
+            collection = self.collection()
+            self.assertIn(3, collection)
+            self.assertEqual(collection, {1, 2, 3, 4, 5})
+            self.assertEqual(collection & {1, 7}, {1})
+            self.assertEqual({1, 7} - collection, {7})
+            self.assertIsInstance(collection | {7}, set)
+
+    def test_order_by(self):
+        with requests_mock.Mocker() as m:
+            self.mock_pages(m)
+            self.collection().order_by('updated')[0]
+            self.assertEqual(m.last_request.qs['sort'], ['updated'])
+            self.assertEqual(m.last_request.qs['direction'], ['desc'])
+        with self.assertRaises(NotImplementedError):
+            LazyCollection(GITHUB_BASE_URL, self.token, '/a',
+                           lambda item: item).order_by('updated')
+
+    def test_prefetch(self):
+        with requests_mock.Mocker() as m:
+            self.mock_pages(m)
+            for number in range(1, 5):
+                m.get(self.url + '/' + str(number),
+                      json={'title': str(number)})
+            collection = get_lazy(
+                self.token, '/repos/a/b/pulls',
+                lambda item: GitHubRepository(self.token,
+                                              'a/b/pulls/{}'.format(
+                                                  item['number'])))
+            objects = collection.prefetch('data')[2:4]
+            self.assertEqual(m.call_count, 6)
+            self.assertEqual([obj.data['title'] for obj in objects],
+                             ['3', '4'])
+            self.assertEqual(m.call_count, 6)
+
+    def test_empty_on(self):
+        with requests_mock.Mocker() as m:
+            m.get(self.url, status_code=409, text='Git Repository is empty.')
+            self.assertEqual(self.collection(empty_on=(409,)), set())
+            with self.assertRaises(RuntimeError):
+                list(self.collection())
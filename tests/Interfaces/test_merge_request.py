@@ -1,6 +1,8 @@
+from time import sleep
 from unittest.mock import PropertyMock
 from unittest.mock import patch
 
+from IGitt.Interfaces.CommitStatus import Status
 from IGitt.Interfaces.MergeRequest import MergeRequest
 from IGitt.Interfaces.Repository import Repository
 
@@ -50,3 +52,35 @@ class TestMergeRequest(IGittTestCase):
 
         for body in bad:
             self.assertEqual(self.mr._get_keywords_issues(r'', body), set())
+
+    @patch.object(MergeRequest, 'commits', new_callable=PropertyMock)
+    def test_tests_passed(self, mock_commits):
+        class SlowCommit:
+            def __init__(self, sha, status, delay=0.0):
+                self.sha = sha
+                self.status = status
+                self.delay = delay
+                self.asked = False
+
+            @property
+            def combined_status(self):
+                self.asked = True
+                sleep(self.delay)
+                return self.status
+
+        commits = [SlowCommit(str(index), Status.SUCCESS, 0.05)
+                   for index in range(8)]
+        mock_commits.return_value = tuple(commits)
+        self.assertTrue(self.mr.tests_passed)
+        self.assertEqual(self.mr.get_combined_statuses(),
+                         {str(index): Status.SUCCESS for index in range(8)})
+
+        failing = SlowCommit('failing', Status.FAILED)
+        late = [SlowCommit(str(index), Status.SUCCESS, 0.05)
+                for index in range(20)]
+        mock_commits.return_value = (failing, *late)
+        self.assertFalse(self.mr.tests_passed)
+        statuses = self.mr.get_combined_statuses(
+            stop_on={Status.FAILED}, max_workers=2)
+        self.assertEqual(statuses['failing'], Status.FAILED)
+        self.assertLess(len(statuses), 21)
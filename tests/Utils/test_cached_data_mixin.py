@@ -1,7 +1,35 @@
+import copy
+import gc
+import json
 import os
+import pickle
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from time import monotonic
+from time import sleep
+from unittest.mock import patch
 
+import requests_mock
+
+from IGitt.GitHub import BASE_URL as GITHUB_BASE_URL
 from IGitt.GitHub import GitHubToken
+from IGitt.GitHub.GitHubComment import GitHubComment
+from IGitt.GitHub.GitHubIssue import GitHubIssue
+from IGitt.GitHub.GitHubMergeRequest import GitHubMergeRequest
+from IGitt.GitHub.GitHubReaction import GitHubReaction
 from IGitt.GitHub.GitHubRepository import GitHubRepository
+from IGitt.GitLab.GitLabMergeRequest import GitLabMergeRequest
+from IGitt.GitLab import GitLabOAuthToken
+from IGitt.Interfaces import IssueStates
+from IGitt.Interfaces import MergeRequestStates
+from IGitt.Interfaces.Comment import CommentType
+from IGitt.Utils import CachedDataMixin
+from IGitt.Utils import FreshnessPolicy
+from IGitt.Utils import hydrate
+from IGitt.Utils import memoized
+from IGitt.Utils import parse_timestamp
+from IGitt.Utils import prefetch
 
 from tests import IGittTestCase
 
@@ -17,3 +45,357 @@ class CachedDataMixinTest(IGittTestCase):
             repository.clone_url,
             'https://{}@github.com/gitmate-test-user/test.git'.format(
                 token.value))
+
+
+class CountingData(CachedDataMixin):
+
+    def __init__(self, token=None):
+        self._token = token
+        self.calls = 0
+
+    def _get_data(self):
+        self.calls += 1
+        return {'calls': self.calls}
+
+
+class MemoizedData(CountingData):
+
+    @property
+    @memoized(ttl=60)
+    def expensive(self):
+        self.calls += 1
+        return self.calls
+
+    @memoized(maxsize=2)
+    def square(self, number):
+        self.calls += 1
+        return number ** 2
+
+
+class MemoizedTest(IGittTestCase):
+
+    def test_property(self):
+        obj = MemoizedData()
+        self.assertEqual((obj.expensive, obj.expensive), (1, 1))
+        self.assertEqual(MemoizedData().expensive, 1)
+        with patch('IGitt.Utils.monotonic', return_value=10 ** 9):
+            self.assertEqual(obj.expensive, 2)
+
+    def test_maxsize(self):
+        obj = MemoizedData()
+        for number in (1, 2, 1, 3):
+            obj.square(number)
+        self.assertEqual(obj.calls, 3)
+        obj.square(1)
+        self.assertEqual(obj.calls, 3)
+        obj.square(2)
+        self.assertEqual(obj.calls, 4)
+
+    def test_invalidation(self):
+        obj = MemoizedData()
+        obj.prime('expensive', 42)
+        self.assertEqual(obj.expensive, 42)
+        obj.invalidate('expensive')
+        self.assertEqual(obj.expensive, 1)
+        obj.refresh()
+        self.assertEqual(obj.expensive, 3)
+
+    def test_data_changes(self):
+        def pull(sha):
+            return {'head': {'sha': sha, 'repo': {'full_name': 'a/b'}},
+                    'base': {'sha': 'base'}, 'number': 1}
+
+        mr = GitHubMergeRequest.from_data(pull('old'), GitHubToken(''),
+                                          'a/b', 1)
+        mr.prime('repository', GitHubRepository(GitHubToken(''), 'a/b'))
+        head = mr.head
+        self.assertIs(mr.head, head)
+        with requests_mock.Mocker() as m:
+            m.get(GITHUB_BASE_URL + '/repos/a/b/issues/1', json=pull('old'))
+            mr.data.refresh()
+            self.assertIs(mr.head, head)
+            m.get(GITHUB_BASE_URL + '/repos/a/b/issues/1', json=pull('new'))
+            mr.data.refresh()
+        self.assertEqual(mr.head.sha, 'new')
+        mr.data = pull('newer')
+        self.assertEqual(mr.head.sha, 'newer')
+
+    def test_objects_are_released(self):
+        obj = MemoizedData()
+        obj.square(2)
+        ref = weakref.ref(obj)
+        del obj
+        gc.collect()
+        self.assertIsNone(ref())
+
+
+class PrefetchTest(IGittTestCase):
+
+    def test_prefetch(self):
+        objects = [MemoizedData(), MemoizedData()]
+        prefetch(objects, ['data', 'expensive'])
+        self.assertEqual([obj.calls for obj in objects], [2, 2])
+        self.assertEqual([obj.data['calls'] for obj in objects], [1, 1])
+        self.assertEqual([obj.expensive for obj in objects], [2, 2])
+
+        holder = MemoizedData()
+        holder.prime('expensive', MemoizedData())
+        prefetch([holder], ['expensive.expensive'])
+        self.assertEqual((holder.calls, holder.expensive.calls), (0, 1))
+
+
+class SlowData(MemoizedData):
+
+    def _get_data(self):
+        sleep(0.05)
+        return super()._get_data()
+
+    @property
+    @memoized()
+    def slow(self):
+        sleep(0.05)
+        self.calls += 1
+        return self.calls
+
+
+class SlowToken:
+    # Like tokens, has no lock of its own
+
+    def __init__(self):
+        self.calls = []
+
+    @memoized()
+    def slow(self, number):
+        sleep(0.2)
+        self.calls.append(number)
+        return number
+
+
+class ThreadSafetyTest(IGittTestCase):
+
+    def run_concurrently(self, func, times=8):
+        with ThreadPoolExecutor(max_workers=times) as executor:
+            return list(executor.map(lambda _: func(), range(times)))
+
+    def test_data_is_retrieved_once(self):
+        obj = SlowData()
+        results = self.run_concurrently(lambda: obj.data['calls'])
+        self.assertEqual(results, [1] * 8)
+        self.assertEqual(obj.calls, 1)
+
+    def test_memoized_is_computed_once(self):
+        obj = SlowData()
+        results = self.run_concurrently(lambda: obj.slow)
+        self.assertEqual(results, [1] * 8)
+        self.assertEqual(obj.calls, 1)
+
+    def test_objects_without_lock(self):
+        token = SlowToken()
+        started = monotonic()
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(token.slow, [1, 2, 1, 2]))
+        # Different arguments are computed at the same time, same ones once
+        self.assertLess(monotonic() - started, 0.35)
+        self.assertEqual(results, [1, 2, 1, 2])
+        self.assertEqual(sorted(token.calls), [1, 2])
+
+    def test_stale_data_is_refreshed_once(self):
+        obj = SlowData()
+        obj.freshness_policy = FreshnessPolicy(max_age=60)
+        obj.data['calls']
+        obj.data.fetched_at -= 120
+        results = self.run_concurrently(lambda: obj.data['calls'])
+        self.assertEqual(results, [2] * 8)
+        self.assertEqual(obj.calls, 2)
+
+
+class RecordTest(IGittTestCase):
+
+    def test_parse_timestamp(self):
+        self.assertEqual(parse_timestamp('2016-01-13T07:56:23Z'),
+                         datetime(2016, 1, 13, 7, 56, 23))
+        self.assertEqual(parse_timestamp('2017-06-05T09:45:20.678Z'),
+                         datetime(2017, 6, 5, 9, 45, 20, 678000))
+        self.assertEqual(parse_timestamp('2017-06-05T09:45:20.123456789Z'),
+                         datetime(2017, 6, 5, 9, 45, 20, 123456))
+        self.assertEqual(parse_timestamp('2017-06-05T04:15:20-05:30'),
+                         datetime(2017, 6, 5, 9, 45, 20))
+        self.assertEqual(parse_timestamp('2017-06-05T09:45:20+00:00'),
+                         datetime(2017, 6, 5, 9, 45, 20))
+
+    def test_fields_are_converted_once(self):
+        issue = GitHubIssue.from_data(
+            {'created_at': '2016-01-13T07:56:23Z', 'updated_at': None,
+             'state': 'open', 'user': {'login': 'sils'}},
+            GitHubToken(''), 'a/b', 1)
+        with requests_mock.Mocker():
+            self.assertEqual(issue.created, datetime(2016, 1, 13, 7, 56, 23))
+            self.assertIsNone(issue.updated)
+            self.assertEqual(issue.state, IssueStates.OPEN)
+            self.assertIs(issue.author, issue.author)
+            self.assertEqual(issue.author.username, 'sils')
+            with patch('IGitt.Utils.parse_timestamp') as parse:
+                issue.created
+                self.assertFalse(parse.called)
+
+            issue.data['state'] = 'closed'
+            self.assertEqual(issue.state, IssueStates.CLOSED)
+            issue.data = {'state': 'open'}
+            self.assertEqual(issue.state, IssueStates.OPEN)
+
+    def test_merge_request_fields(self):
+        mr = GitLabMergeRequest.from_data(
+            {'state': 'opened', 'created_at': '2017-06-05T09:45:20.678Z'},
+            GitLabOAuthToken(''), 'a/b', 1)
+        self.assertEqual(mr.state, MergeRequestStates.OPEN)
+        self.assertEqual(mr.created, datetime(2017, 6, 5, 9, 45, 20, 678000))
+
+
+class FreshnessPolicyTest(IGittTestCase):
+
+    def test_no_policy(self):
+        obj = CountingData()
+        self.assertEqual(obj.data['calls'], 1)
+        with patch('IGitt.Utils.monotonic', return_value=10 ** 9):
+            self.assertEqual(obj.data['calls'], 1)
+
+    def test_max_age(self):
+        obj = CountingData()
+        obj.freshness_policy = FreshnessPolicy(max_age=60)
+        with patch('IGitt.Utils.monotonic', return_value=0):
+            self.assertEqual(obj.data['calls'], 1)
+        with patch('IGitt.Utils.monotonic', return_value=30):
+            self.assertEqual(obj.data['calls'], 1)
+        with patch('IGitt.Utils.monotonic', return_value=61):
+            self.assertEqual(obj.data['calls'], 2)
+
+    def test_token_policy(self):
+        token = GitHubToken('')
+        token.freshness_policy = FreshnessPolicy(max_age=60)
+        obj = CountingData(token)
+        with patch('IGitt.Utils.monotonic', return_value=0):
+            self.assertEqual(obj.data['calls'], 1)
+        with patch('IGitt.Utils.monotonic', return_value=61):
+            self.assertEqual(obj.data['calls'], 2)
+
+        # the instance wins over the token
+        obj.freshness_policy = FreshnessPolicy()
+        with patch('IGitt.Utils.monotonic', return_value=10 ** 9):
+            self.assertEqual(obj.data['calls'], 2)
+
+    def test_stale_while_revalidate(self):
+        obj = CountingData()
+        obj.freshness_policy = FreshnessPolicy(max_age=60,
+                                               stale_while_revalidate=60)
+        with patch('IGitt.Utils.monotonic', return_value=0):
+            self.assertEqual(obj.data['calls'], 1)
+        with patch('IGitt.Utils.Thread') as thread:
+            with patch('IGitt.Utils.monotonic', return_value=90):
+                # stale data is served while refreshing in the background
+                self.assertEqual(obj.data['calls'], 1)
+                self.assertEqual(obj.data['calls'], 1)
+            thread.return_value.start.assert_called_once_with()
+            thread.call_args[1]['target']()
+        self.assertEqual(obj.data['calls'], 2)
+
+
+class SnapshotTest(IGittTestCase):
+
+    def setUp(self):
+        self.token = GitHubToken('secret')
+
+    def test_roundtrip(self):
+        issue = GitHubIssue.from_data({'title': 'test issue'}, self.token,
+                                      'gitmate-test-user/test', 1)
+        snapshot = json.loads(json.dumps(issue.to_snapshot()))
+        self.assertNotIn('secret', json.dumps(snapshot))
+
+        token = GitHubToken('other')
+        restored = GitHubIssue.from_snapshot(snapshot, token)
+        self.assertIsInstance(restored, GitHubIssue)
+        self.assertEqual(restored, issue)
+        self.assertIs(restored._token, token)
+        self.assertEqual(restored.title, 'test issue')
+        self.assertTrue(restored.data.may_need_refresh)
+
+    def test_nested_objects_and_enums(self):
+        issue = GitHubIssue(self.token, 'gitmate-test-user/test', 12)
+        reaction = GitHubReaction.from_data({'content': 'heart'}, self.token,
+                                            issue, 1)
+        comment = GitHubComment(self.token, 'gitmate-test-user/test',
+                                CommentType.ISSUE, 2)
+        restored = CachedDataMixin.from_snapshot(
+            json.loads(json.dumps(reaction.to_snapshot())), self.token)
+        self.assertEqual(restored.name, 'heart')
+        self.assertEqual(restored._related, issue)
+        restored = CachedDataMixin.from_snapshot(comment.to_snapshot(),
+                                                 self.token)
+        self.assertEqual(restored.type, CommentType.ISSUE)
+
+    def test_pickle(self):
+        issue = GitHubIssue.from_data(
+            {'title': 'test issue', 'created_at': '2016-01-13T07:56:23Z'},
+            self.token, 'gitmate-test-user/test', 1)
+        issue.record.created
+        issue.prime('repository', 'primed')
+
+        for restored in (pickle.loads(pickle.dumps(issue)),
+                         copy.deepcopy(issue)):
+            self.assertEqual(restored, issue)
+            self.assertIsNot(restored._lock, issue._lock)
+            self.assertIsNot(restored.data._lock, issue.data._lock)
+            self.assertEqual(restored.title, 'test issue')
+            self.assertEqual(restored.record.created,
+                             datetime(2016, 1, 13, 7, 56, 23))
+            self.assertEqual(restored.repository, 'primed')
+
+    def test_wrong_class(self):
+        snapshot = GitHubIssue(self.token, 'a/b', 1).to_snapshot()
+        with self.assertRaises(TypeError):
+            GitHubRepository.from_snapshot(snapshot, self.token)
+        snapshot['class'] = 'os:getcwd'
+        with self.assertRaises(TypeError):
+            CachedDataMixin.from_snapshot(snapshot, self.token)
+        snapshot['class'] = 'IGitt.Interfaces:IssueStates'
+        with self.assertRaises(TypeError):
+            CachedDataMixin.from_snapshot(snapshot, self.token)
+
+    def test_foreign_module(self):
+        snapshot = GitHubIssue(self.token, 'a/b', 1).to_snapshot()
+        for path in ('tests.snapshot_module:Issue', 'IGittX:Issue'):
+            snapshot['class'] = path
+            with patch('IGitt.Utils.import_module') as import_module:
+                with self.assertRaises(TypeError):
+                    CachedDataMixin.from_snapshot(snapshot, self.token)
+            import_module.assert_not_called()
+        snapshot['class'] = 'IGitt.GitHub.GitHubIssue:GitHubIssue'
+        snapshot['args'][1] = {'enum': 'os:getcwd', 'name': 'x'}
+        with self.assertRaisesRegex(TypeError, 'os:getcwd is not part'):
+            CachedDataMixin.from_snapshot(snapshot, self.token)
+
+
+class HydrateTest(IGittTestCase):
+
+    def test_hydrate(self):
+        token = GitHubToken('')
+        issues = [GitHubIssue(token, 'gitmate-test-user/test', number)
+                  for number in (1, 2, 1)]
+        issues.append(GitHubIssue.from_data({'title': 'known'}, token,
+                                            'gitmate-test-user/test', 3))
+        with requests_mock.Mocker() as m:
+            for number in (1, 2):
+                m.get(GITHUB_BASE_URL +
+                      '/repos/gitmate-test-user/test/issues/' + str(number),
+                      json={'title': 'issue ' + str(number)})
+            self.assertEqual(hydrate(issues, fields=['title']), issues)
+            self.assertEqual(m.call_count, 2)
+
+        self.assertEqual([issue.title for issue in issues],
+                         ['issue 1', 'issue 2', 'issue 1', 'known'])
+
+    def test_hydrate_error(self):
+        issue = GitHubIssue(GitHubToken(''), 'gitmate-test-user/test', 4)
+        with requests_mock.Mocker() as m:
+            m.get(requests_mock.ANY, status_code=404, text='Not Found')
+            with self.assertRaises(RuntimeError):
+                hydrate([issue])
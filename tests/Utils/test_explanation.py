@@ -0,0 +1,55 @@
+import requests_mock
+
+from IGitt.GitHub import BASE_URL
+from IGitt.GitHub import GitHubToken
+from IGitt.GitHub.GitHubIssue import GitHubIssue
+from IGitt.Utils import Explanation
+
+from tests import IGittTestCase
+
+
+class ExplanationTest(IGittTestCase):
+
+    def setUp(self):
+        self.token = GitHubToken('')
+
+    def test_attribution(self):
+        with requests_mock.Mocker() as m:
+            m.get(BASE_URL + '/repos/a/b/issues/1', json={'title': 'Bug'})
+            issue = GitHubIssue(self.token, 'a/b', 1)
+            with Explanation() as explanation:
+                issue.title
+                issue.title
+            issue.refresh()
+
+        self.assertEqual(len(explanation.requests), 1)
+        request = explanation.requests[0]
+        self.assertEqual((request.method, request.status), ('GET', 200))
+        self.assertEqual((request.owner, request.member),
+                         ('GitHubIssue', 'title'))
+        self.assertIn('test_explanation.py:', request.call_site)
+        self.assertEqual(request.pattern,
+                         ('GET', BASE_URL + '/repos/a/b/issues/{id}'))
+        self.assertEqual(explanation.n_plus_one(), [])
+        self.assertIn('GitHubIssue.title at ', explanation.report())
+
+    def test_n_plus_one(self):
+        with requests_mock.Mocker() as m:
+            for number in range(1, 4):
+                m.get(BASE_URL + '/repos/a/b/issues/{}'.format(number),
+                      json={'title': str(number)})
+            issues = [GitHubIssue(self.token, 'a/b', number)
+                      for number in range(1, 4)]
+            with Explanation() as explanation:
+                titles = [issue.title for issue in issues]
+
+        self.assertEqual(titles, ['1', '2', '3'])
+        groups = explanation.n_plus_one()
+        self.assertEqual(len(groups), 1)
+        self.assertEqual(len(groups[0]), 3)
+        self.assertIn('N+1: GET {}/repos/a/b/issues/{{id}} 3 times by '
+                      'GitHubIssue.title at '.format(BASE_URL),
+                      explanation.report())
+
+        explanation.threshold = 4
+        self.assertEqual(explanation.n_plus_one(), [])
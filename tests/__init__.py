@@ -126,6 +126,15 @@ class IGittTestCase(TestCase, metaclass=ABCMeta):
             ]
             self.cassette._save(force=True)
 
+    def replay(self, cassette_name: str):
+        """
+        Replays the requests recorded by another test of the same class, for
+        requests this test makes after that test recorded them.
+
+        :param cassette_name: The name of the other test's cassette.
+        """
+        return self.vcr.use_cassette(cassette_name)
+
     def setUp(self):
         """
         Common setup method for all inherited classes.